@@ -1,20 +1,39 @@
+import functools
+import importlib
+import json
+import pkgutil
 from pathlib import Path
 from typing import List, Union
 
 import click
 
 from obsidian_tools.config import Config
+from obsidian_tools.utils import http_stats
+from obsidian_tools.utils.click_utils import get_app_dir_path
+from obsidian_tools.utils.http_stats import RequestStats
 
 
 class ObsidianToolsCLI(click.MultiCommand):
+    """
+    A command for each tool in the toolbox, loaded from the tool's `cli`
+    module when it's used.
+
+    - The modules are imported, so their bytecode is cached in
+      `__pycache__`, and each command is only loaded once.
+    """
 
     tools_dir_path = Path(__file__).parent / "toolbox"
+    tools_package = "obsidian_tools.toolbox"
 
     def list_commands(self, ctx: click.Context) -> List[str]:
         rv = []
 
-        for filename in self.tools_dir_path.glob("*/cli.py"):
-            rv.append(filename.parent.name)
+        for module_info in pkgutil.iter_modules([str(self.tools_dir_path)]):
+            if (
+                module_info.ispkg is True
+                and (self.tools_dir_path / module_info.name / "cli.py").exists()
+            ):
+                rv.append(module_info.name)
 
         rv.sort()
         return rv
@@ -22,18 +41,19 @@ class ObsidianToolsCLI(click.MultiCommand):
     def get_command(
         self, ctx: click.Context, name: str
     ) -> Union[click.Command, None]:
-        ns = {}  # type: ignore
-
-        tool_cli_path = self.tools_dir_path / name / "cli.py"
-
-        if tool_cli_path.exists() is False:
+        if name not in self.list_commands(ctx):
             return None
 
-        with tool_cli_path.open() as file_obj:
-            code = compile(file_obj.read(), tool_cli_path, "exec")
-            eval(code, ns, ns)
+        return load_tool_command(f"{self.tools_package}.{name}.cli")
 
-        return ns["cli"]
+
+@functools.cache
+def load_tool_command(module_name: str) -> click.Command:
+    """
+    Import a tool's `cli` module and get its command.
+    """
+    module = importlib.import_module(module_name)
+    return module.cli
 
 
 @click.group(  # type: ignore
@@ -51,18 +71,50 @@ class ObsidianToolsCLI(click.MultiCommand):
     ),
     help="Path to the configuration file.",
 )
+@click.option(
+    "--stats",
+    is_flag=True,
+    default=False,
+    help="Print a summary of the HTTP requests when the command is done.",
+)
+@click.option(
+    "--stats-json",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help="Write the stats of the HTTP requests to a JSON file.",
+)
 @click.pass_context
-def cli(ctx: click.Context, config: Union[str, None]):
+def cli(
+    ctx: click.Context,
+    config: Union[str, None],
+    stats: bool,
+    stats_json: Union[Path, None],
+):
     """
     CLI tools for interacting with Obsidian vaults.
     """
     ctx.ensure_object(dict)
 
+    if stats is True or stats_json is not None:
+        request_stats = RequestStats()
+        unsubscribe = http_stats.subscribe(request_stats.record)
+
+        def report_stats() -> None:
+            unsubscribe()
+
+            if stats is True:
+                for line in request_stats.format_summary():
+                    click.echo(line, err=True)
+
+            if stats_json is not None:
+                with stats_json.open("w") as file_obj:
+                    json.dump(request_stats.to_dict(), file_obj, indent=2)
+
+        # The context is closed after the command, even if it fails.
+        ctx.call_on_close(report_stats)
+
     if config:
         config_file_path = Path(config)
     else:
-        config_file_path = (
-            Path(click.get_app_dir("obsidian-tools")) / "config.toml"
-        )
+        config_file_path = get_app_dir_path() / "config.toml"
 
     ctx.obj["config"] = Config.from_file(config_file_path=config_file_path)
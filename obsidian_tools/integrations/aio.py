@@ -0,0 +1,423 @@
+"""
+This module provides the asyncio clients of the integrations.
+
+- The clients send the same requests as their blocking counterparts, built
+  by the shared request classes like `TMDBRequests`.
+- It isn't imported by the `integrations` package, so only the commands that
+  use the asyncio clients import httpx.
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from obsidian_tools.integrations.discogs import (
+    DISCOGS_CURRENCY_ABBR,
+    DISCOGS_RESULT_FORMAT,
+    DISCOGS_RESULT_TYPE,
+    DiscogsAuth,
+    DiscogsClient,
+    DiscogsRequests,
+)
+from obsidian_tools.integrations.google_books import GoogleBooksRequests
+from obsidian_tools.integrations.igdb import (
+    CategoryEnum,
+    IGDBAccessToken,
+    IGDBAuth,
+    IGDBClient,
+    IGDBQuery,
+    IGDBRequests,
+    load_access_token,
+    save_access_token,
+)
+from obsidian_tools.integrations.openlibrary import (
+    OpenLibraryClient,
+    OpenLibraryRequests,
+)
+from obsidian_tools.integrations.tmdb import TMDBAuth, TMDBClient, TMDBRequests
+from obsidian_tools.utils.async_http_client import (
+    AsyncAuth,
+    AsyncHttpClient,
+    AsyncRequestReturn,
+)
+from obsidian_tools.utils.concurrency import map_async
+from obsidian_tools.utils.http_client import HttpMethod
+from obsidian_tools.utils.retry import RetryPolicy
+
+
+class AsyncTMDBClient(TMDBRequests, AsyncHttpClient):
+    """
+    An asyncio client for The Movie Database (TMDb) API, see `TMDBClient`.
+    """
+
+    rate_limits = TMDBClient.rate_limits
+
+    def __init__(self, api_key: str, api_version: int = 3, **kwargs):
+        auth = TMDBAuth(api_key=api_key)
+        super().__init__(auth=auth, **kwargs)
+
+        self.base_url = f"https://api.themoviedb.org/{api_version}"
+
+    # Search
+    async def search_movies(self, query: str) -> AsyncRequestReturn:
+        return await self.fetch(self.build_search_movies(query))
+
+    async def search_tv_series(self, query: str) -> AsyncRequestReturn:
+        return await self.fetch(self.build_search_tv_series(query))
+
+    # Movies
+    async def get_movie_details(self, movie_id: int) -> AsyncRequestReturn:
+        return await self.fetch(self.build_get_movie_details(movie_id))
+
+    # TV Series
+    async def get_tv_series_details(
+        self,
+        series_id: int,
+        append_to_response: Optional[Iterable[str]] = None,
+    ) -> AsyncRequestReturn:
+        return await self.fetch(
+            self.build_get_tv_series_details(
+                series_id=series_id, append_to_response=append_to_response
+            )
+        )
+
+    # TV Seasons
+    async def get_tv_season_details(
+        self, series_id: int, season_number: int
+    ) -> AsyncRequestReturn:
+        return await self.fetch(
+            self.build_get_tv_season_details(
+                series_id=series_id, season_number=season_number
+            )
+        )
+
+    async def get_tv_seasons_details(
+        self,
+        series_id: int,
+        season_numbers: Iterable[int],
+        max_concurrency: int = 1,
+    ) -> List[AsyncRequestReturn]:
+        """
+        Get the details of many TV seasons, batching up to 20 seasons into a
+        single TV series details request with append_to_response.
+
+        - The batches are returned in order.
+        """
+        return await map_async(
+            self.fetch,
+            self.build_get_tv_seasons_details(
+                series_id=series_id, season_numbers=season_numbers
+            ),
+            max_concurrency=max_concurrency,
+        )
+
+    # TV Episodes
+    async def get_tv_episode_details(
+        self, series_id: int, season_number: int, episode_number: int
+    ) -> AsyncRequestReturn:
+        return await self.fetch(
+            self.build_get_tv_episode_details(
+                series_id=series_id,
+                season_number=season_number,
+                episode_number=episode_number,
+            )
+        )
+
+
+class AsyncOpenLibraryClient(OpenLibraryRequests, AsyncHttpClient):
+    """
+    An asyncio client for the OpenLibrary API, see `OpenLibraryClient`.
+    """
+
+    rate_limits = OpenLibraryClient.rate_limits
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self.base_url = "https://openlibrary.org"
+
+    async def get_book_from_isbn(
+        self, isbn: str, **kwargs
+    ) -> AsyncRequestReturn:
+        return await self.fetch(self.build_get_book_from_isbn(isbn), **kwargs)
+
+    async def get_books_from_isbns(
+        self, isbns: Iterable[str], **kwargs
+    ) -> AsyncRequestReturn:
+        return await self.fetch(
+            self.build_get_books_from_isbns(isbns), **kwargs
+        )
+
+    async def get_author(self, key: str, **kwargs) -> AsyncRequestReturn:
+        return await self.fetch(self.build_get_author(key), **kwargs)
+
+    async def get_authors(
+        self, author_keys: Iterable[str], max_concurrency: int = 1, **kwargs
+    ) -> List[AsyncRequestReturn]:
+        """
+        Get a list of authors, in the order of the keys.
+        """
+        return await map_async(
+            lambda author_key: self.get_author(key=author_key, **kwargs),
+            author_keys,
+            max_concurrency=max_concurrency,
+        )
+
+    async def get_work(self, key: str, **kwargs) -> AsyncRequestReturn:
+        return await self.fetch(self.build_get_work(key), **kwargs)
+
+    async def get_works(
+        self, work_keys: Iterable[str], max_concurrency: int = 1, **kwargs
+    ) -> List[AsyncRequestReturn]:
+        """
+        Get a list of works, in the order of the keys.
+        """
+        return await map_async(
+            lambda work_key: self.get_work(key=work_key, **kwargs),
+            work_keys,
+            max_concurrency=max_concurrency,
+        )
+
+
+class AsyncGoogleBooksClient(GoogleBooksRequests, AsyncHttpClient):
+    """
+    An asyncio client for the Google Books API, see `GoogleBooksClient`.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = "https://www.googleapis.com/books/v1"
+
+    async def search_books(
+        self, query: str, max_results: Optional[int] = None
+    ) -> AsyncRequestReturn:
+        return await self.fetch(
+            self.build_search_books(query, max_results=max_results)
+        )
+
+    async def get_book_by_isbn(self, isbn: str) -> AsyncRequestReturn:
+        return await self.fetch(self.build_get_book_by_isbn(isbn))
+
+    async def get_books_by_isbns(
+        self, isbns: Iterable[str]
+    ) -> AsyncRequestReturn:
+        return await self.fetch(self.build_get_books_by_isbns(isbns))
+
+
+class AsyncDiscogsClient(DiscogsRequests, AsyncHttpClient):
+    """
+    An asyncio client for the Discogs API, see `DiscogsClient`.
+    """
+
+    rate_limits = DiscogsClient.rate_limits
+
+    def __init__(self, auth_token: str, **kwargs):
+        auth = DiscogsAuth(token=auth_token)
+        super().__init__(auth=auth, **kwargs)
+
+        self.base_url = "https://api.discogs.com"
+
+    # Release
+    async def get_release(
+        self,
+        release_id: int,
+        curr_abbr: Optional[DISCOGS_CURRENCY_ABBR] = None,
+        **kwargs,
+    ) -> AsyncRequestReturn:
+        return await self.fetch(
+            self.build_get_release(
+                release_id=release_id,
+                curr_abbr=curr_abbr,
+                params=kwargs.pop("params", None),
+            ),
+            **kwargs,
+        )
+
+    # Search
+    async def search(
+        self,
+        query: Optional[str] = None,
+        barcode: Optional[str] = None,
+        result_type: Optional[DISCOGS_RESULT_TYPE] = None,
+        result_format: Optional[DISCOGS_RESULT_FORMAT] = None,
+        **kwargs,
+    ) -> AsyncRequestReturn:
+        return await self.fetch(
+            self.build_search(
+                query=query,
+                barcode=barcode,
+                result_type=result_type,
+                result_format=result_format,
+                params=kwargs.pop("params", None),
+            ),
+            **kwargs,
+        )
+
+
+class AsyncIGDBClient(IGDBRequests, AsyncHttpClient):
+    """
+    An asyncio client for the IGDB API, see `IGDBClient`.
+
+    - The access token is fetched by the first request instead of when the
+      client is created. Requests rejected at the same time share one new
+      token.
+    """
+
+    rate_limits = IGDBClient.rate_limits
+    retry_policy = IGDBClient.retry_policy
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        api_version: int = 4,
+        access_token_path: Optional[Path] = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.access_token_path = access_token_path
+
+        self.base_url = f"https://api.igdb.com/v{api_version}"
+
+        self._access_token: Union[str, None] = None
+        self._access_token_lock = asyncio.Lock()
+
+    async def get_access_token(self, rejected: Optional[str] = None) -> str:
+        """
+        Get an access token, from the stored token if it's still valid or
+        from Twitch.
+
+        - Pass the `rejected` token to get a new one.
+        """
+        async with self._access_token_lock:
+            if self._access_token not in (None, rejected):
+                return str(self._access_token)
+
+            if rejected is None and self.access_token_path is not None:
+                stored_access_token = load_access_token(self.access_token_path)
+                if (
+                    stored_access_token is not None
+                    and stored_access_token.client_id == self.client_id
+                    and stored_access_token.is_valid()
+                ):
+                    self._access_token = stored_access_token.access_token
+                    return self._access_token
+
+            _, auth_resp = await self.authenticate(
+                client_id=self.client_id, client_secret=self.client_secret
+            )
+            auth_data = auth_resp.json()
+
+            if self.access_token_path is not None:
+                save_access_token(
+                    self.access_token_path,
+                    IGDBAccessToken(
+                        client_id=self.client_id,
+                        access_token=auth_data["access_token"],
+                        expires_at=time.time() + auth_data.get("expires_in", 0),
+                    ),
+                )
+
+            self._access_token = str(auth_data["access_token"])
+            return self._access_token
+
+    async def request(
+        self,
+        method: HttpMethod,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, str]] = None,
+        timeout: Union[float, Tuple[float, float], None] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        auth: Optional[AsyncAuth] = None,
+        **kwargs,
+    ) -> AsyncRequestReturn:
+        kwargs.update(
+            headers=headers,
+            params=params,
+            timeout=timeout,
+            retry_policy=retry_policy,
+        )
+
+        # Twitch requests aren't authenticated with the access token.
+        if not url.startswith(self.base_url):
+            return await super().request(method, url, auth=auth, **kwargs)
+
+        access_token = await self.get_access_token()
+        request, response = await super().request(
+            method,
+            url,
+            auth=IGDBAuth(client_id=self.client_id, access_token=access_token),
+            **kwargs,
+        )
+
+        # The token has expired or been revoked, get a new one and retry.
+        if response.status_code == 401:
+            access_token = await self.get_access_token(rejected=access_token)
+            request, response = await super().request(
+                method,
+                url,
+                auth=IGDBAuth(
+                    client_id=self.client_id, access_token=access_token
+                ),
+                **kwargs,
+            )
+
+        return request, response
+
+    async def authenticate(
+        self, client_id: str, client_secret: str
+    ) -> AsyncRequestReturn:
+        return await self.fetch(
+            self.build_authenticate(
+                client_id=client_id, client_secret=client_secret
+            )
+        )
+
+    async def search_games(
+        self, query: str, fields: Iterable[str] = ("*",)
+    ) -> AsyncRequestReturn:
+        return await self.fetch(self.build_search_games(query, fields=fields))
+
+    async def multiquery(
+        self, queries: Iterable[IGDBQuery]
+    ) -> AsyncRequestReturn:
+        return await self.fetch(self.build_multiquery(queries))
+
+    async def get_game(
+        self,
+        game_id: int,
+        fields: Iterable[str] = ("*",),
+        expand: Iterable[str] = (),
+    ) -> AsyncRequestReturn:
+        return await self.fetch(
+            self.build_get_game(game_id, fields=fields, expand=expand)
+        )
+
+    async def get_game_by_external_game_id(
+        self,
+        game_id: str,
+        category: CategoryEnum,
+        fields: Iterable[str] = ("*",),
+    ) -> AsyncRequestReturn:
+        return await self.fetch(
+            self.build_get_game_by_external_game_id(
+                game_id, category=category, fields=fields
+            )
+        )
+
+    async def get_cover(
+        self, cover_id: int, fields: Iterable[str] = ("*",)
+    ) -> AsyncRequestReturn:
+        return await self.fetch(self.build_get_cover(cover_id, fields=fields))
+
+    async def get_external_game(
+        self, external_game_ids: Iterable[int], fields: Iterable[str] = ("*",)
+    ) -> AsyncRequestReturn:
+        return await self.fetch(
+            self.build_get_external_game(external_game_ids, fields=fields)
+        )
@@ -1,8 +1,14 @@
-from typing import Literal, Optional
+from typing import Dict, Literal, Optional
 
 from requests.auth import AuthBase
 
-from obsidian_tools.utils.http_client import HttpClient, RequestReturn
+from obsidian_tools.utils.http_client import (
+    ApiRequest,
+    HttpClient,
+    HttpMethod,
+    RequestReturn,
+)
+from obsidian_tools.utils.rate_limit import RateLimit
 
 DISCOGS_CURRENCY_ABBR = Literal[
     "USD",
@@ -29,58 +35,49 @@ class DiscogsAuth(AuthBase):
         return r
 
 
-class DiscogsClient(HttpClient):
+DISCOGS_RESULT_TYPE = Literal["release", "master", "artist", "label"]
 
-    def __init__(self, auth_token: str, **kwargs):
-        auth = DiscogsAuth(token=auth_token)
-        super().__init__(auth=auth, **kwargs)
+DISCOGS_RESULT_FORMAT = Literal[
+    "vinyl", "cd", "cassette", "dvd", "blu-ray", "other"
+]
 
-        self.base_url = "https://api.discogs.com"
+
+class DiscogsRequests:
+    """
+    The requests to the Discogs API, shared by the `DiscogsClient` and the
+    `AsyncDiscogsClient`.
+    """
+
+    base_url: str
 
     # Release
-    def get_release(
+    def build_get_release(
         self,
         release_id: int,
         curr_abbr: Optional[DISCOGS_CURRENCY_ABBR] = None,
-        **kwargs,
-    ) -> RequestReturn:
-        """
-        Get a Discogs release.
-        """
-        if "params" in kwargs:
-            params = kwargs.pop("params")
-        else:
-            params = {}
+        params: Optional[Dict[str, str]] = None,
+    ) -> ApiRequest:
+        params = dict(params or {})
 
         if curr_abbr is not None:
             params["curr_abbr"] = curr_abbr
 
-        url = f"{self.base_url}/releases/{release_id}"
-        request, response = self.get(url, params=params, **kwargs)
-        response.raise_for_status()
-
-        return request, response
+        return ApiRequest(
+            HttpMethod.GET,
+            f"{self.base_url}/releases/{release_id}",
+            params=params,
+        )
 
     # Search
-    def search(
+    def build_search(
         self,
         query: Optional[str] = None,
         barcode: Optional[str] = None,
-        result_type: Optional[
-            Literal["release", "master", "artist", "label"]
-        ] = None,
-        result_format: Optional[
-            Literal["vinyl", "cd", "cassette", "dvd", "blu-ray", "other"]
-        ] = None,
-        **kwargs,
-    ) -> RequestReturn:
-        """
-        Search the Discogs database.
-        """
-        if "params" in kwargs:
-            params = kwargs.pop("params")
-        else:
-            params = {}
+        result_type: Optional[DISCOGS_RESULT_TYPE] = None,
+        result_format: Optional[DISCOGS_RESULT_FORMAT] = None,
+        params: Optional[Dict[str, str]] = None,
+    ) -> ApiRequest:
+        params = dict(params or {})
 
         if query is not None:
             params["q"] = query
@@ -94,8 +91,60 @@ class DiscogsClient(HttpClient):
         if result_format is not None:
             params["format"] = result_format
 
-        url = f"{self.base_url}/database/search"
-        request, response = self.get(url, params=params, **kwargs)
-        response.raise_for_status()
+        return ApiRequest(
+            HttpMethod.GET, f"{self.base_url}/database/search", params=params
+        )
+
+
+class DiscogsClient(DiscogsRequests, HttpClient):
+
+    # Discogs allows 60 authenticated requests per minute.
+    rate_limits = {"api.discogs.com": RateLimit(requests=60, period=60)}
+
+    def __init__(self, auth_token: str, **kwargs):
+        auth = DiscogsAuth(token=auth_token)
+        super().__init__(auth=auth, **kwargs)
+
+        self.base_url = "https://api.discogs.com"
 
-        return request, response
+    # Release
+    def get_release(
+        self,
+        release_id: int,
+        curr_abbr: Optional[DISCOGS_CURRENCY_ABBR] = None,
+        **kwargs,
+    ) -> RequestReturn:
+        """
+        Get a Discogs release.
+        """
+        return self.fetch(
+            self.build_get_release(
+                release_id=release_id,
+                curr_abbr=curr_abbr,
+                params=kwargs.pop("params", None),
+            ),
+            **kwargs,
+        )
+
+    # Search
+    def search(
+        self,
+        query: Optional[str] = None,
+        barcode: Optional[str] = None,
+        result_type: Optional[DISCOGS_RESULT_TYPE] = None,
+        result_format: Optional[DISCOGS_RESULT_FORMAT] = None,
+        **kwargs,
+    ) -> RequestReturn:
+        """
+        Search the Discogs database.
+        """
+        return self.fetch(
+            self.build_search(
+                query=query,
+                barcode=barcode,
+                result_type=result_type,
+                result_format=result_format,
+                params=kwargs.pop("params", None),
+            ),
+            **kwargs,
+        )
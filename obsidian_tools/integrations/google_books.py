@@ -1,27 +1,80 @@
-from obsidian_tools.utils.http_client import HttpClient, RequestReturn
+from typing import Final, Iterable, Optional
 
+from obsidian_tools.utils.http_client import (
+    ApiRequest,
+    HttpClient,
+    HttpMethod,
+    RequestReturn,
+)
 
-class GoogleBooksClient(HttpClient):
+# The most results the volumes search returns in one page.
+MAX_RESULTS: Final = 40
+
+# The number of ISBNs to look up in one search. An ISBN can match a few
+# volumes, so this leaves room for them in one page of results.
+ISBN_BATCH_SIZE: Final = 10
+
+
+class GoogleBooksRequests:
+    """
+    The requests to the Google Books API, shared by the `GoogleBooksClient`
+    and the `AsyncGoogleBooksClient`.
+    """
+
+    base_url: str
+
+    def build_search_books(
+        self, query: str, max_results: Optional[int] = None
+    ) -> ApiRequest:
+        params = {"q": query}
+        if max_results is not None:
+            params["maxResults"] = str(max_results)
+
+        return ApiRequest(
+            HttpMethod.GET, f"{self.base_url}/volumes", params=params
+        )
+
+    def build_get_book_by_isbn(self, isbn: str) -> ApiRequest:
+        return self.build_search_books(f"isbn:{isbn}")
+
+    def build_get_books_by_isbns(self, isbns: Iterable[str]) -> ApiRequest:
+        return self.build_search_books(
+            " OR ".join(f"isbn:{isbn}" for isbn in isbns),
+            max_results=MAX_RESULTS,
+        )
+
+
+class GoogleBooksClient(GoogleBooksRequests, HttpClient):
     """
     A client for the Google Books API.
     """
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
         self.base_url = "https://www.googleapis.com/books/v1"
 
-    def search_books(self, query: str) -> RequestReturn:
+    def search_books(
+        self, query: str, max_results: Optional[int] = None
+    ) -> RequestReturn:
         """
         Search for books in the Google Books API.
         """
-        request, response = self.get(
-            f"{self.base_url}/volumes", params={"q": query}
+        return self.fetch(
+            self.build_search_books(query, max_results=max_results)
         )
-        response.raise_for_status()
-        return request, response
 
     def get_book_by_isbn(self, isbn: str) -> RequestReturn:
         """
         Get a book from the Google Books API using its ISBN.
         """
-        return self.search_books(f"isbn:{isbn}")
+        return self.fetch(self.build_get_book_by_isbn(isbn))
+
+    def get_books_by_isbns(self, isbns: Iterable[str]) -> RequestReturn:
+        """
+        Search for several books in the Google Books API using their ISBNs.
+
+        - The results aren't in the order of the ISBNs, match them up with the
+          volumes' `industryIdentifiers`.
+        - See `ISBN_BATCH_SIZE` for how many ISBNs to send at once.
+        """
+        return self.fetch(self.build_get_books_by_isbns(isbns))
@@ -1,10 +1,27 @@
+import json
+import time
+from dataclasses import asdict, dataclass
 from enum import Enum
-from typing import Iterable
+from pathlib import Path
+from typing import Dict, Final, Iterable, Optional, Tuple, Union
 
-from requests import Session
 from requests.auth import AuthBase
 
-from obsidian_tools.utils.http_client import HttpClient, RequestReturn
+from obsidian_tools.utils.files import write_file_atomically
+from obsidian_tools.utils.http_client import (
+    ApiRequest,
+    HttpClient,
+    HttpMethod,
+    RequestReturn,
+)
+from obsidian_tools.utils.rate_limit import RateLimit
+from obsidian_tools.utils.retry import DEFAULT_RETRY_METHODS, RetryPolicy
+
+TWITCH_TOKEN_URL: Final = "https://id.twitch.tv/oauth2/token"
+
+# Refresh the access token a day before it expires, so it doesn't expire in
+# the middle of a command.
+ACCESS_TOKEN_EXPIRY_MARGIN: Final = 24 * 60 * 60
 
 
 class CategoryEnum(Enum):
@@ -35,6 +52,31 @@ class MediaEnum(Enum):
     PHYSICAL = 2
 
 
+@dataclass
+class IGDBQuery:
+    """
+    A named query for the IGDB multiquery endpoint.
+    """
+
+    endpoint: str
+    name: str
+    query: str
+
+
+def build_fields(
+    fields: Iterable[str] = ("*",), expand: Iterable[str] = ()
+) -> str:
+    """
+    Build the fields clause of a query, with all the fields of the expanded
+    relations.
+
+    - Nested fields like `cover.image_id` can be given in the `fields`.
+    - For example `expand=("cover",)` returns the cover object in place of the
+      cover's ID.
+    """
+    return ", ".join([*fields, *(f"{field}.*" for field in expand)])
+
+
 class IGDBAuth(AuthBase):
     def __init__(self, client_id: str, access_token: str):
         self.client_id = client_id
@@ -46,108 +88,307 @@ class IGDBAuth(AuthBase):
         return request
 
 
-class IGDBClient(HttpClient):
+@dataclass
+class IGDBAccessToken:
+    client_id: str
+    access_token: str
+    expires_at: float
+
+    def is_valid(self, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return self.expires_at - ACCESS_TOKEN_EXPIRY_MARGIN > now
+
+
+def load_access_token(path: Path) -> Union[IGDBAccessToken, None]:
+    """
+    Load a stored access token, returns None if there isn't a usable one.
+    """
+    try:
+        with path.open("r") as file_obj:
+            return IGDBAccessToken(**json.load(file_obj))
+    except (FileNotFoundError, TypeError, ValueError):
+        return None
+
+
+def save_access_token(path: Path, access_token: IGDBAccessToken) -> None:
+    """
+    Store the access token, only readable by the current user.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_file_atomically(
+        path, json.dumps(asdict(access_token)).encode("utf-8"), mode=0o600
+    )
+
+
+class IGDBRequests:
+    """
+    The requests to the IGDB API, shared by the `IGDBClient` and the
+    `AsyncIGDBClient`.
+
+    - IGDB queries are sent as the body of POST requests.
+    """
+
+    base_url: str
+
+    def build_authenticate(
+        self, client_id: str, client_secret: str
+    ) -> ApiRequest:
+        return ApiRequest(
+            HttpMethod.POST,
+            TWITCH_TOKEN_URL,
+            data={
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "grant_type": "client_credentials",
+            },
+        )
+
+    def build_search_games(
+        self, query: str, fields: Iterable[str] = ("*",)
+    ) -> ApiRequest:
+        return ApiRequest(
+            HttpMethod.POST,
+            f"{self.base_url}/games",
+            data=f'fields {build_fields(fields)}; search "{query}";',
+        )
+
+    def build_multiquery(self, queries: Iterable[IGDBQuery]) -> ApiRequest:
+        return ApiRequest(
+            HttpMethod.POST,
+            f"{self.base_url}/multiquery",
+            data="\n".join(
+                f'query {query.endpoint} "{query.name}" {{ {query.query} }};'
+                for query in queries
+            ),
+        )
+
+    def build_get_game(
+        self,
+        game_id: int,
+        fields: Iterable[str] = ("*",),
+        expand: Iterable[str] = (),
+    ) -> ApiRequest:
+        return ApiRequest(
+            HttpMethod.POST,
+            f"{self.base_url}/games",
+            data=(
+                f"fields {build_fields(fields, expand)}; "
+                f"where id = {game_id};"
+            ),
+        )
+
+    def build_get_game_by_external_game_id(
+        self,
+        game_id: str,
+        category: CategoryEnum,
+        fields: Iterable[str] = ("*",),
+    ) -> ApiRequest:
+        return ApiRequest(
+            HttpMethod.POST,
+            f"{self.base_url}/games",
+            data=(
+                f"fields {build_fields(fields)}; "
+                f"where external_games.category = {category.value} "
+                f'& external_games.uid = "{game_id}";'
+            ),
+        )
+
+    def build_get_cover(
+        self, cover_id: int, fields: Iterable[str] = ("*",)
+    ) -> ApiRequest:
+        return ApiRequest(
+            HttpMethod.POST,
+            f"{self.base_url}/covers",
+            data=f"fields {build_fields(fields)}; where id = {cover_id};",
+        )
+
+    def build_get_external_game(
+        self, external_game_ids: Iterable[int], fields: Iterable[str] = ("*",)
+    ) -> ApiRequest:
+        ids = ",".join(str(i) for i in external_game_ids)
+
+        return ApiRequest(
+            HttpMethod.POST,
+            f"{self.base_url}/external_games",
+            data=f"fields {build_fields(fields)}; where id = ({ids});",
+        )
+
+
+class IGDBClient(IGDBRequests, HttpClient):
     """
     A client for the IGDB API.
+
+    - Twitch access tokens last about 60 days, so if an `access_token_path`
+      is given the token is stored there and reused until it's about to
+      expire.
+    - If IGDB rejects the token, a new one is requested and the request is
+      retried once.
     """
 
+    # IGDB allows 4 requests per second.
+    rate_limits = {"api.igdb.com": RateLimit(requests=4, period=1)}
+
+    # IGDB queries are sent as POST requests, but they only read data.
+    retry_policy = RetryPolicy(methods=DEFAULT_RETRY_METHODS | {"POST"})
+
     def __init__(
         self,
         client_id: str,
         client_secret: str,
         api_version: int = 4,
+        access_token_path: Optional[Path] = None,
         **kwargs,
     ):
-        self.session = Session()
+        super().__init__(**kwargs)
+
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.access_token_path = access_token_path
 
-        # Authenticate with the IGDB API.
-        _, auth_resp = self.authenticate(
-            client_id=client_id, client_secret=client_secret
+        self.base_url = f"https://api.igdb.com/v{api_version}"
+
+        self.auth = IGDBAuth(
+            client_id=client_id, access_token=self.get_access_token()
+        )
+
+    def get_access_token(self, refresh: bool = False) -> str:
+        """
+        Get an access token, from the stored token if it's still valid or
+        from Twitch.
+        """
+        if refresh is False and self.access_token_path is not None:
+            stored_access_token = load_access_token(self.access_token_path)
+            if (
+                stored_access_token is not None
+                and stored_access_token.client_id == self.client_id
+                and stored_access_token.is_valid()
+            ):
+                return stored_access_token.access_token
+
+        # Don't send the old token to Twitch, but keep it if Twitch fails.
+        auth, self.auth = self.auth, None
+        try:
+            _, auth_resp = self.authenticate(
+                client_id=self.client_id, client_secret=self.client_secret
+            )
+        finally:
+            self.auth = auth
+        auth_data = auth_resp.json()
+
+        if self.access_token_path is not None:
+            save_access_token(
+                self.access_token_path,
+                IGDBAccessToken(
+                    client_id=self.client_id,
+                    access_token=auth_data["access_token"],
+                    expires_at=time.time() + auth_data.get("expires_in", 0),
+                ),
+            )
+
+        return auth_data["access_token"]
+
+    def request(
+        self,
+        method: HttpMethod,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+        timeout: Union[int, Tuple[int, int], None] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        **kwargs,
+    ) -> RequestReturn:
+        kwargs.update(
+            headers=headers,
+            params=params,
+            stream=stream,
+            timeout=timeout,
+            retry_policy=retry_policy,
         )
-        access_token = auth_resp.json()["access_token"]
+        request, response = super().request(method, url, **kwargs)
 
-        auth = IGDBAuth(client_id=client_id, access_token=access_token)
-        super().__init__(session=self.session, auth=auth)
+        # The token has expired or been revoked, get a new one and retry.
+        if response.status_code == 401 and url.startswith(self.base_url):
+            self.auth = IGDBAuth(
+                client_id=self.client_id,
+                access_token=self.get_access_token(refresh=True),
+            )
+            request, response = super().request(method, url, **kwargs)
 
-        self.base_url = f"https://api.igdb.com/v{api_version}"
+        return request, response
 
     def authenticate(self, client_id: str, client_secret: str) -> RequestReturn:
         """
         Authenticate with the IGDB API.
         """
-        data = {
-            "client_id": client_id,
-            "client_secret": client_secret,
-            "grant_type": "client_credentials",
-        }
-
-        request, response = self.post(
-            "https://id.twitch.tv/oauth2/token", data=data
+        return self.fetch(
+            self.build_authenticate(
+                client_id=client_id, client_secret=client_secret
+            )
         )
-        response.raise_for_status()
-
-        return request, response
 
-    def search_games(self, query: str) -> RequestReturn:
+    def search_games(
+        self, query: str, fields: Iterable[str] = ("*",)
+    ) -> RequestReturn:
         """
         Search for games on IGDB.
         """
-        url = f"{self.base_url}/games"
-        data = f'fields *; search "{query}";'
+        return self.fetch(self.build_search_games(query, fields=fields))
 
-        request, response = self.post(url, data=data)
-        response.raise_for_status()
+    def multiquery(self, queries: Iterable[IGDBQuery]) -> RequestReturn:
+        """
+        Run several queries in one request.
 
-        return request, response
+        - The response is a list with the `name` and `result` of each query.
+        - IGDB allows up to 10 queries per request.
+        """
+        return self.fetch(self.build_multiquery(queries))
 
-    def get_game(self, game_id: int) -> RequestReturn:
+    def get_game(
+        self,
+        game_id: int,
+        fields: Iterable[str] = ("*",),
+        expand: Iterable[str] = (),
+    ) -> RequestReturn:
         """
         Get the details of a game.
-        """
-        url = f"{self.base_url}/games"
-        data = f"fields *; where id = {game_id};"
-
-        request, response = self.post(url, data=data)
-        response.raise_for_status()
 
-        return request, response
+        - The relations in `expand`, like `cover` or `external_games`, are
+          returned as objects instead of IDs.
+        """
+        return self.fetch(
+            self.build_get_game(game_id, fields=fields, expand=expand)
+        )
 
     def get_game_by_external_game_id(
-        self, game_id: str, category: CategoryEnum
+        self,
+        game_id: str,
+        category: CategoryEnum,
+        fields: Iterable[str] = ("*",),
     ) -> RequestReturn:
         """
         Get the details of a game by its external game ID.
         """
-        url = f"{self.base_url}/games"
-        data = f'fields *; where external_games.category = {category.value} & external_games.uid = "{game_id}";'
-
-        request, response = self.post(url, data=data)
-        response.raise_for_status()
-
-        return request, response
+        return self.fetch(
+            self.build_get_game_by_external_game_id(
+                game_id, category=category, fields=fields
+            )
+        )
 
-    def get_cover(self, cover_id: int) -> RequestReturn:
+    def get_cover(
+        self, cover_id: int, fields: Iterable[str] = ("*",)
+    ) -> RequestReturn:
         """
         Get the cover of a game.
         """
-        url = f"{self.base_url}/covers"
-        data = f"fields *; where id = {cover_id};"
-
-        request, response = self.post(url, data=data)
-        response.raise_for_status()
-
-        return request, response
+        return self.fetch(self.build_get_cover(cover_id, fields=fields))
 
     def get_external_game(
-        self, external_game_ids: Iterable[int]
+        self, external_game_ids: Iterable[int], fields: Iterable[str] = ("*",)
     ) -> RequestReturn:
         """
         Get the external game data.
         """
-        url = f"{self.base_url}/external_games"
-        data = f"fields *; where id = ({','.join(str(i) for i in external_game_ids)});"
-
-        request, response = self.post(url, data=data)
-        response.raise_for_status()
-
-        return request, response
+        return self.fetch(
+            self.build_get_external_game(external_game_ids, fields=fields)
+        )
@@ -1,13 +1,57 @@
-from typing import Generator, Iterable, Optional
+from typing import Final, Generator, Iterable, Optional
 
 from requests import Session
 
-from obsidian_tools.utils.http_client import HttpClient, RequestReturn
+from obsidian_tools.utils.concurrency import map_as_completed
+from obsidian_tools.utils.http_client import (
+    ApiRequest,
+    HttpClient,
+    HttpMethod,
+    RequestReturn,
+)
+from obsidian_tools.utils.rate_limit import RateLimit
 
+# The number of ISBNs to look up in one request to the Books API, this keeps
+# the URL a reasonable length.
+BOOKS_API_BATCH_SIZE: Final = 50
 
-class OpenLibraryClient(HttpClient):
-    def __init__(self, session: Optional[Session] = None):
-        super().__init__(session=session)
+
+class OpenLibraryRequests:
+    """
+    The requests to the OpenLibrary API, shared by the `OpenLibraryClient` and
+    the `AsyncOpenLibraryClient`.
+    """
+
+    base_url: str
+
+    def build_get_book_from_isbn(self, isbn: str) -> ApiRequest:
+        return ApiRequest(HttpMethod.GET, f"{self.base_url}/isbn/{isbn}.json")
+
+    def build_get_books_from_isbns(self, isbns: Iterable[str]) -> ApiRequest:
+        return ApiRequest(
+            HttpMethod.GET,
+            f"{self.base_url}/api/books",
+            params={
+                "bibkeys": ",".join(f"ISBN:{isbn}" for isbn in isbns),
+                "jscmd": "data",
+                "format": "json",
+            },
+        )
+
+    def build_get_author(self, key: str) -> ApiRequest:
+        return ApiRequest(HttpMethod.GET, f"{self.base_url}/authors/{key}.json")
+
+    def build_get_work(self, key: str) -> ApiRequest:
+        return ApiRequest(HttpMethod.GET, f"{self.base_url}/works/{key}.json")
+
+
+class OpenLibraryClient(OpenLibraryRequests, HttpClient):
+
+    # Open Library asks identified clients to stay under 3 requests per second.
+    rate_limits = {"openlibrary.org": RateLimit(requests=3, period=1)}
+
+    def __init__(self, session: Optional[Session] = None, **kwargs):
+        super().__init__(session=session, **kwargs)
 
         self.base_url = "https://openlibrary.org"
 
@@ -15,49 +59,58 @@ class OpenLibraryClient(HttpClient):
         """
         Get a book from the OpenLibrary API using its ISBN.
         """
-        url = f"{self.base_url}/isbn/{isbn}.json"
+        return self.fetch(self.build_get_book_from_isbn(isbn), **kwargs)
 
-        request, response = self.get(url=url, **kwargs)
-        response.raise_for_status()
+    def get_books_from_isbns(
+        self, isbns: Iterable[str], **kwargs
+    ) -> RequestReturn:
+        """
+        Get several books from the OpenLibrary Books API using their ISBNs.
 
-        return request, response
+        - The response is keyed by `ISBN:{isbn}`, ISBNs that aren't found are
+          left out.
+        - See `BOOKS_API_BATCH_SIZE` for how many ISBNs to send at once.
+        """
+        return self.fetch(self.build_get_books_from_isbns(isbns), **kwargs)
 
     def get_author(self, key: str, **kwargs) -> RequestReturn:
         """
         Get an author from the OpenLibrary API using its key.
         """
-        url = f"{self.base_url}/authors/{key}.json"
-
-        request, response = self.get(url=url, **kwargs)
-        response.raise_for_status()
-
-        return request, response
+        return self.fetch(self.build_get_author(key), **kwargs)
 
     def get_authors(
-        self, author_keys: Iterable[str], **kwargs
+        self, author_keys: Iterable[str], max_workers: int = 1, **kwargs
     ) -> Generator[RequestReturn, None, None]:
         """
         Get a list of authors from OpenLibrary API using their keys.
+
+        - With more than one worker the authors are fetched concurrently and
+          yielded as they complete, not in the order of the keys.
         """
-        for author_key in author_keys:
-            yield self.get_author(key=author_key, **kwargs)
+        yield from map_as_completed(
+            lambda author_key: self.get_author(key=author_key, **kwargs),
+            author_keys,
+            max_workers=max_workers,
+        )
 
     def get_work(self, key: str, **kwargs) -> RequestReturn:
         """
         Get a work from OpenLibrary API using its key.
         """
-        url = f"{self.base_url}/works/{key}.json"
-
-        request, response = self.get(url=url, **kwargs)
-        response.raise_for_status()
-
-        return request, response
+        return self.fetch(self.build_get_work(key), **kwargs)
 
     def get_works(
-        self, work_keys: Iterable[str], **kwargs
+        self, work_keys: Iterable[str], max_workers: int = 1, **kwargs
     ) -> Generator[RequestReturn, None, None]:
         """
         Get a list of works from OpenLibrary API using their keys.
+
+        - With more than one worker the works are fetched concurrently and
+          yielded as they complete, not in the order of the keys.
         """
-        for work_key in work_keys:
-            yield self.get_work(key=work_key, **kwargs)
+        yield from map_as_completed(
+            lambda work_key: self.get_work(key=work_key, **kwargs),
+            work_keys,
+            max_workers=max_workers,
+        )
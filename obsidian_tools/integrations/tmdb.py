@@ -1,6 +1,19 @@
+from typing import Final, Generator, Iterable, Optional
+
 from requests.auth import AuthBase
 
-from obsidian_tools.utils.http_client import HttpClient, RequestReturn
+from obsidian_tools.utils.concurrency import map_concurrently
+from obsidian_tools.utils.http_client import (
+    ApiRequest,
+    HttpClient,
+    HttpMethod,
+    RequestReturn,
+)
+from obsidian_tools.utils.iterables import chunked
+from obsidian_tools.utils.rate_limit import RateLimit
+
+# TMDB allows up to 20 sub-requests in a single append_to_response.
+APPEND_TO_RESPONSE_LIMIT: Final = 20
 
 
 class TMDBAuth(AuthBase):
@@ -12,11 +25,90 @@ class TMDBAuth(AuthBase):
         return request
 
 
-class TMDBClient(HttpClient):
+class TMDBRequests:
+    """
+    The requests to The Movie Database (TMDb) API, shared by the `TMDBClient`
+    and the `AsyncTMDBClient`.
+    """
+
+    base_url: str
+
+    # Search
+    def build_search_movies(self, query: str) -> ApiRequest:
+        return ApiRequest(
+            HttpMethod.GET,
+            f"{self.base_url}/search/movie",
+            params={"query": query},
+        )
+
+    def build_search_tv_series(self, query: str) -> ApiRequest:
+        return ApiRequest(
+            HttpMethod.GET,
+            f"{self.base_url}/search/tv",
+            params={"query": query},
+        )
+
+    # Movies
+    def build_get_movie_details(self, movie_id: int) -> ApiRequest:
+        return ApiRequest(HttpMethod.GET, f"{self.base_url}/movie/{movie_id}")
+
+    # TV Series
+    def build_get_tv_series_details(
+        self,
+        series_id: int,
+        append_to_response: Optional[Iterable[str]] = None,
+    ) -> ApiRequest:
+        params = {}
+        if append_to_response:
+            params["append_to_response"] = ",".join(append_to_response)
+
+        return ApiRequest(
+            HttpMethod.GET, f"{self.base_url}/tv/{series_id}", params=params
+        )
+
+    # TV Seasons
+    def build_get_tv_season_details(
+        self, series_id: int, season_number: int
+    ) -> ApiRequest:
+        return ApiRequest(
+            HttpMethod.GET,
+            f"{self.base_url}/tv/{series_id}/season/{season_number}",
+        )
+
+    def build_get_tv_seasons_details(
+        self, series_id: int, season_numbers: Iterable[int]
+    ) -> Generator[ApiRequest, None, None]:
+        """
+        Build the TV series details requests for many TV seasons, with up to
+        20 seasons in each request's append_to_response.
+        """
+        for batch in chunked(season_numbers, APPEND_TO_RESPONSE_LIMIT):
+            yield self.build_get_tv_series_details(
+                series_id=series_id,
+                append_to_response=[
+                    f"season/{season_number}" for season_number in batch
+                ],
+            )
+
+    # TV Episodes
+    def build_get_tv_episode_details(
+        self, series_id: int, season_number: int, episode_number: int
+    ) -> ApiRequest:
+        return ApiRequest(
+            HttpMethod.GET,
+            f"{self.base_url}/tv/{series_id}/season/{season_number}"
+            f"/episode/{episode_number}",
+        )
+
+
+class TMDBClient(TMDBRequests, HttpClient):
     """
     A client for The Movie Database (TMDb) API.
     """
 
+    # TMDB allows around 50 requests per second, stay a little under it.
+    rate_limits = {"api.themoviedb.org": RateLimit(requests=40, period=1)}
+
     def __init__(self, api_key: str, api_version: int = 3, **kwargs):
         auth = TMDBAuth(api_key=api_key)
         super().__init__(auth=auth, **kwargs)
@@ -30,14 +122,7 @@ class TMDBClient(HttpClient):
 
         - Docs: https://developer.themoviedb.org/reference/search-movie
         """
-        url = f"{self.base_url}/search/movie"
-
-        params = {"query": query}
-
-        request, response = self.get(url, params=params)
-        response.raise_for_status()
-
-        return request, response
+        return self.fetch(self.build_search_movies(query))
 
     def search_tv_series(self, query: str) -> RequestReturn:
         """
@@ -45,14 +130,7 @@ class TMDBClient(HttpClient):
 
         - Docs: https://developer.themoviedb.org/reference/search-tv
         """
-        url = f"{self.base_url}/search/tv"
-
-        params = {"query": query}
-
-        request, response = self.get(url, params=params)
-        response.raise_for_status()
-
-        return request, response
+        return self.fetch(self.build_search_tv_series(query))
 
     # Movies
     def get_movie_details(self, movie_id: int) -> RequestReturn:
@@ -61,26 +139,25 @@ class TMDBClient(HttpClient):
 
         - Docs: https://developer.themoviedb.org/reference/movie-details
         """
-        url = f"{self.base_url}/movie/{movie_id}"
-
-        request, response = self.get(url)
-        response.raise_for_status()
-
-        return request, response
+        return self.fetch(self.build_get_movie_details(movie_id))
 
     # TV Series
-    def get_tv_series_details(self, series_id: int) -> RequestReturn:
+    def get_tv_series_details(
+        self,
+        series_id: int,
+        append_to_response: Optional[Iterable[str]] = None,
+    ) -> RequestReturn:
         """
         Get the details of a TV series.
 
         - Docs: https://developer.themoviedb.org/reference/tv-series-details
+        - Docs: https://developer.themoviedb.org/docs/append-to-response
         """
-        url = f"{self.base_url}/tv/{series_id}"
-
-        request, response = self.get(url)
-        response.raise_for_status()
-
-        return request, response
+        return self.fetch(
+            self.build_get_tv_series_details(
+                series_id=series_id, append_to_response=append_to_response
+            )
+        )
 
     # TV Seasons
     def get_tv_season_details(
@@ -91,12 +168,34 @@ class TMDBClient(HttpClient):
 
         - Docs: https://developer.themoviedb.org/reference/tv-season-details
         """
-        url = f"{self.base_url}/tv/{series_id}/season/{season_number}"
-
-        request, response = self.get(url)
-        response.raise_for_status()
+        return self.fetch(
+            self.build_get_tv_season_details(
+                series_id=series_id, season_number=season_number
+            )
+        )
+
+    def get_tv_seasons_details(
+        self,
+        series_id: int,
+        season_numbers: Iterable[int],
+        max_workers: int = 1,
+    ) -> Generator[RequestReturn, None, None]:
+        """
+        Get the details of many TV seasons, batching up to 20 seasons into a
+        single TV series details request with append_to_response.
 
-        return request, response
+        - Each season is in the response under the `season/{season_number}`
+          key.
+        - The batches are requested with at most `max_workers` in flight and
+          yielded in order.
+        """
+        yield from map_concurrently(
+            self.fetch,
+            self.build_get_tv_seasons_details(
+                series_id=series_id, season_numbers=season_numbers
+            ),
+            max_workers=max_workers,
+        )
 
     # TV Episodes
     def get_tv_episode_details(
@@ -107,9 +206,10 @@ class TMDBClient(HttpClient):
 
         - Docs: https://developer.themoviedb.org/reference/tv-episode-details
         """
-        url = f"{self.base_url}/tv/{series_id}/season/{season_number}/episode/{episode_number}"
-
-        request, response = self.get(url)
-        response.raise_for_status()
-
-        return request, response
+        return self.fetch(
+            self.build_get_tv_episode_details(
+                series_id=series_id,
+                season_number=season_number,
+                episode_number=episode_number,
+            )
+        )
@@ -10,6 +10,7 @@ from obsidian_tools.utils.click_utils import (
     write_option,
 )
 from obsidian_tools.utils.clock import get_start_of_week
+from obsidian_tools.utils.files import WriteStatus
 
 
 @click.group()
@@ -56,8 +57,11 @@ def add_monthly(
             )
             return None
 
-        service.write_log_note(note_file_path, note_content)
-        click.echo(f"Monthly Log Note written to: {note_file_path}")
+        _, status = service.write_log_note(note_file_path, note_content)
+        if status == WriteStatus.UNCHANGED:
+            click.echo(f"Monthly Log Note unchanged: {note_file_path}")
+        else:
+            click.echo(f"Monthly Log Note written to: {note_file_path}")
         return None
 
     click.echo(note_content)
@@ -96,8 +100,11 @@ def add_weekly(
             )
             return None
 
-        service.write_log_note(note_file_path, note_content)
-        click.echo(f"Weekly Log Note written to: {note_file_path}")
+        _, status = service.write_log_note(note_file_path, note_content)
+        if status == WriteStatus.UNCHANGED:
+            click.echo(f"Weekly Log Note unchanged: {note_file_path}")
+        else:
+            click.echo(f"Weekly Log Note written to: {note_file_path}")
         return None
 
     click.echo(note_content)
@@ -1,5 +1,6 @@
 import datetime
 from pathlib import Path
+from typing import Tuple
 
 from obsidian_tools.config import Config
 from obsidian_tools.errors import (
@@ -8,6 +9,7 @@ from obsidian_tools.errors import (
 )
 from obsidian_tools.toolbox.bujo.models import Day, Month, Week
 from obsidian_tools.utils import clock
+from obsidian_tools.utils.files import WriteStatus, write_note
 from obsidian_tools.utils.momentjs import format
 from obsidian_tools.utils.template import render_template
 
@@ -159,11 +161,12 @@ def build_weekly_log_note(date: datetime.date, config: Config) -> str:
     return content.strip()
 
 
-def write_log_note(file_path: Path, note_content: str) -> Path:
+def write_log_note(
+    file_path: Path, note_content: str
+) -> Tuple[Path, WriteStatus]:
     """
     Write the monthly log note to the vault.
     """
-    with file_path.open("w") as file_obj:
-        file_obj.write(note_content)
+    status = write_note(file_path, note_content)
 
-    return file_path
+    return file_path, status
@@ -1,9 +1,10 @@
+import json
+from collections import Counter
 from pathlib import Path
-from typing import Union
+from typing import TextIO, Tuple, Union
 
 import click
 import questionary
-from requests import HTTPError, Timeout
 
 from obsidian_tools.config import Config
 from obsidian_tools.integrations import (
@@ -11,12 +12,13 @@ from obsidian_tools.integrations import (
     GoogleBooksClient,
     IGDBClient,
     OpenLibraryClient,
-    SteamClient,
     TMDBClient,
 )
 from obsidian_tools.integrations.igdb import CategoryEnum as IGDBCategoryEnum
-from obsidian_tools.toolbox.library.models import Book
+from obsidian_tools.integrations.openlibrary import BOOKS_API_BATCH_SIZE
+from obsidian_tools.toolbox.library.clients import LibraryClients
 from obsidian_tools.toolbox.library.service import (
+    book_import,
     books,
     core,
     movies,
@@ -24,13 +26,35 @@ from obsidian_tools.toolbox.library.service import (
     video_games,
     vinyl_records,
 )
-from obsidian_tools.utils.click_utils import write_force_option, write_option
+from obsidian_tools.utils.click_utils import (
+    get_app_dir_path,
+    jobs_option,
+    max_workers_option,
+    write_force_option,
+    write_option,
+)
+from obsidian_tools.utils.concurrency import (
+    DEFAULT_MAX_WORKERS,
+    map_concurrently,
+)
 from obsidian_tools.utils.dataclasses import merge_dataclasses
+from obsidian_tools.utils.files import WriteStatus, deferred_fsync
+from obsidian_tools.utils.frontmatter_utils import (
+    NoteMetadata,
+    load_note_metadata,
+)
+from obsidian_tools.utils.iterables import ichunked
+from obsidian_tools.utils.vault_index import VaultIndex
 
 
 @click.group()
 @click.pass_context
-def cli(ctx) -> None:
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Cache API responses in the application directory.",
+)
+def cli(ctx, cache: bool) -> None:
     """
     Tools for working with a digital library in an Obsidian vault.
     """
@@ -40,31 +64,32 @@ def cli(ctx) -> None:
 
     ctx.ensure_object(dict)
 
-    # Open Library and Google Books do not require an API key.
-    ctx.obj["openlibrary_client"] = OpenLibraryClient()
-    ctx.obj["google_books_client"] = GoogleBooksClient()
+    # The vault index is opened when a command first uses it.
+    ctx.obj["vault_index_path"] = get_app_dir_path() / "vault-index.sqlite"
 
-    if config.TMDB_API_KEY is not None:
-        ctx.obj["tmdb_client"] = TMDBClient(api_key=config.TMDB_API_KEY)
+    # The clients are created when a command first uses them.
+    ctx.obj["clients"] = LibraryClients(
+        config=config,
+        http_cache_path=(
+            get_app_dir_path() / "http-cache.sqlite" if cache else None
+        ),
+        igdb_access_token_path=get_app_dir_path() / "igdb-token.json",
+    )
 
-    if config.DISCOGS_PERSONAL_ACCESS_TOKEN is not None:
-        ctx.obj["discogs_client"] = DiscogsClient(
-            auth_token=config.DISCOGS_PERSONAL_ACCESS_TOKEN
-        )
+    return None
 
-    if (
-        config.IGDB_CLIENT_ID is not None
-        and config.IGDB_CLIENT_SECRET is not None
-    ):
-        ctx.obj["igdb_client"] = IGDBClient(
-            client_id=config.IGDB_CLIENT_ID,
-            client_secret=config.IGDB_CLIENT_SECRET,
-        )
 
-    if config.STEAM_WEB_API_KEY is not None:
-        ctx.obj["steam_client"] = SteamClient(api_key=config.STEAM_WEB_API_KEY)
+def get_vault_index(ctx: click.Context) -> VaultIndex:
+    """
+    Get the index of the library notes' frontmatter, so listing them only
+    parses the notes that changed since the last run.
+
+    - It's opened the first time a command uses it.
+    """
+    if "vault_index" not in ctx.obj:
+        ctx.obj["vault_index"] = VaultIndex(ctx.obj["vault_index_path"])
 
-    return None
+    return ctx.obj["vault_index"]
 
 
 @cli.command()
@@ -77,47 +102,24 @@ def add_book(ctx: click.Context, isbn: str, write: bool, force: bool) -> None:
     Add a book to the Obsidian vault.
     """
     config: Config = ctx.obj["config"]
-    open_library_client: OpenLibraryClient = ctx.obj["openlibrary_client"]
-    google_books_client: GoogleBooksClient = ctx.obj["google_books_client"]
+    open_library_client: OpenLibraryClient = ctx.obj["clients"].openlibrary
+    google_books_client: GoogleBooksClient = ctx.obj["clients"].google_books
 
     books.ensure_required_books_config(config, write)
 
-    # Attempt to get the book's data from Open Library and Google Books.
-    ol_book: Union[Book, None] = None
-    gb_book: Union[Book, None] = None
-
-    try:
-        ol_book_data, ol_works_data, ol_authors_data = (
-            books.get_book_data_from_openlibrary(
-                isbn=isbn, client=open_library_client
-            )
-        )
-        ol_book = books.openlibrary_data_to_dataclass(
-            book_data=ol_book_data,
-            works_data=ol_works_data,
-            authors_data=ol_authors_data,
-        )
-    except Timeout:
-        click.echo("Open Library request timed out.", err=True)
-    except HTTPError as http_error:
-        if http_error.response.status_code != 404:
-            raise http_error
-
-        click.echo("Book not found on Open Library.", err=True)
+    # Get the book's data from Open Library and Google Books at the same
+    # time.
+    ol_result, gb_result = books.get_book_from_sources(
+        isbn=isbn,
+        openlibrary_client=open_library_client,
+        google_books_client=google_books_client,
+    )
 
-    try:
-        gb_book_data = books.get_book_data_from_google_books(
-            isbn=isbn, client=google_books_client
-        )
-        if gb_book_data is not None:
-            gb_book = books.google_books_data_to_dataclass(gb_book_data)
-    except Timeout:
-        click.echo("Google Books request timed out.", err=True)
-    except HTTPError as http_error:
-        if http_error.response.status_code != 404:
-            raise http_error
+    for result in (ol_result, gb_result):
+        if result.message is not None:
+            click.echo(result.message, err=True)
 
-        click.echo("Book not found on Google Books.", err=True)
+    ol_book, gb_book = ol_result.book, gb_result.book
 
     # If no book data is found, raise an exception.
     if gb_book is None and ol_book is None:
@@ -134,9 +136,15 @@ def add_book(ctx: click.Context, isbn: str, write: bool, force: bool) -> None:
     note_content = books.build_book_note(book=book)
 
     if write is True:
-        note_path = books.build_book_note_path(
-            note_name=note_name, config=config
+        # Update the book's existing note, whatever it is called.
+        external_id_index = core.build_external_id_index(
+            config.BOOKS_DIR_PATH, vault_index=get_vault_index(ctx)
         )
+        note_path = external_id_index.find(
+            isbn_13=book.isbn,
+            google_book_id=book.google_book_id,
+            openlibrary_book_id=book.openlibrary_book_id,
+        ) or books.build_book_note_path(note_name=note_name, config=config)
 
         if note_path.exists() is True and force is False:
             click.confirm(
@@ -144,32 +152,105 @@ def add_book(ctx: click.Context, isbn: str, write: bool, force: bool) -> None:
                 abort=True,
             )
 
-        note_file_path = books.write_book_note(
+        note_file_path, status = books.write_book_note(
             note_path=note_path,
             note_content=note_content,
             config=config,
         )
+        if status == WriteStatus.UNCHANGED:
+            return click.echo(f"Book unchanged at {note_file_path}")
         return click.echo(f"Book written to {note_file_path}")
 
     return click.echo(note_content)
 
 
+@cli.command()
+@click.pass_context
+@click.argument(
+    "source", type=click.File("r", encoding="utf-8-sig"), default="-"
+)
+@click.option(
+    "--log",
+    "log_file",
+    type=click.File("w"),
+    default="-",
+    help="File to write the JSON lines result log to.",
+)
+@write_option
+@write_force_option
+@jobs_option
+def import_books(
+    ctx: click.Context,
+    source: TextIO,
+    log_file: TextIO,
+    write: bool,
+    force: bool,
+    jobs: int,
+) -> None:
+    """
+    Import books from a list of ISBNs or a Goodreads/LibraryThing CSV export.
+
+    Reads from standard input if no SOURCE is given. A JSON object is logged
+    for each ISBN with its status: created, updated, unchanged, found (without
+    --write), skipped, not_found, invalid or failed.
+    """
+    config: Config = ctx.obj["config"]
+    clients: LibraryClients = ctx.obj["clients"]
+
+    books.ensure_required_books_config(config, write)
+
+    importer = book_import.BookImporter(
+        config=config,
+        openlibrary_client=clients.openlibrary,
+        google_books_client=clients.google_books,
+        external_id_index=core.build_external_id_index(
+            config.BOOKS_DIR_PATH, vault_index=get_vault_index(ctx)
+        ),
+        write=write,
+        force=force,
+    )
+
+    # The ISBNs are read in batches, each batch is looked up on Open Library
+    # and Google Books in bulk, and then the books are imported by a pool of
+    # workers. The results are logged in the same order as the ISBNs.
+    summary: Counter[str] = Counter()
+    with deferred_fsync():
+        for batch in ichunked(
+            book_import.read_isbns(source), BOOKS_API_BATCH_SIZE
+        ):
+            importer.prefetch(batch)
+
+            for result in map_concurrently(
+                importer.import_book, batch, max_workers=jobs
+            ):
+                summary[result["status"]] += 1
+                click.echo(json.dumps(result), file=log_file)
+
+    click.echo(
+        ", ".join(f"{count} {status}" for status, count in summary.items())
+        or "No ISBNs found.",
+        err=True,
+    )
+
+
 @cli.command()
 @click.pass_context
 @click.argument("search_query", type=str, required=False)
 @click.option("--tmdb-id", type=int)
 @write_option
+@max_workers_option
 def add_tv_show(
     ctx: click.Context,
     search_query: Union[str, None],
     tmdb_id: Union[int, None],
     write: bool = False,
+    max_workers: int = DEFAULT_MAX_WORKERS,
 ) -> None:
     """
     Add a TV show to the Obsidian vault.
     """
     config: Config = ctx.obj["config"]
-    client: TMDBClient = ctx.obj["tmdb_client"]
+    client: TMDBClient = ctx.obj["clients"].tmdb
 
     tv_shows.ensure_required_tv_shows_config(config, write)
 
@@ -199,6 +280,7 @@ def add_tv_show(
         *tv_shows.get_tv_show_data_from_tmdb(
             tv_series_id=tmdb_id,
             client=client,
+            max_workers=max_workers,
         )
     )
 
@@ -206,14 +288,20 @@ def add_tv_show(
     note_content = tv_shows.build_tv_show_note(tv_show)
 
     if write is True:
-        note_path = tv_shows.build_tv_show_note_path(
+        # Update the TV show's existing note, whatever it is called.
+        external_id_index = core.build_external_id_index(
+            config.TV_SHOWS_DIR_PATH, vault_index=get_vault_index(ctx)
+        )
+        existing_note_path = external_id_index.get("tmdb_id", tv_show.tmdb_id)
+
+        note_path = existing_note_path or tv_shows.build_tv_show_note_path(
             note_name=note_name, config=config
         )
 
-        if note_path.exists() is True:
-            existing_note = tv_shows.load_tv_show_note(note_path)
+        if existing_note_path is None and note_path.exists() is True:
+            existing_metadata = load_note_metadata(note_path)
 
-            if tv_shows.is_same_tv_show(tv_show, existing_note) is False:
+            if tv_shows.is_same_tv_show(tv_show, existing_metadata) is False:
                 alt_note_names = tv_shows.list_alternative_note_names(
                     tv_show, config=config
                 )
@@ -254,12 +342,14 @@ def add_tv_show(
                             note_name=alt_note_name, config=config
                         )
 
-        note_file_path = tv_shows.write_tv_show_note(
+        note_file_path, status = tv_shows.write_tv_show_note(
             file_path=note_path,
             note_content=note_content,
             config=config,
         )
 
+        if status == WriteStatus.UNCHANGED:
+            return click.echo(f"TV show unchanged at {note_file_path}")
         return click.echo(f"TV show written to {note_file_path}")
 
     return click.echo(note_content)
@@ -267,36 +357,71 @@ def add_tv_show(
 
 @cli.command()
 @click.pass_context
-def update_tv_shows(ctx: click.Context) -> None:
+@max_workers_option
+@jobs_option
+def update_tv_shows(ctx: click.Context, max_workers: int, jobs: int) -> None:
     """
     Update TV show notes in the Obsidian vault.
     """
     config: Config = ctx.obj["config"]
-    client: TMDBClient = ctx.obj["tmdb_client"]
+    client: TMDBClient = ctx.obj["clients"].tmdb
 
     tv_shows.ensure_required_tv_shows_config(config, write=True)
 
-    for path, post in tv_shows.list_tv_show_paths(config, has_tmdb_id=True):
-        tv_series_data_from_tmdb, tv_seasons_data_from_tmdb = (
-            tv_shows.get_tv_show_data_from_tmdb(
-                tv_series_id=int(post["tmdb_id"]),
+    def update_tv_show(
+        path_and_metadata: Tuple[Path, NoteMetadata]
+    ) -> Tuple[Path, Union[WriteStatus, None], Union[Exception, None]]:
+        path, metadata = path_and_metadata
+
+        try:
+            status = tv_shows.update_tv_show_note(
+                file_path=path,
+                tv_series_id=int(metadata["tmdb_id"]),
                 client=client,
+                config=config,
+                max_workers=max_workers,
+                number_of_seasons=(
+                    int(metadata["number_of_seasons"])
+                    if "number_of_seasons" in metadata
+                    else None
+                ),
             )
-        )
-        tv_show = tv_shows.tmdb_tv_show_data_to_dataclasses(
-            tv_series=tv_series_data_from_tmdb,
-            tv_seasons=tv_seasons_data_from_tmdb,
-        )
-
-        note_content = tv_shows.build_tv_show_note(tv_show)
-
-        tv_shows.write_tv_show_note(
-            file_path=path,
-            note_content=note_content,
-            config=config,
-        )
-
-        click.echo(f"Updated {path}")
+        # A show that fails for any reason is reported, and the other shows
+        # are still updated.
+        except Exception as error:
+            return path, None, error
+
+        return path, status, None
+
+    # The notes are updated by a pool of workers, but the results are reported
+    # in the same order as the notes are listed.
+    summary: Counter[str] = Counter()
+    with deferred_fsync():
+        for path, status, error in map_concurrently(
+            update_tv_show,
+            tv_shows.list_tv_show_paths(
+                config, has_tmdb_id=True, vault_index=get_vault_index(ctx)
+            ),
+            max_workers=jobs,
+        ):
+            if error is not None:
+                summary["failed"] += 1
+                click.echo(
+                    f"Failed to update {path}: "
+                    f"{str(error) or type(error).__name__}",
+                    err=True,
+                )
+            elif status == WriteStatus.UNCHANGED:
+                summary["unchanged"] += 1
+                click.echo(f"Unchanged {path}")
+            else:
+                summary["updated"] += 1
+                click.echo(f"Updated {path}")
+
+    click.echo(
+        f"{summary['updated']} updated, {summary['unchanged']} unchanged, "
+        f"{summary['failed']} failed."
+    )
 
 
 @cli.command()
@@ -314,7 +439,7 @@ def add_movie(
     Add a Movie to the Obsidian vault.
     """
     config: Config = ctx.obj["config"]
-    client: TMDBClient = ctx.obj["tmdb_client"]
+    client: TMDBClient = ctx.obj["clients"].tmdb
 
     movies.ensure_required_movies_config(config=config, write=write)
 
@@ -356,14 +481,20 @@ def add_movie(
     note_content = movies.build_movie_note(movie=movie)
 
     if write is True:
-        note_path = movies.build_movie_note_path(
+        # Update the movie's existing note, whatever it is called.
+        external_id_index = core.build_external_id_index(
+            config.MOVIES_DIR_PATH, vault_index=get_vault_index(ctx)
+        )
+        existing_note_path = external_id_index.get("tmdb_id", movie.tmdb_id)
+
+        note_path = existing_note_path or movies.build_movie_note_path(
             note_name=note_name, config=config
         )
 
-        if note_path.exists() is True:
-            existing_note = movies.load_movie_note(note_path)
+        if existing_note_path is None and note_path.exists() is True:
+            existing_metadata = load_note_metadata(note_path)
 
-            if movies.is_same_movie(movie, existing_note) is False:
+            if movies.is_same_movie(movie, existing_metadata) is False:
                 alt_note_names = movies.list_alternative_note_names(
                     movie, config=config
                 )
@@ -403,12 +534,14 @@ def add_movie(
                             note_name=alt_note_name, config=config
                         )
 
-        movies.write_movie_note(
+        _, status = movies.write_movie_note(
             note_path=note_path,
             note_content=note_content,
             config=config,
         )
 
+        if status == WriteStatus.UNCHANGED:
+            return click.echo(f"Movie unchanged at {note_path}")
         return click.echo(f"Movie written to {note_path}")
 
     return click.echo(note_content)
@@ -431,7 +564,7 @@ def add_vinyl(
     Add a vinyl record to the Obsidian vault.
     """
     config: Config = ctx.obj["config"]
-    client: DiscogsClient = ctx.obj["discogs_client"]
+    client: DiscogsClient = ctx.obj["clients"].discogs
 
     movies.ensure_required_movies_config(config, write=write)
 
@@ -470,18 +603,27 @@ def add_vinyl(
         )
     )
 
-    note_name = vinyl_record.title
-    if vinyl_record.artists:
-        note_name += f" - {vinyl_record.display_artists}"
-
+    note_name = vinyl_records.build_vinyl_note_name(vinyl_record)
     note_content = vinyl_records.build_vinyl_note(vinyl_record=vinyl_record)
 
     if write is True:
-        note_file_path = vinyl_records.write_vinyl_note(
-            note_name=note_name,
+        # Update the vinyl record's existing note, whatever it is called.
+        external_id_index = core.build_external_id_index(
+            config.VINYL_RECORDS_DIR_PATH, vault_index=get_vault_index(ctx)
+        )
+        note_path = external_id_index.get(
+            "discogs_id", vinyl_record.discogs_id
+        ) or vinyl_records.build_vinyl_note_path(
+            note_name=note_name, config=config
+        )
+
+        note_file_path, status = vinyl_records.write_vinyl_note(
+            note_path=note_path,
             note_content=note_content,
             config=config,
         )
+        if status == WriteStatus.UNCHANGED:
+            return click.echo(f"Vinyl record unchanged at {note_file_path}")
         return click.echo(f"Vinyl record written to {note_file_path}")
 
     return click.echo(note_content)
@@ -506,11 +648,12 @@ def add_video_game(
     Add a video game to the Obsidian vault.
     """
     config: Config = ctx.obj["config"]
-    igdb_client: IGDBClient = ctx.obj["igdb_client"]
-    steam_client: SteamClient = ctx.obj["steam_client"]
+    clients: LibraryClients = ctx.obj["clients"]
 
     video_games.ensure_required_video_game_config(config)
 
+    igdb_client: IGDBClient = clients.igdb
+
     # If not search query, IGDB ID, or Steam ID is provided, prompt the user
     # for a search query.
     if search_query is None and igdb_id is None and steam_id is None:
@@ -540,7 +683,9 @@ def add_video_game(
     elif steam_id is not None:
         steam_video_game = video_games.steam_data_to_dataclass(
             video_games.get_game_data_from_steam(
-                client=steam_client, app_id=steam_id
+                # The Steam client is optional, so it's only created here.
+                client=clients.steam,
+                app_id=steam_id,
             )
         )
         igdb_game_id = video_games.get_igdb_game_id_from_external_game_id(
@@ -563,16 +708,28 @@ def add_video_game(
     )
 
     if write is True:
-        note_path = video_games.build_video_game_note_path(
-            note_name=note_name,
-            config=config,
+        # Update the video game's existing note, whatever it is called.
+        external_id_index = core.build_external_id_index(
+            config.VIDEO_GAMES_DIR_PATH, vault_index=get_vault_index(ctx)
+        )
+        existing_note_path = external_id_index.find(
+            igdb_id=video_game.igdb_id,
+            steam_id=video_game.steam_id,
+        )
+
+        note_path = (
+            existing_note_path
+            or video_games.build_video_game_note_path(
+                note_name=note_name,
+                config=config,
+            )
         )
 
-        if note_path.exists() is True:
-            existing_note = video_games.load_video_game(note_path)
+        if existing_note_path is None and note_path.exists() is True:
+            existing_metadata = load_note_metadata(note_path)
 
             if (
-                video_games.is_same_video_game(video_game, existing_note)
+                video_games.is_same_video_game(video_game, existing_metadata)
                 is False
             ):
                 alt_note_names = video_games.list_alternative_note_names(
@@ -614,11 +771,13 @@ def add_video_game(
                             note_name=alt_note_name, config=config
                         )
 
-        video_games.write_video_game(
+        _, status = video_games.write_video_game(
             note_path=note_path,
             note_content=note_content,
             config=config,
         )
+        if status == WriteStatus.UNCHANGED:
+            return click.echo(f"Video game unchanged at {note_path}")
         return click.echo(f"Video game written to {note_path}")
 
     return click.echo(note_content)
@@ -0,0 +1,134 @@
+"""
+This module provides the API clients for the library commands.
+
+- The clients are created the first time a command uses them, so a command
+  only pays for the integrations it touches. Creating the IGDB client, for
+  example, makes a request to Twitch to get an access token.
+- All the clients share one session, so they share its connection pools.
+- Each client memoizes its successful GET responses for the run, so the
+  works and authors shared by many books are only requested once.
+"""
+
+from functools import cached_property
+from pathlib import Path
+from typing import Union
+
+from requests import Session
+
+from obsidian_tools.config import Config
+from obsidian_tools.errors import ObsidianToolsConfigError
+from obsidian_tools.integrations import (
+    DiscogsClient,
+    GoogleBooksClient,
+    IGDBClient,
+    OpenLibraryClient,
+    SteamClient,
+    TMDBClient,
+)
+from obsidian_tools.utils.http_cache import SQLiteHttpCache
+from obsidian_tools.utils.http_client import DEFAULT_MEMO_SIZE, build_session
+
+
+class LibraryClients:
+    """
+    A registry of the API clients, created lazily on first use.
+
+    - Accessing a client that isn't configured raises an
+      `ObsidianToolsConfigError` for the missing configuration value.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        http_cache_path: Union[Path, None] = None,
+        igdb_access_token_path: Union[Path, None] = None,
+    ):
+        self.config = config
+        self.http_cache_path = http_cache_path
+        self.igdb_access_token_path = igdb_access_token_path
+
+    @cached_property
+    def http_cache(self) -> Union[SQLiteHttpCache, None]:
+        """
+        The response cache shared by all the clients.
+        """
+        if self.http_cache_path is None:
+            return None
+
+        return SQLiteHttpCache(self.http_cache_path)
+
+    @cached_property
+    def session(self) -> Session:
+        """
+        The session shared by all the clients.
+        """
+        return build_session()
+
+    @cached_property
+    def openlibrary(self) -> OpenLibraryClient:
+        return OpenLibraryClient(
+            session=self.session,
+            cache=self.http_cache,
+            memo_size=DEFAULT_MEMO_SIZE,
+        )
+
+    @cached_property
+    def google_books(self) -> GoogleBooksClient:
+        return GoogleBooksClient(
+            session=self.session,
+            cache=self.http_cache,
+            memo_size=DEFAULT_MEMO_SIZE,
+        )
+
+    @cached_property
+    def tmdb(self) -> TMDBClient:
+        if self.config.TMDB_API_KEY is None:
+            raise ObsidianToolsConfigError("TMDB_API_KEY")
+
+        return TMDBClient(
+            api_key=self.config.TMDB_API_KEY,
+            session=self.session,
+            cache=self.http_cache,
+            memo_size=DEFAULT_MEMO_SIZE,
+        )
+
+    @cached_property
+    def discogs(self) -> DiscogsClient:
+        if self.config.DISCOGS_PERSONAL_ACCESS_TOKEN is None:
+            raise ObsidianToolsConfigError("DISCOGS_PERSONAL_ACCESS_TOKEN")
+
+        return DiscogsClient(
+            auth_token=self.config.DISCOGS_PERSONAL_ACCESS_TOKEN,
+            session=self.session,
+            cache=self.http_cache,
+            memo_size=DEFAULT_MEMO_SIZE,
+        )
+
+    @cached_property
+    def igdb(self) -> IGDBClient:
+        if self.config.IGDB_CLIENT_ID is None:
+            raise ObsidianToolsConfigError("IGDB_CLIENT_ID")
+
+        if self.config.IGDB_CLIENT_SECRET is None:
+            raise ObsidianToolsConfigError("IGDB_CLIENT_SECRET")
+
+        return IGDBClient(
+            client_id=self.config.IGDB_CLIENT_ID,
+            client_secret=self.config.IGDB_CLIENT_SECRET,
+            access_token_path=self.igdb_access_token_path,
+            session=self.session,
+            cache=self.http_cache,
+            memo_size=DEFAULT_MEMO_SIZE,
+        )
+
+    @cached_property
+    def steam(self) -> SteamClient:
+        if self.config.STEAM_WEB_API_KEY is None:
+            raise ObsidianToolsConfigError("STEAM_WEB_API_KEY")
+
+        return SteamClient(
+            api_key=self.config.STEAM_WEB_API_KEY,
+            session=self.session,
+            cache=self.http_cache,
+            memo_size=DEFAULT_MEMO_SIZE,
+        )
@@ -0,0 +1,397 @@
+"""
+This module provides the pipeline for importing books in bulk.
+
+- ISBNs are read from a plain list, one per line, or from a Goodreads or
+  LibraryThing CSV export.
+- Each ISBN is looked up, merged, rendered and written on its own, so one bad
+  ISBN doesn't stop the import.
+"""
+
+import csv
+import re
+import threading
+import typing as t
+from itertools import chain
+from pathlib import Path
+
+from requests import RequestException
+
+from obsidian_tools.config import Config
+from obsidian_tools.integrations import GoogleBooksClient, OpenLibraryClient
+from obsidian_tools.toolbox.library.models import Book
+from obsidian_tools.toolbox.library.service import books
+from obsidian_tools.toolbox.library.service.core import ExternalIdIndex
+from obsidian_tools.utils.dataclasses import merge_dataclasses
+from obsidian_tools.utils.frontmatter_utils import load_note_metadata
+
+# The columns Goodreads (ISBN13, ISBN) and LibraryThing (ISBNs, ISBN) use for
+# ISBNs, in order of preference.
+ISBN_CSV_COLUMNS: t.Final = ("ISBN13", "ISBN", "ISBNs")
+
+RE_ISBN = re.compile(r"^(\d{13}|\d{9}[\dX])$")
+RE_ISBN_LIST_SEPARATORS = re.compile(r"[\[\],;\s]+")
+
+
+class ImportBookResult(t.TypedDict):
+    isbn: str
+    status: str
+    path: t.Optional[str]
+    title: t.Optional[str]
+    messages: t.List[str]
+
+
+def normalize_isbn(value: str) -> t.Union[str, None]:
+    """
+    Normalize an ISBN, returns None if it isn't a valid looking ISBN-10 or
+    ISBN-13.
+
+    - Goodreads wraps ISBNs in `="..."` so spreadsheets keep the leading zero.
+    """
+    value = value.strip()
+    if value.startswith('="') and value.endswith('"'):
+        value = value[2:-1]
+
+    value = value.replace("-", "").replace(" ", "").upper()
+
+    if RE_ISBN.match(value) is None:
+        return None
+
+    return value
+
+
+def get_isbn_from_csv_row(row: t.Dict[str, t.Any]) -> t.Union[str, None]:
+    """
+    Get the first ISBN from a row of a Goodreads or LibraryThing export.
+    """
+    for column in ISBN_CSV_COLUMNS:
+        value = row.get(column) or ""
+
+        # LibraryThing lists all the ISBNs in one column.
+        for candidate in RE_ISBN_LIST_SEPARATORS.split(value):
+            isbn = normalize_isbn(candidate)
+            if isbn is not None:
+                return isbn
+
+    return None
+
+
+def read_isbns(lines: t.Iterable[str]) -> t.Generator[str, None, None]:
+    """
+    Read the ISBNs from a list of ISBNs or a CSV export, skipping duplicates.
+
+    - The input is read as a CSV export if the first line has one of the ISBN
+      columns in it.
+    - Lines in a plain list are yielded as they are, even if they aren't a
+      valid ISBN, so they are reported by the import.
+    """
+    lines = iter(lines)
+    first_line = next(lines, None)
+    if first_line is None:
+        return None
+
+    header = next(csv.reader([first_line]), [])
+    is_csv = any(column in header for column in ISBN_CSV_COLUMNS)
+
+    values: t.Iterable[t.Union[str, None]]
+    if is_csv:
+        values = (
+            get_isbn_from_csv_row(row)
+            for row in csv.DictReader(chain([first_line], lines))
+        )
+    else:
+        values = (line.strip() for line in chain([first_line], lines))
+
+    seen = set()
+    for value in values:
+        if not value:
+            continue
+
+        key = normalize_isbn(value) or value
+        if key in seen:
+            continue
+
+        seen.add(key)
+        yield value
+
+
+class BookImporter:
+    """
+    Import books by ISBN into the books directory.
+
+    - `import_book` is safe to call from several threads.
+    - Notes are matched to existing notes by their external identifiers. An
+      existing note with the same name for a different book is only
+      overwritten with `force`.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        openlibrary_client: OpenLibraryClient,
+        google_books_client: GoogleBooksClient,
+        external_id_index: ExternalIdIndex,
+        write: bool = False,
+        force: bool = False,
+    ):
+        self.config = config
+        self.openlibrary_client = openlibrary_client
+        self.google_books_client = google_books_client
+        self.external_id_index = external_id_index
+        self.write = write
+        self.force = force
+
+        # The paths written in this import, so two editions with the same
+        # title don't overwrite each other.
+        self._lock = threading.Lock()
+        self._claimed_paths: t.Set[Path] = set()
+
+        # The books looked up in bulk, see `prefetch`. ISBNs that were looked
+        # up and not found map to None.
+        self._openlibrary_books: t.Dict[str, t.Union[Book, None]] = {}
+        self._google_books_data: t.Dict[
+            str, t.Union[t.Dict[str, t.Any], None]
+        ] = {}
+
+    def prefetch(self, values: t.Iterable[str]) -> None:
+        """
+        Look up a batch of ISBNs on Open Library and Google Books in bulk,
+        ahead of importing them.
+
+        - Open Library is asked for `BOOKS_API_BATCH_SIZE` ISBNs per request
+          and Google Books for `ISBN_BATCH_SIZE` ISBNs per search.
+        - ISBNs the Google Books search misses aren't looked up here, they
+          are looked up on their own by `import_book`.
+        - If a bulk lookup fails, the books are looked up one at a time by
+          `import_book` instead.
+        - Open Library's Books API has no descriptions, books that have none
+          from Google Books either are looked up in full by `import_book`.
+        """
+        isbns = [isbn for isbn in map(normalize_isbn, values) if isbn]
+
+        ol_isbns = [i for i in isbns if i not in self._openlibrary_books]
+        if ol_isbns:
+            try:
+                found_books = books.get_books_from_openlibrary(
+                    isbns=ol_isbns, client=self.openlibrary_client
+                )
+            except (RequestException, KeyError, ValueError):
+                pass
+            else:
+                with self._lock:
+                    for isbn in ol_isbns:
+                        self._openlibrary_books[isbn] = found_books.get(isbn)
+
+        gb_isbns = [i for i in isbns if i not in self._google_books_data]
+        if gb_isbns:
+            try:
+                found_books_data = books.get_books_data_from_google_books(
+                    isbns=gb_isbns,
+                    client=self.google_books_client,
+                    lookup_misses=False,
+                )
+            except (RequestException, KeyError, ValueError):
+                pass
+            else:
+                # The batch search misses some ISBNs that a lookup of its own
+                # finds, those are left to `import_book` in the worker pool.
+                with self._lock:
+                    self._google_books_data.update(found_books_data)
+
+    def import_book(self, value: str) -> ImportBookResult:
+        """
+        Import a book, returning the result instead of raising errors.
+
+        - Any error importing the book, like a bad response or a note with
+          invalid frontmatter, is recorded as failed so the other books are
+          still imported.
+        """
+        result: ImportBookResult = {
+            "isbn": value,
+            "status": "failed",
+            "path": None,
+            "title": None,
+            "messages": [],
+        }
+
+        isbn = normalize_isbn(value)
+        if isbn is None:
+            result["status"] = "invalid"
+            return result
+
+        result["isbn"] = isbn
+
+        try:
+            self._import_book(isbn, result)
+        except Exception as error:
+            result["status"] = "failed"
+            result["messages"].append(str(error) or type(error).__name__)
+
+        return result
+
+    def get_book_from_sources(
+        self, isbn: str
+    ) -> t.Tuple[books.BookSourceResult, books.BookSourceResult]:
+        """
+        Get the book from Open Library and Google Books, using the prefetched
+        books if there are any.
+        """
+        with self._lock:
+            is_ol_prefetched = isbn in self._openlibrary_books
+            ol_book = self._openlibrary_books.get(isbn)
+            is_gb_prefetched = isbn in self._google_books_data
+            gb_book_data = self._google_books_data.get(isbn)
+
+        if is_ol_prefetched is False and is_gb_prefetched is False:
+            return books.get_book_from_sources(
+                isbn=isbn,
+                openlibrary_client=self.openlibrary_client,
+                google_books_client=self.google_books_client,
+            )
+
+        if is_ol_prefetched is True:
+            ol_result = books.BookSourceResult(
+                book=ol_book,
+                message=(
+                    "Book not found on Open Library."
+                    if ol_book is None
+                    else None
+                ),
+            )
+        else:
+            ol_result = books.get_book_from_source(
+                "Open Library",
+                lambda: books.get_book_from_openlibrary(
+                    isbn=isbn, client=self.openlibrary_client
+                ),
+            )
+
+        if is_gb_prefetched is True:
+            gb_result = books.BookSourceResult(
+                book=(
+                    books.google_books_data_to_dataclass(gb_book_data)
+                    if gb_book_data is not None
+                    else None
+                ),
+                message=(
+                    "Book not found on Google Books."
+                    if gb_book_data is None
+                    else None
+                ),
+            )
+        else:
+            gb_result = books.get_book_from_source(
+                "Google Books",
+                lambda: books.get_book_from_google_books(
+                    isbn=isbn, client=self.google_books_client
+                ),
+            )
+
+        # The Books API doesn't include the work, so a prefetched book has no
+        # description. Look it up in full, like add-book does, unless Google
+        # Books has a description.
+        if (
+            is_ol_prefetched is True
+            and ol_book is not None
+            and ol_book.description is None
+            and (gb_result.book is None or gb_result.book.description is None)
+        ):
+            ol_result = self.get_full_book_from_openlibrary(isbn, ol_result)
+
+        return ol_result, gb_result
+
+    def get_full_book_from_openlibrary(
+        self, isbn: str, ol_result: books.BookSourceResult
+    ) -> books.BookSourceResult:
+        """
+        Get the book from Open Library with its works and authors, keeping the
+        prefetched result if the lookup fails.
+        """
+        try:
+            full_ol_result = books.get_book_from_source(
+                "Open Library",
+                lambda: books.get_book_from_openlibrary(
+                    isbn=isbn, client=self.openlibrary_client
+                ),
+            )
+        # A work or author with an unexpected shape fails the lookup too.
+        except (RequestException, KeyError, ValueError):
+            return ol_result
+
+        if full_ol_result.book is None:
+            return ol_result
+
+        return full_ol_result
+
+    def _import_book(self, isbn: str, result: ImportBookResult) -> None:
+        ol_result, gb_result = self.get_book_from_sources(isbn)
+        result["messages"].extend(
+            source_result.message
+            for source_result in (ol_result, gb_result)
+            if source_result.message is not None
+        )
+
+        if ol_result.book is not None and gb_result.book is not None:
+            book = merge_dataclasses(ol_result.book, gb_result.book)
+        else:
+            book = ol_result.book or gb_result.book
+
+        if book is None:
+            result["status"] = "not_found"
+            return None
+
+        result["title"] = book.title
+
+        if self.write is False:
+            result["status"] = "found"
+            return None
+
+        note_path = self.get_note_path(book)
+        if note_path is None:
+            result["status"] = "skipped"
+            return None
+
+        result["path"] = str(note_path)
+
+        _, status = books.write_book_note(
+            note_path=note_path,
+            note_content=books.build_book_note(book=book),
+            config=self.config,
+        )
+        result["status"] = status.value
+
+        with self._lock:
+            self.external_id_index.add(
+                note_path, books.build_book_note_metadata(book)
+            )
+
+    def get_note_path(self, book: Book) -> t.Union[Path, None]:
+        """
+        Get the path to write the book to, or None if it should be skipped.
+        """
+        with self._lock:
+            existing_note_path = self.external_id_index.find(
+                isbn_13=book.isbn,
+                google_book_id=book.google_book_id,
+                openlibrary_book_id=book.openlibrary_book_id,
+            )
+            note_path = existing_note_path or books.build_book_note_path(
+                note_name=books.build_book_note_name(book=book),
+                config=self.config,
+            )
+
+            # Another book in this import already has the path.
+            if note_path in self._claimed_paths:
+                return None
+
+            if (
+                existing_note_path is None
+                and note_path.exists() is True
+                and self.force is False
+                and books.is_same_book(book, load_note_metadata(note_path))
+                is False
+            ):
+                return None
+
+            self._claimed_paths.add(note_path)
+
+        return note_path
@@ -1,18 +1,36 @@
 import logging
 import typing as t
+from concurrent.futures import wait
+from functools import partial
 from pathlib import Path
 
 import frontmatter
+from requests import HTTPError, PreparedRequest, Timeout
 from sanitize_filename import sanitize
 
 from obsidian_tools.config import Config
 from obsidian_tools.errors import ObsidianToolsConfigError
 from obsidian_tools.integrations import GoogleBooksClient, OpenLibraryClient
+from obsidian_tools.integrations.google_books import (
+    ISBN_BATCH_SIZE as GOOGLE_BOOKS_ISBN_BATCH_SIZE,
+)
+from obsidian_tools.integrations.openlibrary import BOOKS_API_BATCH_SIZE
 from obsidian_tools.toolbox.library.models import Book, Person
+from obsidian_tools.utils.concurrency import DEFAULT_MAX_WORKERS, submit_daemon
+from obsidian_tools.utils.files import WriteStatus, write_note
+from obsidian_tools.utils.frontmatter_utils import (
+    NoteMetadata,
+    load_note_metadata,
+)
+from obsidian_tools.utils.iterables import ichunked
 from obsidian_tools.utils.template import render_template
+from obsidian_tools.utils.vault_index import VaultIndex
 
 logger = logging.getLogger(__name__)
 
+# The longest add-book waits for Open Library and Google Books, in seconds.
+BOOK_SOURCES_DEADLINE: t.Final = 60
+
 
 def ensure_required_books_config(config: Config, write: bool) -> bool:
     """
@@ -36,36 +54,55 @@ def search_books_on_google_boocks(
     return resp.json()["items"]
 
 
+def get_openlibrary_key(request: PreparedRequest) -> str:
+    """
+    Get the Open Library key from the URL of a work or author request.
+    """
+    return request.path_url.rsplit("/", 1)[-1].removesuffix(".json")
+
+
 def get_book_data_from_openlibrary(
     isbn: str,
     client: OpenLibraryClient,
+    max_workers: int = DEFAULT_MAX_WORKERS,
 ) -> t.Tuple[
     t.Dict[str, t.Any], t.List[t.Dict[str, t.Any]], t.List[t.Dict[str, t.Any]]
 ]:
     """
     Get the book data from Open Library.
+
+    - The works, and then the authors, are fetched concurrently. They are
+      returned in the order the book and works list them.
     """
     _, resp_book = client.get_book_from_isbn(isbn=isbn)
     book = resp_book.json()
 
-    author_keys = []
     work_keys = [work["key"].replace("/works/", "") for work in book["works"]]
 
-    works = []
-    for _, resp_work in client.get_works(work_keys=work_keys):
-        work = resp_work.json()
-        works.append(work)
-
-        author_keys.extend(
-            [
-                author["author"]["key"].replace("/authors/", "")
-                for author in work["authors"]
-            ]
+    works_by_key = {
+        get_openlibrary_key(request): response.json()
+        for request, response in client.get_works(
+            work_keys=work_keys, max_workers=max_workers
         )
+    }
+    works = [works_by_key[work_key] for work_key in work_keys]
+
+    # Co-authors are often listed on more than one work, only fetch them once.
+    author_keys = list(
+        dict.fromkeys(
+            author["author"]["key"].replace("/authors/", "")
+            for work in works
+            for author in work["authors"]
+        )
+    )
 
-    authors = []
-    for _, resp_author in client.get_authors(author_keys=set(author_keys)):
-        authors.append(resp_author.json())
+    authors_by_key = {
+        get_openlibrary_key(request): response.json()
+        for request, response in client.get_authors(
+            author_keys=author_keys, max_workers=max_workers
+        )
+    }
+    authors = [authors_by_key[author_key] for author_key in author_keys]
 
     return book, works, authors
 
@@ -91,6 +128,56 @@ def get_book_data_from_google_books(
     return data["items"][0]
 
 
+def get_google_books_isbns(book_data: t.Dict[str, t.Any]) -> t.List[str]:
+    """
+    Get the ISBN-10 and ISBN-13 of a Google Books volume.
+    """
+    return [
+        identifier["identifier"]
+        for identifier in book_data["volumeInfo"].get("industryIdentifiers", [])
+        if identifier["type"] in ("ISBN_10", "ISBN_13")
+    ]
+
+
+def get_books_data_from_google_books(
+    isbns: t.Iterable[str],
+    client: GoogleBooksClient,
+    batch_size: int = GOOGLE_BOOKS_ISBN_BATCH_SIZE,
+    lookup_misses: bool = True,
+) -> t.Dict[str, t.Dict[str, t.Any]]:
+    """
+    Get the data of several books from Google Books, with one search per
+    batch of ISBNs.
+
+    - The volumes are matched to the ISBNs by their industry identifiers.
+    - ISBNs that the batch search misses are looked up on their own, unless
+      `lookup_misses` is False. ISBNs that still aren't found are left out.
+    """
+    books_data: t.Dict[str, t.Dict[str, t.Any]] = {}
+    for batch in ichunked(isbns, batch_size):
+        _, response = client.get_books_by_isbns(isbns=batch)
+
+        for book_data in response.json().get("items", []):
+            for isbn in get_google_books_isbns(book_data):
+                if isbn in batch and isbn not in books_data:
+                    books_data[isbn] = book_data
+
+        if lookup_misses is False:
+            continue
+
+        for isbn in batch:
+            if isbn in books_data:
+                continue
+
+            book_data = get_book_data_from_google_books(
+                isbn=isbn, client=client
+            )
+            if book_data is not None:
+                books_data[isbn] = book_data
+
+    return books_data
+
+
 def get_openlibrary_work_description(
     works_data: t.List[t.Dict[str, t.Any]]
 ) -> t.Optional[str]:
@@ -146,6 +233,63 @@ def openlibrary_data_to_dataclass(
     )
 
 
+def openlibrary_books_api_data_to_dataclass(
+    book_data: t.Dict[str, t.Any]
+) -> Book:
+    """
+    Convert a book from the Open Library Books API to a Book dataclass.
+
+    - The Books API doesn't include the work, so there is no description.
+    """
+    isbn_13 = None
+    if book_data.get("identifiers", {}).get("isbn_13"):
+        isbn_13 = book_data["identifiers"]["isbn_13"][0]
+
+    openlibrary_book_id = book_data["key"].replace("/books/", "")
+    cover_url = (
+        f"https://covers.openlibrary.org/b/olid/{openlibrary_book_id}-L.jpg"
+    )
+
+    authors = [
+        Person(name=author["name"]) for author in book_data.get("authors", [])
+    ]
+
+    return Book(
+        title=book_data["title"],
+        authors=authors,
+        number_of_pages=book_data.get("number_of_pages") or None,
+        isbn=isbn_13,
+        cover_url=cover_url,
+        openlibrary_book_id=openlibrary_book_id,
+    )
+
+
+def get_books_from_openlibrary(
+    isbns: t.Iterable[str],
+    client: OpenLibraryClient,
+    batch_size: int = BOOKS_API_BATCH_SIZE,
+) -> t.Dict[str, Book]:
+    """
+    Get several books from Open Library, with one request per batch of ISBNs.
+
+    - Returns the books keyed by the ISBN they were looked up with, ISBNs that
+      aren't found are left out.
+    """
+    found_books = {}
+    for batch in ichunked(isbns, batch_size):
+        _, response = client.get_books_from_isbns(isbns=batch)
+        books_data = response.json()
+
+        for isbn in batch:
+            book_data = books_data.get(f"ISBN:{isbn}")
+            if book_data is not None:
+                found_books[isbn] = openlibrary_books_api_data_to_dataclass(
+                    book_data
+                )
+
+    return found_books
+
+
 def google_books_data_to_dataclass(book_data: t.Dict[str, t.Any]) -> Book:
     """
     Convert the Google Books book data to a Book dataclass.
@@ -197,6 +341,125 @@ def google_books_data_to_dataclass(book_data: t.Dict[str, t.Any]) -> Book:
     )
 
 
+def get_book_from_openlibrary(
+    isbn: str,
+    client: OpenLibraryClient,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Book:
+    """
+    Get a book from Open Library.
+    """
+    book_data, works_data, authors_data = get_book_data_from_openlibrary(
+        isbn=isbn, client=client, max_workers=max_workers
+    )
+    return openlibrary_data_to_dataclass(
+        book_data=book_data,
+        works_data=works_data,
+        authors_data=authors_data,
+    )
+
+
+def get_book_from_google_books(
+    isbn: str, client: GoogleBooksClient
+) -> t.Union[Book, None]:
+    """
+    Get a book from Google Books, returns None if the ISBN isn't found.
+    """
+    book_data = get_book_data_from_google_books(isbn=isbn, client=client)
+    if book_data is None:
+        return None
+
+    return google_books_data_to_dataclass(book_data)
+
+
+class BookSourceResult(t.NamedTuple):
+    book: t.Union[Book, None]
+    message: t.Union[str, None]
+
+
+def get_book_from_source(
+    source_name: str,
+    func: t.Callable[[], t.Union[Book, None]],
+) -> BookSourceResult:
+    """
+    Get a book from a source, turning timeouts and missing books into a
+    message.
+
+    - HTTP errors other than 404 are raised.
+    """
+    try:
+        return BookSourceResult(book=func(), message=None)
+    except Timeout:
+        return BookSourceResult(
+            book=None, message=f"{source_name} request timed out."
+        )
+    except HTTPError as http_error:
+        if http_error.response.status_code != 404:
+            raise http_error
+
+        return BookSourceResult(
+            book=None, message=f"Book not found on {source_name}."
+        )
+
+
+def get_book_from_sources(
+    isbn: str,
+    openlibrary_client: OpenLibraryClient,
+    google_books_client: GoogleBooksClient,
+    deadline: float = BOOK_SOURCES_DEADLINE,
+) -> t.Tuple[BookSourceResult, BookSourceResult]:
+    """
+    Get a book from Open Library and Google Books at the same time.
+
+    - Returns the Open Library result and then the Google Books result.
+    - A source that hasn't finished by the `deadline`, in seconds, is treated
+      as timed out. Its requests are left to finish on a daemon thread,
+      without holding up the exit of the command.
+    """
+    sources: t.List[t.Tuple[str, t.Callable[[], t.Union[Book, None]]]] = [
+        (
+            "Open Library",
+            # The works and authors are fetched serially, a pool's threads
+            # would keep the command from exiting after the deadline.
+            lambda: get_book_from_openlibrary(
+                isbn=isbn, client=openlibrary_client, max_workers=1
+            ),
+        ),
+        (
+            "Google Books",
+            lambda: get_book_from_google_books(
+                isbn=isbn, client=google_books_client
+            ),
+        ),
+    ]
+
+    # The sources run on daemon threads, so one that misses the deadline
+    # doesn't keep the command from exiting.
+    futures = [
+        (
+            source_name,
+            submit_daemon(partial(get_book_from_source, source_name, func)),
+        )
+        for source_name, func in sources
+    ]
+    wait([future for _, future in futures], timeout=deadline)
+
+    results = []
+    for source_name, future in futures:
+        if future.done() is False:
+            results.append(
+                BookSourceResult(
+                    book=None, message=f"{source_name} request timed out."
+                )
+            )
+            continue
+
+        results.append(future.result())
+
+    ol_result, gb_result = results
+    return ol_result, gb_result
+
+
 def build_book_note_name(book: Book) -> str:
     """
     Build the name for a book note.
@@ -265,7 +528,7 @@ def write_book_note(
     note_path: Path,
     note_content: str,
     config: Config,
-) -> Path:
+) -> t.Tuple[Path, WriteStatus]:
     """
     Write the note for a book.
     """
@@ -276,10 +539,9 @@ def write_book_note(
             "BOOKS_DIR_PATH must be set in the configuration file."
         )
 
-    with note_path.open("w") as note_file_obj:
-        note_file_obj.write(note_content)
+    status = write_note(note_path, note_content)
 
-    return note_path
+    return note_path, status
 
 
 def load_book_note(file_path: Path) -> frontmatter.Post:
@@ -291,25 +553,28 @@ def load_book_note(file_path: Path) -> frontmatter.Post:
     return post
 
 
-def is_same_book(book: Book, post: frontmatter.Post) -> bool:
+def is_same_book(book: Book, metadata: NoteMetadata) -> bool:
     """
-    Check if the book and the post are the same.
+    Check if the book and the note's metadata are the same.
     """
-    if "isbn_13" in post:
-        return book.isbn == str(post["isbn_13"])
-    elif "google_book_id" in post:
-        return book.google_book_id == str(post["google_book_id"])
-    elif "openlibrary_book_id" in post:
-        return book.openlibrary_book_id == str(post["openlibrary_book_id"])
+    if "isbn_13" in metadata:
+        return book.isbn == str(metadata["isbn_13"])
+    elif "google_book_id" in metadata:
+        return book.google_book_id == str(metadata["google_book_id"])
+    elif "openlibrary_book_id" in metadata:
+        return book.openlibrary_book_id == str(metadata["openlibrary_book_id"])
 
     return False
 
 
 def list_books_path(
     config: Config,
-) -> t.Generator[t.Tuple[Path, frontmatter.Post], None, None]:
+    vault_index: t.Optional[VaultIndex] = None,
+) -> t.Generator[t.Tuple[Path, NoteMetadata], None, None]:
     """
-    List the paths of book notes.
+    List the paths of book notes with their frontmatter.
+
+    - If a vault index is given, only new or changed notes are parsed.
     """
     # This is just a sanity check. The ensure_required_books_config function
     # should catch this.
@@ -318,10 +583,17 @@ def list_books_path(
             "BOOKS_DIR_PATH must be set in the configuration file."
         )
 
+    if vault_index is not None:
+        yield from vault_index.list_metadata(
+            config.BOOKS_DIR_PATH,
+            loader=load_note_metadata,
+        )
+        return None
+
     for file_path in config.BOOKS_DIR_PATH.glob("*.md"):
         try:
-            post = load_book_note(file_path)
+            metadata = load_note_metadata(file_path)
         except FileNotFoundError:
             continue
 
-        yield file_path, post
+        yield file_path, metadata
@@ -1,5 +1,29 @@
+import logging
+from pathlib import Path
+from typing import Dict, Final, Iterable, Optional, Tuple, Union
+
+import yaml
+
 from obsidian_tools.config import Config
 from obsidian_tools.errors import ObsidianToolsConfigError
+from obsidian_tools.utils.frontmatter_utils import (
+    NoteMetadata,
+    load_note_metadata,
+)
+from obsidian_tools.utils.vault_index import VaultIndex
+
+logger = logging.getLogger(__name__)
+
+# The frontmatter keys the library notes use for source-specific identifiers.
+EXTERNAL_ID_KEYS: Final = (
+    "isbn_13",
+    "google_book_id",
+    "openlibrary_book_id",
+    "tmdb_id",
+    "igdb_id",
+    "steam_id",
+    "discogs_id",
+)
 
 
 def ensure_required_config(config: Config) -> bool:
@@ -13,3 +37,97 @@ def ensure_required_config(config: Config) -> bool:
         raise ObsidianToolsConfigError("LIBRARY_DIR_PATH")
 
     return True
+
+
+class ExternalIdIndex:
+    """
+    An index from the external identifiers in the notes' frontmatter to the
+    notes' paths.
+
+    - Identifiers are compared as strings, so `tmdb_id: 123` in a note matches
+      a TMDB ID of `"123"`.
+    - Build one index per library directory, movies and TV shows both use
+      `tmdb_id` for different things.
+    """
+
+    def __init__(self):
+        self._paths: Dict[Tuple[str, str], Path] = {}
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def add(self, file_path: Path, metadata: NoteMetadata) -> None:
+        """
+        Add the note's external identifiers to the index.
+        """
+        for key in EXTERNAL_ID_KEYS:
+            value = metadata.get(key)
+            if value is None or value == "":
+                continue
+
+            self._paths[(key, str(value))] = file_path
+
+    def get(self, key: str, value: Union[str, int, None]) -> Optional[Path]:
+        """
+        Get the path of the note with the external identifier.
+        """
+        if value is None or value == "":
+            return None
+
+        return self._paths.get((key, str(value)))
+
+    def find(self, **external_ids: Union[str, int, None]) -> Optional[Path]:
+        """
+        Get the path of the first note that matches any of the external
+        identifiers, in the order they are given.
+        """
+        for key, value in external_ids.items():
+            file_path = self.get(key, value)
+            if file_path is not None:
+                return file_path
+
+        return None
+
+    @classmethod
+    def from_notes(
+        cls, notes: Iterable[Tuple[Path, NoteMetadata]]
+    ) -> "ExternalIdIndex":
+        external_id_index = cls()
+        for file_path, metadata in notes:
+            external_id_index.add(file_path, metadata)
+        return external_id_index
+
+
+def build_external_id_index(
+    dir_path: Optional[Path],
+    vault_index: Optional[VaultIndex] = None,
+) -> ExternalIdIndex:
+    """
+    Build the external identifier index for the notes in a library directory.
+
+    - With a vault index only the notes that changed since the last run are
+      parsed, so the index is cheap to build on every run.
+    - If the directory isn't configured the index is empty.
+    - Notes with invalid frontmatter are left out of the index.
+    """
+    if dir_path is None:
+        return ExternalIdIndex()
+
+    if vault_index is not None:
+        return ExternalIdIndex.from_notes(
+            vault_index.list_metadata(dir_path, loader=load_note_metadata)
+        )
+
+    notes = []
+    for file_path in sorted(dir_path.glob("*.md")):
+        try:
+            notes.append((file_path, load_note_metadata(file_path)))
+        except FileNotFoundError:
+            continue
+        except yaml.YAMLError as error:
+            logger.warning(
+                "Skipping %s, its frontmatter is invalid: %s", file_path, error
+            )
+            continue
+
+    return ExternalIdIndex.from_notes(notes)
@@ -9,6 +9,11 @@ from obsidian_tools.config import Config
 from obsidian_tools.errors import ObsidianToolsConfigError
 from obsidian_tools.integrations import TMDBClient
 from obsidian_tools.toolbox.library.models import Movie
+from obsidian_tools.utils.files import WriteStatus, write_note
+from obsidian_tools.utils.frontmatter_utils import (
+    NoteMetadata,
+    load_note_metadata,
+)
 from obsidian_tools.utils.humanize import and_join
 from obsidian_tools.utils.template import render_template
 
@@ -99,7 +104,7 @@ def build_movie_note_path(note_name: str, config: Config) -> Path:
 
 def write_movie_note(
     note_path: Path, note_content: str, config: Config
-) -> Path:
+) -> t.Tuple[Path, WriteStatus]:
     """
     Write the note for a Movie
     """
@@ -110,10 +115,9 @@ def write_movie_note(
             "TV_SHOWS_DIR_PATH must be set in the configuration file."
         )
 
-    with note_path.open("w") as file_obj:
-        file_obj.write(note_content)
+    status = write_note(note_path, note_content)
 
-    return note_path
+    return note_path, status
 
 
 def load_movie_note(note_path: Path) -> frontmatter.Post:
@@ -125,11 +129,11 @@ def load_movie_note(note_path: Path) -> frontmatter.Post:
     return post
 
 
-def is_same_movie(movie: Movie, post: frontmatter.Post) -> bool:
+def is_same_movie(movie: Movie, metadata: NoteMetadata) -> bool:
     """
-    Check if the Movie and the Post are the same.
+    Check if the Movie and the note's metadata are the same.
     """
-    return movie.tmdb_id == post["tmdb_id"]
+    return movie.tmdb_id == metadata.get("tmdb_id")
 
 
 class AltNoteName(t.TypedDict):
@@ -161,16 +165,18 @@ def list_alternative_note_names(
     for name in possible_names:
         path = build_movie_note_path(name, config)
         try:
-            post = load_movie_note(path)
+            metadata = load_note_metadata(path)
         except FileNotFoundError:
-            post = None
+            metadata = None
 
         alt_name: AltNoteName = {
             "name": name,
             "path": path,
             "does_exist": path.exists(),
             "is_same": (
-                is_same_movie(movie, post) if post is not None else False
+                is_same_movie(movie, metadata)
+                if metadata is not None
+                else False
             ),
         }
         names.append(alt_name)
@@ -8,9 +8,17 @@ from sanitize_filename import sanitize
 from obsidian_tools.config import Config
 from obsidian_tools.errors import ObsidianToolsConfigError
 from obsidian_tools.integrations import TMDBClient
+from obsidian_tools.integrations.tmdb import APPEND_TO_RESPONSE_LIMIT
 from obsidian_tools.toolbox.library import models
+from obsidian_tools.utils.concurrency import DEFAULT_MAX_WORKERS
+from obsidian_tools.utils.files import WriteStatus, write_note
+from obsidian_tools.utils.frontmatter_utils import (
+    NoteMetadata,
+    load_note_metadata,
+)
 from obsidian_tools.utils.humanize import and_join
 from obsidian_tools.utils.template import render_template
+from obsidian_tools.utils.vault_index import VaultIndex
 
 
 def ensure_required_tv_shows_config(config: Config, write: bool) -> bool:
@@ -58,25 +66,70 @@ def get_tv_show_season_data_from_tmdb(
 def get_tv_show_data_from_tmdb(
     tv_series_id: int,
     client: TMDBClient,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    number_of_seasons: t.Optional[int] = None,
 ) -> t.Tuple[t.Dict[str, t.Any], t.List[t.Dict[str, t.Any]]]:
     """
     Get the data for a TV show.
+
+    - If the `number_of_seasons` is known, like from the TV show's note, up to
+      the first 20 of them are fetched with the series details.
+    - The other seasons are fetched in batches of up to 20 seasons per
+      request, with at most `max_workers` requests in flight. The seasons are
+      returned in season order.
     """
-    _, resp_tv_series = client.get_tv_series_details(series_id=tv_series_id)
+    appended_season_numbers = range(
+        1, min(number_of_seasons or 0, APPEND_TO_RESPONSE_LIMIT) + 1
+    )
+
+    _, resp_tv_series = client.get_tv_series_details(
+        series_id=tv_series_id,
+        append_to_response=[
+            f"season/{season_number}"
+            for season_number in appended_season_numbers
+        ],
+    )
     tv_series = resp_tv_series.json()
 
-    tv_seasons = [
-        get_tv_show_season_data_from_tmdb(
-            tv_series_id=tv_series_id,
-            season_number=season_number,
-            client=client,
-        )
-        for season_number in range(1, tv_series["number_of_seasons"] + 1)
-    ]
+    tv_seasons_by_key = pop_tv_seasons(tv_series)
+
+    season_numbers = range(1, tv_series["number_of_seasons"] + 1)
+
+    for _, resp_tv_seasons in client.get_tv_seasons_details(
+        series_id=tv_series_id,
+        season_numbers=[
+            season_number
+            for season_number in season_numbers
+            if season_number not in appended_season_numbers
+        ],
+        max_workers=max_workers,
+    ):
+        tv_seasons_by_key.update(pop_tv_seasons(resp_tv_seasons.json()))
+
+    tv_seasons = []
+    for season_number in season_numbers:
+        tv_season = tv_seasons_by_key.get(f"season/{season_number}")
+        if tv_season is None:
+            raise ValueError(
+                f"Season {season_number} of TV series {tv_series_id} is "
+                f"missing from the TMDB response."
+            )
+        tv_seasons.append(tv_season)
 
     return tv_series, tv_seasons
 
 
+def pop_tv_seasons(
+    tv_series: t.Dict[str, t.Any]
+) -> t.Dict[str, t.Dict[str, t.Any]]:
+    """
+    Remove the seasons appended to a TV series details response, keyed by
+    `season/{season_number}`.
+    """
+    keys = [key for key in tv_series if key.startswith("season/")]
+    return {key: tv_series.pop(key) for key in keys}
+
+
 def tmdb_tv_show_data_to_dataclasses(
     tv_series: t.Dict[str, t.Any],
     tv_seasons: t.List[t.Dict[str, t.Any]],
@@ -139,11 +192,11 @@ def build_tv_show_note_name(tv_show: models.TVShow) -> str:
     return f"{tv_show.name}"
 
 
-def is_same_tv_show(tv_show: models.TVShow, post: frontmatter.Post) -> bool:
+def is_same_tv_show(tv_show: models.TVShow, metadata: NoteMetadata) -> bool:
     """
     Check if the TV show data matches the note data.
     """
-    return tv_show.tmdb_id == post["tmdb_id"]
+    return tv_show.tmdb_id == metadata.get("tmdb_id")
 
 
 def load_tv_show_note(file_path: Path) -> frontmatter.Post:
@@ -185,16 +238,18 @@ def list_alternative_note_names(
     for note_name in possible_note_names:
         note_path = build_tv_show_note_path(note_name, config)
         try:
-            post = load_tv_show_note(note_path)
+            metadata = load_note_metadata(note_path)
         except FileNotFoundError:
-            post = None
+            metadata = None
 
         alt_note_name: AltNoteName = {
             "name": note_name,
             "path": note_path,
             "does_exist": note_path.exists(),
             "is_same": (
-                is_same_tv_show(tv_show, post) if post is not None else False
+                is_same_tv_show(tv_show, metadata)
+                if metadata is not None
+                else False
             ),
         }
         note_names.append(alt_note_name)
@@ -214,7 +269,7 @@ def write_tv_show_note(
     file_path: Path,
     note_content: str,
     config: Config,
-) -> Path:
+) -> t.Tuple[Path, WriteStatus]:
     """
     Write the note for a TV show.
     """
@@ -225,18 +280,53 @@ def write_tv_show_note(
             "TV_SHOWS_DIR_PATH must be set in the configuration file."
         )
 
-    with file_path.open("w") as file_obj:
-        file_obj.write(note_content)
+    status = write_note(file_path, note_content)
 
-    return file_path
+    return file_path, status
+
+
+def update_tv_show_note(
+    file_path: Path,
+    tv_series_id: int,
+    client: TMDBClient,
+    config: Config,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    number_of_seasons: t.Optional[int] = None,
+) -> WriteStatus:
+    """
+    Update a TV show note with the latest data from TMDB.
+    """
+    tv_series, tv_seasons = get_tv_show_data_from_tmdb(
+        tv_series_id=tv_series_id,
+        client=client,
+        max_workers=max_workers,
+        number_of_seasons=number_of_seasons,
+    )
+    tv_show = tmdb_tv_show_data_to_dataclasses(
+        tv_series=tv_series,
+        tv_seasons=tv_seasons,
+    )
+
+    note_content = build_tv_show_note(tv_show)
+
+    _, status = write_tv_show_note(
+        file_path=file_path,
+        note_content=note_content,
+        config=config,
+    )
+
+    return status
 
 
 def list_tv_show_paths(
     config: Config,
     has_tmdb_id: bool = False,
-) -> t.Generator[t.Tuple[Path, frontmatter.Post], None, None]:
+    vault_index: t.Optional[VaultIndex] = None,
+) -> t.Generator[t.Tuple[Path, NoteMetadata], None, None]:
     """
-    List the paths of TV show notes.
+    List the paths of TV show notes with their frontmatter.
+
+    - If a vault index is given, only new or changed notes are parsed.
     """
     # This is just a sanity check. The ensure_required_tv_shows_config function
     # should catch this.
@@ -245,18 +335,24 @@ def list_tv_show_paths(
             "TV_SHOWS_DIR_PATH must be set in the configuration file."
         )
 
-    file_paths = sorted(
-        config.TV_SHOWS_DIR_PATH.glob("*.md"),
-        key=lambda p: p.stem,
-    )
-
-    for file_path in file_paths:
-        try:
-            post = load_tv_show_note(file_path)
-        except FileNotFoundError:
-            continue
-
-        if has_tmdb_id and "tmdb_id" not in post:
+    if vault_index is not None:
+        notes = vault_index.list_metadata(
+            config.TV_SHOWS_DIR_PATH,
+            loader=load_note_metadata,
+        )
+    else:
+        notes = []
+        for file_path in sorted(config.TV_SHOWS_DIR_PATH.glob("*.md")):
+            try:
+                metadata = load_note_metadata(file_path)
+            except FileNotFoundError:
+                continue
+
+            notes.append((file_path, metadata))
+
+    # Keep the notes sorted by name.
+    for file_path, metadata in sorted(notes, key=lambda note: note[0].stem):
+        if has_tmdb_id and "tmdb_id" not in metadata:
             continue
 
-        yield file_path, post
+        yield file_path, metadata
@@ -1,6 +1,6 @@
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, TypedDict, Union
+from typing import Any, Dict, Final, List, Tuple, TypedDict, Union
 
 import frontmatter
 from sanitize_filename import sanitize
@@ -10,8 +10,25 @@ from obsidian_tools.errors import ObsidianToolsConfigError
 from obsidian_tools.integrations import IGDBClient, SteamClient
 from obsidian_tools.integrations.igdb import CategoryEnum
 from obsidian_tools.toolbox.library.models import VideoGame
+from obsidian_tools.utils.files import WriteStatus, write_note
+from obsidian_tools.utils.frontmatter_utils import (
+    NoteMetadata,
+    load_note_metadata,
+)
 from obsidian_tools.utils.template import render_template
 
+# Only request the fields we use from IGDB, the full game objects are large.
+# IGDB always includes the `id` of each object.
+IGDB_SEARCH_FIELDS: Final = ("name",)
+IGDB_GAME_FIELDS: Final = (
+    "name",
+    "summary",
+    "first_release_date",
+    "cover.image_id",
+    "external_games.category",
+    "external_games.uid",
+)
+
 
 def ensure_required_video_game_config(config: Config) -> bool:
     """
@@ -33,7 +50,9 @@ def search_video_game_on_igdb(
     """
     Search for a video game on IGDB.
     """
-    request, response = client.search_games(query=query)
+    request, response = client.search_games(
+        query=query, fields=IGDB_SEARCH_FIELDS
+    )
     return response.json()
 
 
@@ -43,17 +62,25 @@ def get_game_data_from_igdb(
 ) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
     """
     Get the data of a video game from IGDB.
+
+    - The cover and external games are requested as nested fields of the game,
+      so it only takes one request.
     """
-    _, resp_game = client.get_game(game_id=int(game_id))
+    _, resp_game = client.get_game(
+        game_id=int(game_id), fields=IGDB_GAME_FIELDS
+    )
     game = resp_game.json()[0]
 
-    _, resp_cover = client.get_cover(cover_id=game["cover"])
-    cover = resp_cover.json()[0]
-
-    _, resp_external_games = client.get_external_game(
-        external_game_ids=game["external_games"]
-    )
-    external_games = resp_external_games.json()
+    # Put the IDs back, so the game looks the same as an unexpanded one.
+    cover = game["cover"]
+    external_games = game.get("external_games", [])
+    game = {
+        **game,
+        "cover": cover["id"],
+        "external_games": [
+            external_game["id"] for external_game in external_games
+        ],
+    }
 
     return game, cover, external_games
 
@@ -69,6 +96,7 @@ def get_igdb_game_id_from_external_game_id(
     _, response = client.get_game_by_external_game_id(
         game_id=external_game_id,
         category=category,
+        fields=("id",),
     )
     return response.json()[0]["id"]
 
@@ -104,7 +132,7 @@ def igdb_data_to_dataclass(
         steam_id = steam_external_game["uid"]
 
     first_release_date = None
-    if game["first_release_date"]:
+    if game.get("first_release_date"):
         first_release_date = datetime.fromtimestamp(
             game["first_release_date"]
         ).date()
@@ -181,7 +209,7 @@ def write_video_game(
     note_path: Path,
     note_content: str,
     config: Config,
-) -> Path:
+) -> Tuple[Path, WriteStatus]:
     """
     Write the note for a video game.
     """
@@ -192,10 +220,9 @@ def write_video_game(
             "VIDEO_GAMES_DIR_PATH must be set in the configuration file."
         )
 
-    with note_path.open("w") as file_obj:
-        file_obj.write(note_content)
+    status = write_note(note_path, note_content)
 
-    return note_path
+    return note_path, status
 
 
 def load_video_game(note_path: Path) -> frontmatter.Post:
@@ -207,21 +234,21 @@ def load_video_game(note_path: Path) -> frontmatter.Post:
     return post
 
 
-def is_same_video_game(video_game: VideoGame, post: frontmatter.Post) -> bool:
+def is_same_video_game(video_game: VideoGame, metadata: NoteMetadata) -> bool:
     """
-    Check if the Movie and the Post are the same.
+    Check if the video game and the note's metadata are the same.
     """
     if (
         video_game.igdb_id is not None
-        and "igdb_id" in post
-        and str(video_game.igdb_id) == str(post["igdb_id"])
+        and "igdb_id" in metadata
+        and str(video_game.igdb_id) == str(metadata["igdb_id"])
     ):
         return True
 
     if (
         video_game.steam_id is not None
-        and "steam_id" in post
-        and str(video_game.steam_id) == str(post["steam_id"])
+        and "steam_id" in metadata
+        and str(video_game.steam_id) == str(metadata["steam_id"])
     ):
         return True
 
@@ -254,17 +281,17 @@ def list_alternative_note_names(
     for name in possible_names:
         path = build_video_game_note_path(name, config=config)
         try:
-            post = load_video_game(path)
+            metadata = load_note_metadata(path)
         except FileNotFoundError:
-            post = None
+            metadata = None
 
         alt_name: AltNoteName = {
             "name": name,
             "path": path,
             "does_exist": path.exists(),
             "is_same": (
-                is_same_video_game(video_game, post)
-                if post is not None
+                is_same_video_game(video_game, metadata)
+                if metadata is not None
                 else False
             ),
         }
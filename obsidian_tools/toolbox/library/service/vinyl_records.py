@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Any, Dict, Union
+from typing import Any, Dict, Tuple, Union
 
 from sanitize_filename import sanitize
 
@@ -7,6 +7,7 @@ from obsidian_tools.config import Config
 from obsidian_tools.errors import ObsidianToolsConfigError
 from obsidian_tools.integrations import DiscogsClient
 from obsidian_tools.toolbox.library import models
+from obsidian_tools.utils.files import WriteStatus, write_note
 from obsidian_tools.utils.template import render_template
 
 
@@ -113,25 +114,45 @@ def build_vinyl_note(vinyl_record: models.VinylRecord) -> str:
     return content.strip()
 
 
+def build_vinyl_note_name(vinyl_record: models.VinylRecord) -> str:
+    """
+    Build the name for a vinyl record note.
+    """
+    note_name = vinyl_record.title
+    if vinyl_record.artists:
+        note_name += f" - {vinyl_record.display_artists}"
+
+    return note_name
+
+
+def build_vinyl_note_path(note_name: str, config: Config) -> Path:
+    """
+    Build the path for a vinyl record note.
+    """
+    if not config.VINYL_RECORDS_DIR_PATH:
+        raise ValueError(
+            "VINYL_RECORDS_DIR_PATH must be set in the configuration file."
+        )
+
+    file_name = sanitize(note_name) + ".md"
+    return config.VINYL_RECORDS_DIR_PATH / file_name
+
+
 def write_vinyl_note(
-    note_name: str,
+    note_path: Path,
     note_content: str,
     config: Config,
-) -> Path:
+) -> Tuple[Path, WriteStatus]:
     """
-    Write the note for a book.
+    Write the note for a vinyl record.
     """
-    # This is just a sanity check. The ensure_required_books_config function
+    # This is just a sanity check. The ensure_required_vinyl_config function
     # should catch this.
     if not config.VINYL_RECORDS_DIR_PATH:
         raise ValueError(
             "VINYL_RECORDS_DIR_PATH must be set in the configuration file."
         )
 
-    file_name = sanitize(note_name) + ".md"
-    file_path = config.VINYL_RECORDS_DIR_PATH / file_name
-
-    with file_path.open("w") as file_obj:
-        file_obj.write(note_content)
+    status = write_note(note_path, note_content)
 
-    return file_path
+    return note_path, status
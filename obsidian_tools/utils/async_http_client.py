@@ -0,0 +1,455 @@
+"""
+This module provides an asyncio counterpart to the `HttpClient`.
+
+- Requests are sent with an httpx `AsyncClient`, so thousands of requests can
+  be in flight on one thread without a thread for each of them.
+- The rate limiting, retries, HTTP cache and sharing of identical GET
+  requests are the same as the `HttpClient`, waiting without blocking the
+  event loop.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, ClassVar, Dict, Optional, Tuple, Union
+
+import httpx
+
+from obsidian_tools.utils import http_stats
+from obsidian_tools.utils.http_cache import (
+    CachedResponse,
+    HttpCache,
+    build_cache_key,
+    get_cache_namespace,
+    normalize_headers,
+    update_cache,
+)
+from obsidian_tools.utils.http_client import (
+    ApiRequest,
+    HttpMethod,
+    get_user_agent,
+)
+from obsidian_tools.utils.rate_limit import (
+    RateLimit,
+    RateLimiter,
+    parse_retry_after,
+)
+from obsidian_tools.utils.retry import RetryPolicy
+
+AsyncRequestReturn = Tuple[httpx.Request, httpx.Response]
+
+# The requests style auth classes (like `TMDBAuth`) work as httpx auth too,
+# they are called with the request and set its headers.
+AsyncAuth = Callable[[httpx.Request], httpx.Request]
+
+
+class _SenderCancelled(Exception):
+    """
+    The caller sending a shared request was cancelled, the callers waiting
+    for its response send the request again.
+    """
+
+
+def get_ttfb(response: httpx.Response) -> Union[float, None]:
+    """
+    Get the time from sending the request to receiving the response headers.
+
+    - Responses that weren't read from the network, like mocked responses,
+      don't have one.
+    """
+    try:
+        return response.elapsed.total_seconds()
+    except RuntimeError:
+        return None
+
+
+def cached_response_to_response(
+    cached_response: CachedResponse, request: httpx.Request
+) -> httpx.Response:
+    """
+    Build an httpx Response from a cached response.
+    """
+    return httpx.Response(
+        status_code=cached_response.status_code,
+        headers=cached_response.headers,
+        content=cached_response.content,
+        request=request,
+    )
+
+
+def build_cache_key_for(
+    request: httpx.Request, auth: Optional[AsyncAuth]
+) -> str:
+    """
+    Build the cache key of a request, in the namespace of its authentication.
+    """
+    return build_cache_key(
+        method=request.method,
+        url=str(request.url),
+        body=request.content or None,
+        namespace=get_cache_namespace(auth),
+    )
+
+
+def record_response(
+    request: httpx.Request,
+    response: httpx.Response,
+    elapsed: float,
+    cache: Optional[str] = None,
+) -> None:
+    """
+    Publish the event of a request that got a response.
+
+    - Responses that didn't come from the network don't have a TTFB, and
+      their body isn't counted in the bytes, see the `HttpClient`.
+    """
+    http_stats.record_request(
+        method=request.method,
+        url=str(request.url),
+        status_code=response.status_code,
+        bytes=len(response.content) if cache in (None, "miss") else 0,
+        elapsed=elapsed,
+        ttfb=(
+            get_ttfb(response)
+            if cache in (None, "miss", "revalidated")
+            else None
+        ),
+        cache=cache,
+    )
+
+
+class AsyncHttpClient:
+    """
+    An asyncio HTTP client with the same interface as the `HttpClient`.
+
+    - Use the client as an async context manager, or call `aclose`, to close
+      its connections.
+    """
+
+    # The rate limits of the hosts the client talks to, keyed by host.
+    rate_limits: ClassVar[Dict[str, RateLimit]] = {}
+
+    # How failed requests are retried, see `RetryPolicy`.
+    retry_policy: RetryPolicy = RetryPolicy()
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        auth: Optional[AsyncAuth] = None,
+        cache: Optional[HttpCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        memo_size: int = 0,
+    ):
+        # Pass an httpx client to share connections with other clients.
+        if client is None:
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(30, connect=5)
+            )
+        else:
+            self.client = client
+
+        # The authentication is applied to each request, because the client
+        # may be shared with other clients.
+        self.auth = auth
+
+        # Set a custom User-Agent header because we are nice web citizens.
+        self.client.headers["User-Agent"] = get_user_agent()
+
+        # Only GET requests are cached, the cache is read and written on the
+        # event loop's thread.
+        self.cache = cache
+
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(self.rate_limits)
+        self.rate_limiter = rate_limiter
+
+        if retry_policy is not None:
+            self.retry_policy = retry_policy
+
+        # Identical GET requests in flight at the same time are only sent
+        # once, and with a `memo_size` the last successful responses are
+        # kept for the life of the client.
+        self.memo_size = memo_size
+        self._memo: OrderedDict[str, AsyncRequestReturn] = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future[AsyncRequestReturn]] = {}
+
+    async def __aenter__(self) -> "AsyncHttpClient":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def request(
+        self,
+        method: HttpMethod,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, str]] = None,
+        timeout: Union[float, Tuple[float, float], None] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        auth: Optional[AsyncAuth] = None,
+        **kwargs,
+    ) -> AsyncRequestReturn:
+        # The client's timeout is used unless one is given, a (connect, read)
+        # tuple is the same as the timeouts of requests.
+        if isinstance(timeout, tuple):
+            kwargs["timeout"] = httpx.Timeout(timeout[1], connect=timeout[0])
+        elif timeout is not None:
+            kwargs["timeout"] = timeout
+
+        request = self.client.build_request(
+            method=str(method.value),
+            url=url,
+            headers=headers,
+            params=params,
+            **kwargs,
+        )
+
+        def send() -> Awaitable[AsyncRequestReturn]:
+            return self._request(
+                request,
+                auth=auth or self.auth,
+                retry_policy=retry_policy or self.retry_policy,
+            )
+
+        if method != HttpMethod.GET:
+            return await send()
+
+        return await self._coalesce(
+            build_cache_key_for(request, auth=auth or self.auth),
+            send,
+        )
+
+    async def _coalesce(
+        self, key: str, send: Callable[[], Awaitable[AsyncRequestReturn]]
+    ) -> AsyncRequestReturn:
+        """
+        Send the request, unless an identical request is already in flight or
+        memoized, then return its request and response.
+
+        - The callers share the same response object, its content has
+          already been read.
+        """
+        started_at = time.perf_counter()
+
+        memoized = self._memo.get(key)
+        if memoized is not None:
+            self._memo.move_to_end(key)
+            record_response(memoized[0], memoized[1], elapsed=0.0, cache="memo")
+            return memoized
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            # Don't cancel the shared request if this caller is cancelled.
+            try:
+                result = await asyncio.shield(in_flight)
+            except _SenderCancelled:
+                return await self._coalesce(key, send)
+            record_response(
+                result[0],
+                result[1],
+                elapsed=time.perf_counter() - started_at,
+                cache="coalesced",
+            )
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+
+        try:
+            result = await send()
+        except BaseException as error:
+            # Only the sender is cancelled, not the callers waiting for it.
+            if isinstance(error, asyncio.CancelledError):
+                future.set_exception(_SenderCancelled())
+            else:
+                future.set_exception(error)
+            # The error is raised here, so the future's copy of it doesn't
+            # need to be reported if nothing else awaits it.
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+        if self.memo_size > 0 and result[1].status_code == 200:
+            self._memo[key] = result
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+        future.set_result(result)
+        return result
+
+    async def _request(
+        self,
+        request: httpx.Request,
+        auth: Optional[AsyncAuth],
+        retry_policy: RetryPolicy,
+    ) -> AsyncRequestReturn:
+        """
+        Send the request, or get its response from the cache.
+        """
+        started_at = time.perf_counter()
+
+        cache_key: Union[str, None] = None
+        cached_response: Union[CachedResponse, None] = None
+        if self.cache is not None and request.method == HttpMethod.GET:
+            cache_key = build_cache_key_for(request, auth=auth)
+            cached_response = self.cache.get(cache_key)
+
+        if cached_response is not None:
+            if cached_response.is_fresh():
+                response = cached_response_to_response(cached_response, request)
+                record_response(
+                    request,
+                    response,
+                    elapsed=time.perf_counter() - started_at,
+                    cache="hit",
+                )
+                return request, response
+
+            # Revalidate the stale response with a conditional request.
+            if cached_response.etag is not None:
+                request.headers["If-None-Match"] = cached_response.etag
+            if cached_response.last_modified is not None:
+                request.headers["If-Modified-Since"] = (
+                    cached_response.last_modified
+                )
+
+        try:
+            response = await self._send(
+                request, auth=auth, retry_policy=retry_policy
+            )
+        except httpx.HTTPError as error:
+            http_stats.record_request(
+                method=request.method,
+                url=str(request.url),
+                status_code=None,
+                bytes=0,
+                elapsed=time.perf_counter() - started_at,
+                error=error,
+            )
+            raise error
+
+        cache_status: Union[str, None] = None
+        if self.cache is not None and cache_key is not None:
+            cache_status = (
+                "revalidated"
+                if response.status_code == 304 and cached_response is not None
+                else "miss"
+            )
+            refreshed_response = update_cache(
+                self.cache,
+                cache_key,
+                url=str(response.url),
+                status_code=response.status_code,
+                headers=normalize_headers(response.headers),
+                content=response.content,
+                cached_response=cached_response,
+            )
+            if refreshed_response is not None:
+                response = cached_response_to_response(
+                    refreshed_response, response.request
+                )
+
+        record_response(
+            request,
+            response,
+            elapsed=time.perf_counter() - started_at,
+            cache=cache_status,
+        )
+
+        return response.request, response
+
+    async def _send(
+        self,
+        request: httpx.Request,
+        auth: Optional[AsyncAuth],
+        retry_policy: RetryPolicy,
+    ) -> httpx.Response:
+        """
+        Send the request, waiting for the rate limit and retrying transient
+        failures.
+        """
+        url = str(request.url)
+        method = request.method
+
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire_async(url)
+
+            try:
+                response = await self.client.send(request, auth=auth)
+            except (httpx.NetworkError, httpx.TimeoutException) as error:
+                was_sent = not isinstance(
+                    error, (httpx.ConnectError, httpx.ConnectTimeout)
+                )
+                if (
+                    retry_policy.can_retry(attempt) is False
+                    or retry_policy.should_retry_failure(method, was_sent)
+                    is False
+                ):
+                    raise error
+
+                await asyncio.sleep(retry_policy.get_backoff(attempt) or 0.0)
+                attempt += 1
+                continue
+
+            self.rate_limiter.update(
+                url, response.status_code, response.headers
+            )
+
+            if (
+                retry_policy.can_retry(attempt) is False
+                or retry_policy.should_retry_status(
+                    method, response.status_code
+                )
+                is False
+            ):
+                return response
+
+            backoff = retry_policy.get_backoff(
+                attempt,
+                retry_after=parse_retry_after(
+                    response.headers.get("Retry-After")
+                ),
+            )
+            if backoff is None:
+                return response
+
+            # Release the connection back to the pool before retrying.
+            await response.aclose()
+
+            await asyncio.sleep(backoff)
+            attempt += 1
+
+    async def fetch(
+        self, api_request: ApiRequest, **kwargs
+    ) -> AsyncRequestReturn:
+        """
+        Send an API request, raising an `HTTPStatusError` for an error
+        response.
+        """
+        if isinstance(api_request.data, str):
+            kwargs["content"] = api_request.data
+        elif api_request.data is not None:
+            kwargs["data"] = api_request.data
+
+        request, response = await self.request(
+            api_request.method,
+            api_request.url,
+            params=api_request.params,
+            **kwargs,
+        )
+        response.raise_for_status()
+
+        return request, response
+
+    async def get(self, url: str, **kwargs) -> AsyncRequestReturn:
+        return await self.request(HttpMethod.GET, url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> AsyncRequestReturn:
+        return await self.request(HttpMethod.POST, url, **kwargs)
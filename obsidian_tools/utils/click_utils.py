@@ -1,8 +1,11 @@
 from datetime import datetime
+from pathlib import Path
 from typing import Optional
 
 import click
 
+from obsidian_tools.utils.concurrency import DEFAULT_MAX_WORKERS
+
 
 class WeekFormat(click.DateTime):
 
@@ -27,6 +30,13 @@ class WeekFormat(click.DateTime):
         return "Week"
 
 
+def get_app_dir_path() -> Path:
+    """
+    Get the path to the obsidian-tools application directory.
+    """
+    return Path(click.get_app_dir("obsidian-tools"))
+
+
 def write_option(func):
     return click.option(
         "-w",
@@ -43,3 +53,24 @@ def write_force_option(func):
         is_flag=True,
         help="Force the write operation.",
     )(func)
+
+
+def max_workers_option(func):
+    return click.option(
+        "--max-workers",
+        type=click.IntRange(min=1),
+        default=DEFAULT_MAX_WORKERS,
+        show_default=True,
+        help="Maximum number of concurrent requests.",
+    )(func)
+
+
+def jobs_option(func):
+    return click.option(
+        "-j",
+        "--jobs",
+        type=click.IntRange(min=1),
+        default=1,
+        show_default=True,
+        help="Number of notes to process in parallel.",
+    )(func)
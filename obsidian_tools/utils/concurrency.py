@@ -0,0 +1,140 @@
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import (
+    Awaitable,
+    Callable,
+    Deque,
+    Final,
+    Generator,
+    Iterable,
+    List,
+    TypeVar,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Keep the number of requests in flight low by default, the APIs we talk to
+# are free and rate limited.
+DEFAULT_MAX_WORKERS: Final = 4
+
+
+def submit_daemon(func: Callable[[], R]) -> "Future[R]":
+    """
+    Call the function on a daemon thread, returning a future of its result.
+
+    - Unlike the threads of a `ThreadPoolExecutor`, a daemon thread doesn't
+      keep the interpreter from exiting, so a call that is no longer waited
+      for doesn't delay the exit of the command.
+    """
+    future: Future[R] = Future()
+
+    def run() -> None:
+        if future.set_running_or_notify_cancel() is False:
+            return None
+
+        try:
+            future.set_result(func())
+        except BaseException as error:
+            future.set_exception(error)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def map_concurrently(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Generator[R, None, None]:
+    """
+    Map the function over the items using a pool of threads, yielding the
+    results in the same order as the items.
+
+    - At most `max_workers` calls are in flight at the same time.
+    - The items are read lazily, only a couple of items per worker ahead of
+      the results, so long inputs like a file of ISBNs are streamed.
+    - If `max_workers` is one or less the items are mapped serially in the
+      calling thread.
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield func(item)
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures: Deque[Future[R]] = deque()
+
+        try:
+            for item in items:
+                futures.append(executor.submit(func, item))
+
+                if len(futures) >= max_workers * 2:
+                    yield futures.popleft().result()
+
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def map_as_completed(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Generator[R, None, None]:
+    """
+    Map the function over the items using a pool of threads, yielding the
+    results as soon as they are ready.
+
+    - The results are not in the same order as the items.
+    - If a call raises an exception, it's raised when its result is reached
+      and the calls that haven't started yet are cancelled.
+    - If `max_workers` is one or less the items are mapped serially in the
+      calling thread.
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield func(item)
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(func, item) for item in items]
+
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+async def map_async(
+    func: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    max_concurrency: int = DEFAULT_MAX_WORKERS,
+) -> List[R]:
+    """
+    Map the coroutine function over the items on the event loop, returning
+    the results in the same order as the items.
+
+    - At most `max_concurrency` calls are in flight at the same time.
+    - If a call raises an exception, it's raised and the other calls are
+      cancelled.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
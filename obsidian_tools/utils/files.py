@@ -0,0 +1,174 @@
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from enum import Enum
+from pathlib import Path
+from typing import Generator, Optional, Set, Union
+
+# The paths written while fsync is deferred, see `deferred_fsync`.
+_deferred_fsync_lock = threading.Lock()
+_deferred_fsync_paths: Union[Set[Path], None] = None
+
+
+class WriteStatus(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+
+
+def hash_content(content: bytes) -> str:
+    """
+    Get the SHA-256 hash of the content.
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+def hash_file(file_path: Path) -> str:
+    """
+    Get the SHA-256 hash of the file's content.
+    """
+    digest = hashlib.sha256()
+
+    with file_path.open("rb") as file_obj:
+        for block in iter(lambda: file_obj.read(64 * 1024), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def fsync_directory(dir_path: Path) -> None:
+    """
+    Flush a directory's entries, so a rename inside it survives a crash.
+    """
+    # Windows doesn't support opening directories.
+    if os.name == "nt":
+        return None
+
+    dir_fd = os.open(dir_path, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+@contextmanager
+def deferred_fsync() -> Generator[None, None, None]:
+    """
+    Defer flushing written files to disk until the end of the block.
+
+    - Bulk commands use this so each note doesn't wait on the disk. The files
+      are still replaced atomically, they are just flushed together at the
+      end.
+    - Nested blocks are flushed by the outermost block.
+    """
+    global _deferred_fsync_paths
+
+    with _deferred_fsync_lock:
+        is_outermost = _deferred_fsync_paths is None
+        if is_outermost:
+            _deferred_fsync_paths = set()
+
+    if is_outermost is False:
+        yield
+        return None
+
+    try:
+        yield
+    finally:
+        with _deferred_fsync_lock:
+            paths, _deferred_fsync_paths = _deferred_fsync_paths, None
+
+        for path in paths or set():
+            try:
+                with path.open("rb") as file_obj:
+                    os.fsync(file_obj.fileno())
+            except FileNotFoundError:
+                continue
+
+        for dir_path in {path.parent for path in paths or set()}:
+            fsync_directory(dir_path)
+
+
+def write_file_atomically(
+    file_path: Path, content: bytes, mode: Optional[int] = None
+) -> None:
+    """
+    Write the file by writing a temporary file in the same directory and
+    renaming it over the destination.
+
+    - A crash or Ctrl-C leaves either the old or the new file, never a
+      truncated one, and Obsidian never sees a partially written note.
+    - The temporary file starts with a dot, so Obsidian ignores it.
+    - If a `mode` is given the file is created with those permissions,
+      otherwise it keeps the permissions of the file it replaces.
+    """
+    temp_file_path = file_path.with_name(
+        f".{file_path.name}.{uuid.uuid4().hex}.tmp"
+    )
+
+    with _deferred_fsync_lock:
+        is_deferred = _deferred_fsync_paths is not None
+
+    try:
+        # Create the file with the permissions up front, so secrets are
+        # never readable by other users.
+        temp_file_fd = os.open(
+            temp_file_path,
+            os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0),
+            0o666 if mode is None else mode,
+        )
+        with open(temp_file_fd, "wb") as file_obj:
+            file_obj.write(content)
+            file_obj.flush()
+
+            if is_deferred is False:
+                os.fsync(file_obj.fileno())
+
+        # Keep the permissions of the file we are replacing.
+        if mode is None:
+            try:
+                shutil.copymode(file_path, temp_file_path)
+            except FileNotFoundError:
+                pass
+
+        os.replace(temp_file_path, file_path)
+    except BaseException:
+        temp_file_path.unlink(missing_ok=True)
+        raise
+
+    with _deferred_fsync_lock:
+        if _deferred_fsync_paths is not None:
+            _deferred_fsync_paths.add(file_path)
+            return None
+
+    fsync_directory(file_path.parent)
+
+
+def write_note(file_path: Path, note_content: str) -> WriteStatus:
+    """
+    Write the note to the vault, unless the file already has the same content.
+
+    - Skipping identical writes keeps the file's modified time, so Obsidian
+      Sync and git don't see a change.
+    - The file is only hashed if its size matches the new content.
+    """
+    content = note_content.encode("utf-8")
+
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        status = WriteStatus.CREATED
+    else:
+        if stat.st_size == len(content) and hash_file(
+            file_path
+        ) == hash_content(content):
+            return WriteStatus.UNCHANGED
+
+        status = WriteStatus.UPDATED
+
+    write_file_atomically(file_path, content)
+
+    return status
@@ -0,0 +1,57 @@
+"""
+This module provides a fast loader for the frontmatter of notes.
+
+- `frontmatter.load` reads and keeps the whole note, but listing and lookups
+  only need a few keys from the frontmatter. The loader here reads the note
+  line by line and stops at the closing delimiter.
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+from frontmatter.default_handlers import YAMLHandler
+
+NoteMetadata = Dict[str, Any]
+
+# The same delimiter python-frontmatter uses for YAML frontmatter.
+RE_FRONTMATTER_DELIMITER = re.compile(r"^-{3,}\s*$")
+
+yaml_handler = YAMLHandler()
+
+
+def read_frontmatter(file_path: Path) -> Union[str, None]:
+    """
+    Read the raw frontmatter block of a note, without reading the body.
+
+    - Returns None if the note doesn't start with a frontmatter block or the
+      block is never closed.
+    """
+    with file_path.open("r", encoding="utf-8-sig") as file_obj:
+        first_line = file_obj.readline()
+        if RE_FRONTMATTER_DELIMITER.match(first_line) is None:
+            return None
+
+        lines: List[str] = []
+        for line in file_obj:
+            if RE_FRONTMATTER_DELIMITER.match(line) is not None:
+                return "".join(lines)
+
+            lines.append(line)
+
+    return None
+
+
+def load_note_metadata(file_path: Path) -> NoteMetadata:
+    """
+    Load the frontmatter of a note as a dictionary.
+    """
+    raw_frontmatter = read_frontmatter(file_path)
+    if raw_frontmatter is None:
+        return {}
+
+    metadata = yaml_handler.load(raw_frontmatter)
+    if not isinstance(metadata, dict):
+        return {}
+
+    return metadata
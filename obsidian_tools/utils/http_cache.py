@@ -0,0 +1,429 @@
+"""
+This module provides a persistent cache for HTTP responses.
+
+- Responses are stored with their validators (``ETag`` and ``Last-Modified``)
+  so stale entries can be revalidated with a conditional request instead of
+  downloading the full payload again.
+- Freshness follows the ``Cache-Control`` and ``Expires`` response headers.
+  Responses without any freshness information are stored but revalidated on
+  every use.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Final, Optional, Union
+
+# Entries older than 30 days are evicted, even if they could be revalidated.
+DEFAULT_MAX_AGE: Final = 60 * 60 * 24 * 30
+
+# The least recently used entries are evicted when the cache grows past 100MB.
+DEFAULT_MAX_SIZE: Final = 100 * 1024 * 1024
+
+
+@dataclass
+class CachedResponse:
+
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+
+    stored_at: float
+    expires_at: float
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("last-modified")
+
+    @property
+    def can_revalidate(self) -> bool:
+        return self.etag is not None or self.last_modified is not None
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        if now is None:
+            now = time.time()
+
+        return now < self.expires_at
+
+
+def normalize_headers(headers) -> Dict[str, str]:
+    """
+    Lowercase the header names so they can be looked up consistently.
+    """
+    return {key.lower(): value for key, value in headers.items()}
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    Parse a Cache-Control header into a dictionary of directives.
+    """
+    directives: Dict[str, Optional[str]] = {}
+
+    if not value:
+        return directives
+
+    for directive in value.split(","):
+        name, _, argument = directive.strip().partition("=")
+        if not name:
+            continue
+
+        directives[name.lower()] = argument.strip('"') or None
+
+    return directives
+
+
+def get_expires_at(
+    headers: Dict[str, str], now: Optional[float] = None
+) -> Optional[float]:
+    """
+    Get the timestamp at which a response stops being fresh.
+
+    - Returns None if the response must not be stored at all.
+    - Responses without freshness information expire immediately, which means
+      they are revalidated every time they are used.
+    """
+    if now is None:
+        now = time.time()
+
+    cache_control = parse_cache_control(headers.get("cache-control"))
+
+    if "no-store" in cache_control:
+        return None
+
+    if "no-cache" in cache_control:
+        return now
+
+    max_age = cache_control.get("max-age")
+    if max_age is not None:
+        try:
+            return now + max(int(max_age), 0)
+        except ValueError:
+            return now
+
+    expires = headers.get("expires")
+    if expires is not None:
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            return now
+
+    return now
+
+
+def get_cache_namespace(auth: Any) -> str:
+    """
+    Get the cache key namespace of a request's authentication.
+
+    - It's a digest of the authentication's attributes, like an API key or an
+      access token, so clients that share a cache but not their credentials
+      don't read each other's responses.
+    - Requests without authentication have no namespace.
+    """
+    if auth is None:
+        return ""
+
+    identity = json.dumps(
+        [type(auth).__name__, getattr(auth, "__dict__", auth)],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+def build_cache_key(
+    method: str,
+    url: str,
+    body: Union[str, bytes, None] = None,
+    namespace: str = "",
+) -> str:
+    """
+    Build the cache key for a request.
+
+    - See `get_cache_namespace` for the `namespace`.
+    """
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+
+    digest = hashlib.sha256()
+    if namespace:
+        digest.update(namespace.encode("utf-8"))
+        digest.update(b"\n")
+    digest.update(method.upper().encode("utf-8"))
+    digest.update(b"\n")
+    digest.update(url.encode("utf-8"))
+    digest.update(b"\n")
+    digest.update(body or b"")
+
+    return digest.hexdigest()
+
+
+class HttpCache(ABC):
+    """
+    Base class for HTTP response caches.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]: ...
+
+    @abstractmethod
+    def set(self, key: str, cached_response: CachedResponse) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+
+class SQLiteHttpCache(HttpCache):
+    """
+    An HTTP response cache stored in a SQLite database.
+
+    - The total size of the responses is kept as a running total, so a write
+      only scans the table when the cache is over its size.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_age: int = DEFAULT_MAX_AGE,
+        max_size: int = DEFAULT_MAX_SIZE,
+    ):
+        self.path = path
+        self.max_age = max_age
+        self.max_size = max_size
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # The cache is shared by the threads of the concurrent fetchers, so
+        # access to the connection is serialised with a lock.
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(self.path),
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                content BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            """
+            CREATE INDEX IF NOT EXISTS responses_stored_at
+            ON responses (stored_at)
+            """
+        )
+
+        with self._lock:
+            (self._total_size,) = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            self._evict()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._connection.execute(
+                """
+                SELECT url, status_code, headers, content, stored_at, expires_at
+                FROM responses
+                WHERE key = ?
+                """,
+                (key,),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            self._connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+
+        url, status_code, headers, content, stored_at, expires_at = row
+
+        return CachedResponse(
+            url=url,
+            status_code=status_code,
+            headers=json.loads(headers),
+            content=content,
+            stored_at=stored_at,
+            expires_at=expires_at,
+        )
+
+    def _get_size(self, key: str) -> int:
+        row = self._connection.execute(
+            "SELECT size FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        return 0 if row is None else row[0]
+
+    def set(self, key: str, cached_response: CachedResponse) -> None:
+        with self._lock:
+            replaced_size = self._get_size(key)
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO responses (
+                    key,
+                    url,
+                    status_code,
+                    headers,
+                    content,
+                    size,
+                    stored_at,
+                    expires_at,
+                    accessed_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    key,
+                    cached_response.url,
+                    cached_response.status_code,
+                    json.dumps(cached_response.headers),
+                    cached_response.content,
+                    len(cached_response.content),
+                    cached_response.stored_at,
+                    cached_response.expires_at,
+                    time.time(),
+                ),
+            )
+            self._total_size += len(cached_response.content) - replaced_size
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._total_size -= self._get_size(key)
+            self._connection.execute(
+                "DELETE FROM responses WHERE key = ?", (key,)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._total_size = 0
+
+    def _evict(self) -> None:
+        """
+        Evict entries that are too old or that push the cache over its size.
+        """
+        # The old entries are found with the stored_at index.
+        evicted_before = time.time() - self.max_age
+        (expired_count, expired_size) = self._connection.execute(
+            """
+            SELECT COUNT(*), COALESCE(SUM(size), 0)
+            FROM responses
+            WHERE stored_at < ?
+            """,
+            (evicted_before,),
+        ).fetchone()
+
+        if expired_count > 0:
+            self._connection.execute(
+                "DELETE FROM responses WHERE stored_at < ?", (evicted_before,)
+            )
+            self._total_size -= expired_size
+
+        if self._total_size <= self.max_size:
+            return None
+
+        total_size = self._total_size
+
+        keys_to_evict = []
+        rows = self._connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        )
+        for key, size in rows:
+            if total_size <= self.max_size:
+                break
+
+            keys_to_evict.append((key,))
+            total_size -= size
+
+        self._connection.executemany(
+            "DELETE FROM responses WHERE key = ?", keys_to_evict
+        )
+        self._total_size = total_size
+
+
+def update_cache(
+    cache: HttpCache,
+    cache_key: str,
+    url: str,
+    status_code: int,
+    headers: Dict[str, str],
+    content: bytes,
+    cached_response: Optional[CachedResponse] = None,
+) -> Union[CachedResponse, None]:
+    """
+    Store the response in the cache, or refresh the cached response if the
+    server says it has not been modified.
+
+    - The `headers` must be normalized with `normalize_headers`.
+    - Returns the refreshed cached response to use in place of a 304
+      response, otherwise None.
+    """
+    now = time.time()
+
+    if status_code == 304 and cached_response is not None:
+        # The 304 response carries the updated freshness information for
+        # the cached response.
+        cached_response.headers.update(headers)
+        expires_at = get_expires_at(cached_response.headers, now=now)
+
+        if expires_at is None:
+            cache.delete(cache_key)
+        else:
+            cached_response.expires_at = expires_at
+            cache.set(cache_key, cached_response)
+
+        return cached_response
+
+    if status_code != 200:
+        return None
+
+    expires_at = get_expires_at(headers, now=now)
+    if expires_at is None:
+        cache.delete(cache_key)
+        return None
+
+    new_cached_response = CachedResponse(
+        url=url,
+        status_code=status_code,
+        headers=headers,
+        content=content,
+        stored_at=now,
+        expires_at=expires_at,
+    )
+
+    # Responses that can't be revalidated and are already stale would never
+    # be used, so there is no point in storing them.
+    if (
+        new_cached_response.is_fresh(now=now) is False
+        and new_cached_response.can_revalidate is False
+    ):
+        return None
+
+    cache.set(cache_key, new_cached_response)
+
+    return None
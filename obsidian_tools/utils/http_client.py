@@ -1,12 +1,54 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
 from enum import Enum
 from importlib.metadata import version
-from typing import Dict, Optional, Tuple, Union
+from typing import Callable, ClassVar, Dict, Final, Optional, Tuple, Union
 
-from requests import PreparedRequest, Request, Response, Session
+from requests import (
+    ConnectionError,
+    PreparedRequest,
+    Request,
+    RequestException,
+    Response,
+    Session,
+    Timeout,
+)
+from requests.adapters import HTTPAdapter
 from requests.auth import AuthBase
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from obsidian_tools.utils import http_stats
+from obsidian_tools.utils.http_cache import (
+    CachedResponse,
+    HttpCache,
+    build_cache_key,
+    get_cache_namespace,
+    normalize_headers,
+    update_cache,
+)
+from obsidian_tools.utils.rate_limit import (
+    RateLimit,
+    RateLimiter,
+    parse_retry_after,
+)
+from obsidian_tools.utils.retry import RetryPolicy
 
 RequestReturn = Tuple[PreparedRequest, Response]
 
+# The number of hosts to keep connection pools for, and the number of
+# connections to keep open to each host. The requests defaults (10 and 10)
+# are too small for the parallel commands.
+DEFAULT_POOL_CONNECTIONS: Final = 10
+DEFAULT_POOL_MAXSIZE: Final = 32
+
+# The number of responses to memoize for a command run, enough for the works
+# and authors of a bulk import.
+DEFAULT_MEMO_SIZE: Final = 1024
+
 
 class HttpMethod(str, Enum):
     GET = "GET"
@@ -16,24 +58,174 @@ class HttpMethod(str, Enum):
     PUT = "PUT"
 
 
+@dataclass(frozen=True)
+class ApiRequest:
+    """
+    A request to an API endpoint.
+
+    - The integrations build their requests once, and send them with either
+      the `HttpClient` or the `AsyncHttpClient`.
+    - A string `data` is sent as the body as is, a dictionary is form
+      encoded.
+    """
+
+    method: HttpMethod
+    url: str
+    params: Optional[Dict[str, str]] = None
+    data: Union[str, Dict[str, str], None] = None
+
+
+def get_user_agent() -> str:
+    return f"obsidian-tools/{version('obsidian-tools')} (+https://github.com/myles/obsidian-tools/)"
+
+
+def cached_response_to_response(
+    cached_response: CachedResponse, request: PreparedRequest
+) -> Response:
+    """
+    Build a requests Response from a cached response.
+    """
+    response = Response()
+    response.status_code = cached_response.status_code
+    response.headers = CaseInsensitiveDict(cached_response.headers)
+    response._content = cached_response.content
+    response.url = cached_response.url
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.request = request
+    return response
+
+
+def get_response_size(response: Response, stream: bool = False) -> int:
+    """
+    Get the size of the response body, without reading a streamed body.
+    """
+    if stream is True:
+        content_length = response.headers.get("Content-Length", "")
+        return int(content_length) if content_length.isdigit() else 0
+
+    return len(response.content or b"")
+
+
+def record_response(
+    request: PreparedRequest,
+    response: Response,
+    elapsed: float,
+    stream: bool = False,
+    cache: Optional[str] = None,
+) -> None:
+    """
+    Publish the event of a request that got a response.
+
+    - Responses that didn't come from the network don't have a TTFB, and
+      their body isn't counted in the bytes. Neither is the cached body of a
+      revalidated response, only its 304 came from the network.
+    """
+    http_stats.record_request(
+        method=str(request.method),
+        url=str(request.url),
+        status_code=response.status_code,
+        bytes=(
+            get_response_size(response, stream)
+            if cache in (None, "miss")
+            else 0
+        ),
+        elapsed=elapsed,
+        ttfb=(
+            response.elapsed.total_seconds()
+            if cache in (None, "miss", "revalidated")
+            else None
+        ),
+        cache=cache,
+    )
+
+
+def build_http_adapter(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    pool_block: bool = False,
+) -> HTTPAdapter:
+    """
+    Build an HTTP adapter with a connection pool.
+
+    - With `pool_block` a thread waits for a free connection when the pool is
+      full, instead of opening a connection that's thrown away afterwards.
+    - Retries are handled by the `HttpClient`, so the adapter doesn't retry.
+    """
+    return HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+
+
+def build_session(adapter: Optional[HTTPAdapter] = None) -> Session:
+    """
+    Build a session that can be shared between clients.
+
+    - The connections to each host are pooled and kept alive, so clients that
+      share a session reuse each other's warm TLS connections.
+    - Authentication is applied by each client to its own requests, not to
+      the session.
+    """
+    if adapter is None:
+        adapter = build_http_adapter()
+
+    session = Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
 class HttpClient:
+    # The rate limits of the hosts the client talks to, keyed by host.
+    rate_limits: ClassVar[Dict[str, RateLimit]] = {}
+
+    # How failed requests are retried, see `RetryPolicy`.
+    retry_policy: RetryPolicy = RetryPolicy()
+
     def __init__(
         self,
         session: Optional[Session] = None,
         auth: Optional[AuthBase] = None,
+        cache: Optional[HttpCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        memo_size: int = 0,
     ):
+        # Pass a session from `build_session` to share connections with
+        # other clients.
         if session is None:
-            self.session = Session()
+            self.session = build_session()
         else:
             self.session = session
 
-        # Set the authentication method if provided.
-        if auth is not None:
-            self.session.auth = auth
+        # The authentication is applied to each request, because the session
+        # may be shared with other clients.
+        self.auth = auth
 
         # Set a custom User-Agent header because we are nice web citizens.
-        user_agent = f"obsidian-tools/{version('obsidian-tools')} (+https://github.com/myles/obsidian-tools/)"
-        self.session.headers.update({"User-Agent": user_agent})
+        self.session.headers.update({"User-Agent": get_user_agent()})
+
+        # Only GET requests are cached, see the `request` method.
+        self.cache = cache
+
+        # Requests are spaced out to stay within the hosts' rate limits, pass
+        # a rate limiter to share it between clients or change the limits.
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(self.rate_limits)
+        self.rate_limiter = rate_limiter
+
+        if retry_policy is not None:
+            self.retry_policy = retry_policy
+
+        # Identical GET requests in flight at the same time are only sent
+        # once, and with a `memo_size` the last successful responses are
+        # kept for the life of the client.
+        self.memo_size = memo_size
+        self._memo: OrderedDict[str, RequestReturn] = OrderedDict()
+        self._in_flight: Dict[str, Future[RequestReturn]] = {}
+        self._in_flight_lock = threading.Lock()
 
     def request(
         self,
@@ -43,6 +235,7 @@ class HttpClient:
         params: Optional[Dict[str, str]] = None,
         stream: bool = False,
         timeout: Union[int, Tuple[int, int], None] = None,
+        retry_policy: Optional[RetryPolicy] = None,
         **kwargs,
     ) -> RequestReturn:
         timeout = timeout or (5, 30)
@@ -52,14 +245,288 @@ class HttpClient:
             url=url,
             headers=headers,
             params=params,
+            auth=self.auth,
             **kwargs,
         )
         prepare_request = self.session.prepare_request(request)
-        response = self.session.send(
-            prepare_request, stream=stream, timeout=timeout
+
+        def send() -> RequestReturn:
+            return self._request(
+                prepare_request,
+                stream=stream,
+                timeout=timeout,
+                retry_policy=retry_policy or self.retry_policy,
+            )
+
+        # Streamed responses can only be read once, so they aren't shared.
+        if method != HttpMethod.GET or stream is True:
+            return send()
+
+        return self._coalesce(
+            self._build_cache_key(prepare_request),
+            send,
         )
+
+    def _build_cache_key(self, prepare_request: PreparedRequest) -> str:
+        """
+        Build the cache key of a request, in the namespace of the client's
+        authentication.
+        """
+        return build_cache_key(
+            method=str(prepare_request.method),
+            url=str(prepare_request.url),
+            body=prepare_request.body,
+            namespace=get_cache_namespace(self.auth),
+        )
+
+    def _coalesce(
+        self, key: str, send: Callable[[], RequestReturn]
+    ) -> RequestReturn:
+        """
+        Send the request, unless an identical request is already in flight or
+        memoized, then return its request and response.
+
+        - The callers share the same response object, its content has
+          already been read.
+        """
+        started_at = time.perf_counter()
+
+        with self._in_flight_lock:
+            memoized = self._memo.get(key)
+            if memoized is not None:
+                self._memo.move_to_end(key)
+
+            in_flight = self._in_flight.get(key)
+            if memoized is None and in_flight is None:
+                future: Future[RequestReturn] = Future()
+                self._in_flight[key] = future
+
+        if memoized is not None:
+            record_response(memoized[0], memoized[1], elapsed=0.0, cache="memo")
+            return memoized
+
+        if in_flight is not None:
+            result = in_flight.result()
+            record_response(
+                result[0],
+                result[1],
+                elapsed=time.perf_counter() - started_at,
+                cache="coalesced",
+            )
+            return result
+
+        try:
+            result = send()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(key, None)
+
+        if self.memo_size > 0 and result[1].status_code == 200:
+            with self._in_flight_lock:
+                self._memo[key] = result
+                if len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+
+        future.set_result(result)
+        return result
+
+    def _request(
+        self,
+        prepare_request: PreparedRequest,
+        stream: bool,
+        timeout: Union[int, Tuple[int, int]],
+        retry_policy: RetryPolicy,
+    ) -> RequestReturn:
+        """
+        Send the request, or get its response from the cache.
+        """
+        method = HttpMethod(prepare_request.method)
+        started_at = time.perf_counter()
+
+        # Streamed responses are never cached because their content is not
+        # read up front.
+        cache_key: Union[str, None] = None
+        cached_response: Union[CachedResponse, None] = None
+        if (
+            self.cache is not None
+            and method == HttpMethod.GET
+            and stream is False
+        ):
+            cache_key = self._build_cache_key(prepare_request)
+            cached_response = self.cache.get(cache_key)
+
+        if cached_response is not None:
+            if cached_response.is_fresh():
+                response = cached_response_to_response(
+                    cached_response, prepare_request
+                )
+                record_response(
+                    prepare_request,
+                    response,
+                    elapsed=time.perf_counter() - started_at,
+                    cache="hit",
+                )
+                return prepare_request, response
+
+            # Revalidate the stale response with a conditional request.
+            if cached_response.etag is not None:
+                prepare_request.headers["If-None-Match"] = cached_response.etag
+            if cached_response.last_modified is not None:
+                prepare_request.headers["If-Modified-Since"] = (
+                    cached_response.last_modified
+                )
+
+        try:
+            response = self._send(
+                prepare_request,
+                stream=stream,
+                timeout=timeout,
+                retry_policy=retry_policy,
+            )
+        except RequestException as error:
+            http_stats.record_request(
+                method=str(prepare_request.method),
+                url=str(prepare_request.url),
+                status_code=None,
+                bytes=0,
+                elapsed=time.perf_counter() - started_at,
+                error=error,
+            )
+            raise error
+
+        cache_status: Union[str, None] = None
+        if cache_key is not None:
+            cache_status = (
+                "revalidated"
+                if response.status_code == 304 and cached_response is not None
+                else "miss"
+            )
+            response = self._update_cache(
+                cache_key=cache_key,
+                request=prepare_request,
+                response=response,
+                cached_response=cached_response,
+            )
+
+        record_response(
+            prepare_request,
+            response,
+            elapsed=time.perf_counter() - started_at,
+            stream=stream,
+            cache=cache_status,
+        )
+
         return prepare_request, response
 
+    def _send(
+        self,
+        request: PreparedRequest,
+        stream: bool,
+        timeout: Union[int, Tuple[int, int]],
+        retry_policy: RetryPolicy,
+    ) -> Response:
+        """
+        Send the request, waiting for the rate limit and retrying transient
+        failures.
+        """
+        url = str(request.url)
+        method = str(request.method)
+
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(url)
+
+            try:
+                response = self.session.send(
+                    request, stream=stream, timeout=timeout
+                )
+            except (ConnectionError, Timeout) as error:
+                if (
+                    retry_policy.can_retry(attempt) is False
+                    or retry_policy.should_retry_error(method, error) is False
+                ):
+                    raise error
+
+                time.sleep(retry_policy.get_backoff(attempt) or 0.0)
+                attempt += 1
+                continue
+
+            self.rate_limiter.update(
+                url, response.status_code, response.headers
+            )
+
+            if (
+                retry_policy.can_retry(attempt) is False
+                or retry_policy.should_retry_status(
+                    method, response.status_code
+                )
+                is False
+            ):
+                return response
+
+            backoff = retry_policy.get_backoff(
+                attempt,
+                retry_after=parse_retry_after(
+                    response.headers.get("Retry-After")
+                ),
+            )
+            if backoff is None:
+                return response
+
+            # Release the connection back to the pool before retrying.
+            response.close()
+
+            time.sleep(backoff)
+            attempt += 1
+
+    def _update_cache(
+        self,
+        cache_key: str,
+        request: PreparedRequest,
+        response: Response,
+        cached_response: Optional[CachedResponse],
+    ) -> Response:
+        """
+        Store the response in the cache, or refresh the cached response if the
+        server says it has not been modified.
+        """
+        if self.cache is None:
+            return response
+
+        refreshed_response = update_cache(
+            self.cache,
+            cache_key,
+            url=response.url,
+            status_code=response.status_code,
+            headers=normalize_headers(response.headers),
+            content=response.content,
+            cached_response=cached_response,
+        )
+        if refreshed_response is None:
+            return response
+
+        return cached_response_to_response(refreshed_response, request)
+
+    def fetch(self, api_request: ApiRequest, **kwargs) -> RequestReturn:
+        """
+        Send an API request, raising an `HTTPError` for an error response.
+        """
+        if api_request.data is not None:
+            kwargs["data"] = api_request.data
+
+        request, response = self.request(
+            api_request.method,
+            api_request.url,
+            params=api_request.params,
+            **kwargs,
+        )
+        response.raise_for_status()
+
+        return request, response
+
     def get(self, url: str, **kwargs) -> RequestReturn:
         return self.request(HttpMethod.GET, url, **kwargs)
 
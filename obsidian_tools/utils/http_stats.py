@@ -0,0 +1,263 @@
+"""
+This module provides the instrumentation of the HTTP clients.
+
+- The clients publish a `RequestEvent` for every request, listeners subscribe
+  to them with `subscribe`. Nothing is recorded without a listener.
+- `RequestStats` is a listener that adds up the events by endpoint, so a slow
+  command can be traced to the integration it spends its time in.
+"""
+
+import re
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Final, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Path segments that are identifiers, like TMDB IDs, Open Library keys and
+# ISBNs, are replaced with a placeholder in the endpoint templates.
+RE_ID_PATH_SEGMENT: Final = re.compile(r"^(\d+|OL\d+[AMW]|\d{9}[\dX])$")
+ID_PLACEHOLDER: Final = "{id}"
+
+
+@dataclass(frozen=True)
+class RequestEvent:
+    """
+    A request made by a client.
+
+    - `cache` is how the response was found: "hit", "revalidated" or "miss"
+      for the HTTP cache, "memo" or "coalesced" for responses shared in the
+      client, and None if the response wasn't cacheable.
+    - `bytes` is the size of the body read from the network, responses from
+      the cache or shared in the client count as 0 bytes.
+    - `elapsed` is the total time of the request, including the time spent
+      waiting for the rate limit and retries. `ttfb` is the time from sending
+      the last attempt to receiving its headers.
+    - The connection (DNS, connect and TLS) time is part of the `ttfb`, the
+      HTTP libraries don't report it on its own.
+    """
+
+    method: str
+    host: str
+    endpoint: str
+    status_code: Optional[int]
+    bytes: int
+    elapsed: float
+    ttfb: Optional[float] = None
+    cache: Optional[str] = None
+    error: Optional[str] = None
+
+
+RequestEventListener = Callable[[RequestEvent], None]
+
+_listeners: List[RequestEventListener] = []
+_listeners_lock = threading.Lock()
+
+
+def subscribe(listener: RequestEventListener) -> Callable[[], None]:
+    """
+    Call the listener with every request event, returns a function that
+    unsubscribes it.
+
+    - Listeners are called in the thread that made the request.
+    """
+    with _listeners_lock:
+        _listeners.append(listener)
+
+    def unsubscribe() -> None:
+        with _listeners_lock:
+            if listener in _listeners:
+                _listeners.remove(listener)
+
+    return unsubscribe
+
+
+def has_listeners() -> bool:
+    return len(_listeners) > 0
+
+
+def publish(event: RequestEvent) -> None:
+    with _listeners_lock:
+        listeners = list(_listeners)
+
+    for listener in listeners:
+        listener(event)
+
+
+def record_request(
+    method: str,
+    url: str,
+    status_code: Optional[int],
+    bytes: int,
+    elapsed: float,
+    ttfb: Optional[float] = None,
+    cache: Optional[str] = None,
+    error: Optional[BaseException] = None,
+) -> None:
+    """
+    Publish the event of a request, if anything is listening.
+    """
+    if has_listeners() is False:
+        return None
+
+    host, endpoint = get_endpoint_template(url)
+    publish(
+        RequestEvent(
+            method=method,
+            host=host,
+            endpoint=endpoint,
+            status_code=status_code,
+            bytes=bytes,
+            elapsed=elapsed,
+            ttfb=ttfb,
+            cache=cache,
+            error=type(error).__name__ if error is not None else None,
+        )
+    )
+
+
+def get_endpoint_template(url: str) -> Tuple[str, str]:
+    """
+    Get the host and the endpoint template of a URL.
+
+    - For example `https://openlibrary.org/works/OL1W.json` is
+      `("openlibrary.org", "/works/{id}.json")`.
+    - The first path segment is kept as is, so API versions like TMDB's
+      `/3/` aren't mistaken for identifiers.
+    """
+    parts = urlsplit(url)
+
+    segments = parts.path.split("/")
+    for index, segment in enumerate(segments):
+        # The leading empty segment and the API version.
+        if index < 2:
+            continue
+
+        stem, dot, suffix = segment.partition(".")
+        if RE_ID_PATH_SEGMENT.match(stem) is not None:
+            segments[index] = f"{ID_PLACEHOLDER}{dot}{suffix}"
+
+    return parts.hostname or "", "/".join(segments)
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+    max_elapsed: float = 0.0
+    ttfb: float = 0.0
+    status_codes: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, event: RequestEvent) -> None:
+        self.requests += 1
+        self.bytes += event.bytes
+        self.elapsed += event.elapsed
+        self.max_elapsed = max(self.max_elapsed, event.elapsed)
+        self.ttfb += event.ttfb or 0.0
+
+        if event.cache in ("hit", "memo", "coalesced"):
+            self.cache_hits += 1
+
+        if event.error is not None or (event.status_code or 0) >= 400:
+            self.errors += 1
+
+        status = str(event.status_code or event.error)
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+
+    def merge(self, other: "EndpointStats") -> None:
+        self.requests += other.requests
+        self.errors += other.errors
+        self.cache_hits += other.cache_hits
+        self.bytes += other.bytes
+        self.elapsed += other.elapsed
+        self.max_elapsed = max(self.max_elapsed, other.max_elapsed)
+        self.ttfb += other.ttfb
+
+        for status, count in other.status_codes.items():
+            self.status_codes[status] = self.status_codes.get(status, 0) + count
+
+
+class RequestStats:
+    """
+    Add up the request events by endpoint, use `record` as the listener.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.endpoints: Dict[Tuple[str, str, str], EndpointStats] = {}
+
+    def record(self, event: RequestEvent) -> None:
+        key = (event.host, event.method, event.endpoint)
+
+        with self._lock:
+            self.endpoints.setdefault(key, EndpointStats()).add(event)
+
+    def get_hosts(self) -> Dict[str, EndpointStats]:
+        """
+        Get the stats added up by host.
+        """
+        hosts: Dict[str, EndpointStats] = {}
+
+        with self._lock:
+            for (host, _, _), stats in self.endpoints.items():
+                hosts.setdefault(host, EndpointStats()).merge(stats)
+
+        return hosts
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = [
+                {
+                    "host": host,
+                    "method": method,
+                    "endpoint": endpoint,
+                    **asdict(stats),
+                }
+                for (host, method, endpoint), stats in self.endpoints.items()
+            ]
+
+        return {
+            "hosts": {
+                host: asdict(stats) for host, stats in self.get_hosts().items()
+            },
+            "endpoints": endpoints,
+        }
+
+    def format_summary(self) -> List[str]:
+        """
+        Format the stats as lines of text, the slowest hosts and endpoints
+        first.
+        """
+        if not self.endpoints:
+            return ["No HTTP requests."]
+
+        with self._lock:
+            endpoints = sorted(
+                self.endpoints.items(), key=lambda item: -item[1].elapsed
+            )
+
+        lines = []
+        for host, stats in sorted(
+            self.get_hosts().items(), key=lambda item: -item[1].elapsed
+        ):
+            lines.append(
+                f"{host}: {stats.requests} requests, "
+                f"{stats.cache_hits} cached, {stats.errors} errors, "
+                f"{stats.bytes} bytes, {stats.elapsed:.2f}s"
+            )
+
+            for (endpoint_host, method, endpoint), endpoint_stats in endpoints:
+                if endpoint_host != host:
+                    continue
+
+                average = endpoint_stats.elapsed / endpoint_stats.requests
+                lines.append(
+                    f"  {method} {endpoint}: {endpoint_stats.requests} "
+                    f"requests, {endpoint_stats.elapsed:.2f}s total, "
+                    f"{average:.2f}s average, "
+                    f"{endpoint_stats.max_elapsed:.2f}s max"
+                )
+
+        return lines
@@ -0,0 +1,28 @@
+from itertools import islice
+from typing import Generator, Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+
+def chunked(items: Iterable[T], size: int) -> List[List[T]]:
+    """
+    Split the items into lists of at most `size` items.
+    """
+    if size < 1:
+        raise ValueError("Size must be at least one.")
+
+    items = list(items)
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def ichunked(items: Iterable[T], size: int) -> Generator[List[T], None, None]:
+    """
+    Split the items into lists of at most `size` items, reading the items
+    lazily.
+    """
+    if size < 1:
+        raise ValueError("Size must be at least one.")
+
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,217 @@
+"""
+This module provides rate limiting for the HTTP clients.
+
+- Each host gets a token bucket, so a client that talks to more than one host
+  (like IGDB and Twitch) only limits the host with the limit.
+- Tokens are reserved up front and may go negative, the caller then waits for
+  its turn. This keeps the requests from several threads evenly spaced.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Final, Mapping, Optional, Union
+from urllib.parse import urlsplit
+
+from requests.structures import CaseInsensitiveDict
+
+# Headers that tell us how many requests are left in the current window.
+RATE_LIMIT_REMAINING_HEADERS: Final = ("X-Discogs-Ratelimit-Remaining",)
+
+# Status codes that can come with a Retry-After header.
+RETRY_AFTER_STATUS_CODES: Final = (429, 503)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    Allow `requests` requests every `period` seconds, with bursts of up to
+    `requests` requests.
+    """
+
+    requests: int
+    period: float = 1.0
+
+    @property
+    def rate(self) -> float:
+        return self.requests / self.period
+
+
+def parse_retry_after(
+    value: Union[str, None], now: Optional[float] = None
+) -> Union[float, None]:
+    """
+    Parse a Retry-After header into the number of seconds to wait.
+
+    - The header is either a number of seconds or an HTTP date.
+    """
+    if value is None:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    now = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - now)
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket.
+    """
+
+    def __init__(
+        self,
+        rate_limit: RateLimit,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate_limit.rate
+        self.capacity = float(rate_limit.requests)
+
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self.capacity,
+            self._tokens + (now - self._updated_at) * self.rate,
+        )
+        self._updated_at = now
+
+    def reserve(self) -> float:
+        """
+        Take a token, returning how many seconds to wait before using it.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        """
+        Take a token, blocking the thread until it can be used.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            self._sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """
+        Take a token, waiting without blocking the event loop.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def limit_available(self, remaining: float) -> None:
+        """
+        Make sure no more than `remaining` tokens are available, when the
+        server says we have fewer requests left than we think.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, remaining)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Don't hand out any tokens for the next `seconds` seconds.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class RateLimiter:
+    """
+    A rate limiter with a token bucket for each host.
+
+    - Hosts without a rate limit aren't limited until they send a Retry-After
+      header, after that they are limited to one request per second.
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[str, RateLimit],
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.limits = dict(limits)
+
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def get_bucket(self, url: str) -> Union[TokenBucket, None]:
+        host = urlsplit(url).hostname or ""
+
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None and host in self.limits:
+                bucket = TokenBucket(
+                    self.limits[host], clock=self._clock, sleep=self._sleep
+                )
+                self._buckets[host] = bucket
+
+        return bucket
+
+    def acquire(self, url: str) -> None:
+        bucket = self.get_bucket(url)
+        if bucket is not None:
+            bucket.acquire()
+
+    async def acquire_async(self, url: str) -> None:
+        bucket = self.get_bucket(url)
+        if bucket is not None:
+            await bucket.acquire_async()
+
+    def update(
+        self, url: str, status_code: int, headers: Mapping[str, str]
+    ) -> None:
+        """
+        Adapt to the rate limit headers of a response.
+        """
+        headers = CaseInsensitiveDict(headers)
+
+        retry_after = None
+        if status_code in RETRY_AFTER_STATUS_CODES:
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+
+        if retry_after is not None:
+            bucket = self.get_bucket(url)
+            if bucket is None:
+                # Hosts without a limit get one from the first Retry-After, so
+                # there is a bucket to pause.
+                host = urlsplit(url).hostname or ""
+                with self._lock:
+                    self.limits.setdefault(host, RateLimit(requests=1))
+                bucket = self.get_bucket(url)
+
+            if bucket is not None:
+                bucket.pause(retry_after)
+
+        for header in RATE_LIMIT_REMAINING_HEADERS:
+            remaining = headers.get(header)
+            if remaining is None or not remaining.isdigit():
+                continue
+
+            bucket = self.get_bucket(url)
+            if bucket is not None:
+                bucket.limit_available(int(remaining))
@@ -0,0 +1,89 @@
+"""
+This module provides the retry policy for the HTTP clients.
+
+- Requests are retried with exponential backoff and full jitter, so clients
+  that fail together don't retry together.
+- Only idempotent requests are retried, unless the connection timed out
+  before the request was sent.
+"""
+
+import random
+from dataclasses import dataclass, replace
+from typing import Callable, Final, FrozenSet, Union
+
+from requests import ConnectionError, RequestException, Timeout
+from requests.exceptions import ConnectTimeout
+
+DEFAULT_RETRY_STATUS_CODES: Final = frozenset({429, 500, 502, 503, 504})
+DEFAULT_RETRY_METHODS: Final = frozenset(
+    {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How many times, and how long to wait before, retrying a failed request.
+
+    - The wait before retry `n` (starting at zero) is a random time up to
+      `backoff_factor * 2 ** n` seconds, capped at `max_backoff`.
+    - A Retry-After header longer than the backoff is waited for, unless it's
+      longer than `max_backoff`, then the request isn't retried.
+    """
+
+    max_retries: int = 3
+    backoff_factor: float = 0.5
+    max_backoff: float = 30.0
+    status_codes: FrozenSet[int] = DEFAULT_RETRY_STATUS_CODES
+    methods: FrozenSet[str] = DEFAULT_RETRY_METHODS
+
+    def with_max_retries(self, max_retries: int) -> "RetryPolicy":
+        return replace(self, max_retries=max_retries)
+
+    def can_retry(self, attempt: int) -> bool:
+        return attempt < self.max_retries
+
+    def should_retry_status(self, method: str, status_code: int) -> bool:
+        return method in self.methods and status_code in self.status_codes
+
+    def should_retry_error(self, method: str, error: RequestException) -> bool:
+        if not isinstance(error, (ConnectionError, Timeout)):
+            return False
+
+        return self.should_retry_failure(
+            method, was_sent=not isinstance(error, ConnectTimeout)
+        )
+
+    def should_retry_failure(self, method: str, was_sent: bool) -> bool:
+        """
+        Should a request that failed without a response be retried.
+
+        - A request that was never sent can't be repeated by retrying it, so
+          it's retried whatever the method.
+        """
+        return was_sent is False or method in self.methods
+
+    def get_backoff(
+        self,
+        attempt: int,
+        retry_after: Union[float, None] = None,
+        rand: Callable[[], float] = random.random,
+    ) -> Union[float, None]:
+        """
+        Get the number of seconds to wait before the retry, or None if the
+        server asked us to wait too long.
+        """
+        backoff = rand() * min(
+            self.max_backoff, self.backoff_factor * 2**attempt
+        )
+
+        if retry_after is None:
+            return backoff
+
+        if retry_after > self.max_backoff:
+            return None
+
+        return max(backoff, retry_after)
+
+
+NO_RETRY: Final = RetryPolicy(max_retries=0)
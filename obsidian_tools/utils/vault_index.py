@@ -0,0 +1,157 @@
+"""
+This module provides a persistent index of the frontmatter of notes in a vault.
+
+- Each note is stored with its modified time and size, and is only parsed again
+  when either of them changes.
+- Frontmatter values that can't be stored as JSON (like dates) are stored as
+  strings.
+- Notes with frontmatter that isn't valid YAML are left out of the listings.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import yaml
+
+from obsidian_tools.utils.frontmatter_utils import NoteMetadata
+
+NoteMetadataLoader = Callable[[Path], NoteMetadata]
+
+logger = logging.getLogger(__name__)
+
+
+class VaultIndex:
+    """
+    A SQLite index of note frontmatter keyed by the note's path.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(self.path),
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS notes (
+                path TEXT PRIMARY KEY,
+                dir_path TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                metadata TEXT NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS notes_dir_path ON notes (dir_path)"
+        )
+
+    def list_metadata(
+        self,
+        dir_path: Path,
+        loader: NoteMetadataLoader,
+        pattern: str = "*.md",
+    ) -> List[Tuple[Path, NoteMetadata]]:
+        """
+        List the notes in the directory with their frontmatter, sorted by
+        path.
+
+        - Only the notes that are new or changed since the last listing are
+          loaded with the `loader`.
+        - Notes that no longer exist, or whose frontmatter can't be parsed, are
+          removed from the index.
+        """
+        file_paths = sorted(dir_path.glob(pattern))
+
+        with self._lock:
+            rows = self._connection.execute(
+                """
+                SELECT path, mtime_ns, size, metadata
+                FROM notes
+                WHERE dir_path = ?
+                """,
+                (str(dir_path),),
+            ).fetchall()
+
+        indexed_notes = {
+            path: (mtime_ns, size, metadata)
+            for path, mtime_ns, size, metadata in rows
+        }
+
+        notes = []
+        changed_rows = []
+        invalid_rows = []
+        for file_path in file_paths:
+            try:
+                stat = file_path.stat()
+                indexed_note = indexed_notes.pop(str(file_path), None)
+
+                if indexed_note is not None and indexed_note[:2] == (
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                ):
+                    metadata = json.loads(indexed_note[2])
+                else:
+                    # Round trip through JSON, so the metadata looks the same
+                    # whether or not it came from the index.
+                    encoded_metadata = json.dumps(
+                        loader(file_path), default=str
+                    )
+                    metadata = json.loads(encoded_metadata)
+                    changed_rows.append(
+                        (
+                            str(file_path),
+                            str(dir_path),
+                            stat.st_mtime_ns,
+                            stat.st_size,
+                            encoded_metadata,
+                        )
+                    )
+            except FileNotFoundError:
+                continue
+            except yaml.YAMLError as error:
+                logger.warning(
+                    "Skipping %s, its frontmatter is invalid: %s",
+                    file_path,
+                    error,
+                )
+                invalid_rows.append((str(file_path),))
+                continue
+
+            notes.append((file_path, metadata))
+
+        # Anything left over in the indexed notes has been deleted or moved.
+        removed_rows = [(path,) for path in indexed_notes.keys()]
+        removed_rows.extend(invalid_rows)
+
+        if changed_rows or removed_rows:
+            with self._lock:
+                self._connection.execute("BEGIN")
+                self._connection.executemany(
+                    """
+                    INSERT OR REPLACE INTO notes (
+                        path, dir_path, mtime_ns, size, metadata
+                    )
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    changed_rows,
+                )
+                self._connection.executemany(
+                    "DELETE FROM notes WHERE path = ?", removed_rows
+                )
+                self._connection.execute("COMMIT")
+
+        return notes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM notes")
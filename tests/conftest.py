@@ -69,6 +69,13 @@ def resp_openlibrary_author_two():
         return json.load(file_obj)
 
 
+@pytest.fixture
+def resp_openlibrary_books_api():
+    path_obj = RESPONSES_DIR_PATH / "openlibrary" / "books_api.json"
+    with path_obj.open() as file_obj:
+        return json.load(file_obj)
+
+
 @pytest.fixture
 def resp_openlibrary_edition():
     path_obj = RESPONSES_DIR_PATH / "openlibrary" / "edition.json"
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import httpx
+
+from obsidian_tools.integrations.aio import AsyncIGDBClient, AsyncTMDBClient
+from obsidian_tools.integrations.igdb import (
+    TWITCH_TOKEN_URL,
+    IGDBAccessToken,
+    load_access_token,
+    save_access_token,
+)
+
+
+def test_async_tmdb_client__get_tv_seasons_details():
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["Authorization"] == "Bearer i-am-a-tmdb-api-key"
+        return httpx.Response(
+            200,
+            json={
+                "append_to_response": request.url.params["append_to_response"]
+            },
+        )
+
+    async def run():
+        async with AsyncTMDBClient(
+            api_key="i-am-a-tmdb-api-key",
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        ) as client:
+            return await client.get_tv_seasons_details(
+                series_id=1, season_numbers=range(1, 26), max_concurrency=2
+            )
+
+    results = asyncio.run(run())
+
+    assert [
+        response.json()["append_to_response"] for _, response in results
+    ] == [
+        ",".join(f"season/{number}" for number in range(1, 21)),
+        ",".join(f"season/{number}" for number in range(21, 26)),
+    ]
+
+
+def test_async_igdb_client__refreshes_access_token_on_401(tmp_path):
+    path = tmp_path / "igdb-token.json"
+    save_access_token(
+        path,
+        IGDBAccessToken("client-id", "revoked-token", time.time() + 86400 * 7),
+    )
+    twitch_calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal twitch_calls
+        if request.url == TWITCH_TOKEN_URL:
+            assert "Authorization" not in request.headers
+            twitch_calls += 1
+            return httpx.Response(
+                200, json={"access_token": "new-token", "expires_in": 5184000}
+            )
+
+        if request.headers["Authorization"] == "Bearer revoked-token":
+            return httpx.Response(401)
+
+        return httpx.Response(200, json=[{"id": 1, "name": "Game"}])
+
+    async def run():
+        async with AsyncIGDBClient(
+            client_id="client-id",
+            client_secret="client-secret",
+            access_token_path=path,
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        ) as client:
+            return await asyncio.gather(
+                *(client.get_game(game_id=1) for _ in range(5))
+            )
+
+    results = asyncio.run(run())
+
+    assert all(
+        response.json() == [{"id": 1, "name": "Game"}]
+        for _, response in results
+    )
+    # The requests rejected together share one new token.
+    assert twitch_calls == 1
+    assert load_access_token(path).access_token == "new-token"
@@ -0,0 +1,215 @@
+import json
+import time
+
+import pytest
+import responses
+from requests import HTTPError, Request
+from responses.matchers import body_matcher, header_matcher
+
+from obsidian_tools.integrations.igdb import (
+    TWITCH_TOKEN_URL,
+    IGDBAccessToken,
+    IGDBAuth,
+    IGDBClient,
+    IGDBQuery,
+    load_access_token,
+    save_access_token,
+)
+
+
+def add_twitch_token_response(access_token: str, expires_in: int = 5184000):
+    responses.add(
+        responses.Response(
+            method=responses.POST,
+            url=TWITCH_TOKEN_URL,
+            json={
+                "access_token": access_token,
+                "expires_in": expires_in,
+                "token_type": "bearer",
+            },
+            status=200,
+        )
+    )
+
+
+def test_igdb_auth():
+    auth = IGDBAuth(client_id="client-id", access_token="access-token")
+    request = Request("POST", "https://example.com")
+    request = auth(request)
+
+    assert request.headers["Client-ID"] == "client-id"
+    assert request.headers["Authorization"] == "Bearer access-token"
+
+
+def test_igdb_access_token__is_valid():
+    now = time.time()
+
+    assert IGDBAccessToken("id", "token", now + 7 * 86400).is_valid(now)
+    assert IGDBAccessToken("id", "token", now + 60).is_valid(now) is False
+
+
+def test_save_and_load_access_token(tmp_path):
+    path = tmp_path / "igdb-token.json"
+    access_token = IGDBAccessToken("id", "token", time.time() + 3600)
+
+    assert load_access_token(path) is None
+
+    save_access_token(path, access_token)
+
+    assert load_access_token(path) == access_token
+    assert path.stat().st_mode & 0o777 == 0o600
+
+    path.write_text("{}")
+    assert load_access_token(path) is None
+
+
+@responses.activate
+def test_igdb_client__stores_access_token(tmp_path):
+    path = tmp_path / "igdb-token.json"
+    add_twitch_token_response("access-token")
+
+    client = IGDBClient(
+        client_id="client-id",
+        client_secret="client-secret",
+        access_token_path=path,
+    )
+
+    assert client.auth.access_token == "access-token"
+    assert json.loads(path.read_text())["access_token"] == "access-token"
+
+    # The stored token is reused without a request to Twitch.
+    client = IGDBClient(
+        client_id="client-id",
+        client_secret="client-secret",
+        access_token_path=path,
+    )
+
+    assert client.auth.access_token == "access-token"
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_igdb_client__ignores_expired_access_token(tmp_path):
+    path = tmp_path / "igdb-token.json"
+    save_access_token(
+        path, IGDBAccessToken("client-id", "old-token", time.time())
+    )
+    add_twitch_token_response("new-token")
+
+    client = IGDBClient(
+        client_id="client-id",
+        client_secret="client-secret",
+        access_token_path=path,
+    )
+
+    assert client.auth.access_token == "new-token"
+    assert load_access_token(path).access_token == "new-token"
+
+
+@responses.activate
+def test_igdb_client__refreshes_access_token_on_401(tmp_path):
+    path = tmp_path / "igdb-token.json"
+    save_access_token(
+        path,
+        IGDBAccessToken("client-id", "revoked-token", time.time() + 86400 * 7),
+    )
+    add_twitch_token_response("new-token")
+
+    responses.add(
+        responses.Response(
+            method=responses.POST,
+            url="https://api.igdb.com/v4/games",
+            status=401,
+            match=[header_matcher({"Authorization": "Bearer revoked-token"})],
+        )
+    )
+    responses.add(
+        responses.Response(
+            method=responses.POST,
+            url="https://api.igdb.com/v4/games",
+            json=[{"id": 1, "name": "Game"}],
+            status=200,
+            match=[header_matcher({"Authorization": "Bearer new-token"})],
+        )
+    )
+
+    client = IGDBClient(
+        client_id="client-id",
+        client_secret="client-secret",
+        access_token_path=path,
+    )
+    request, response = client.get_game(game_id=1)
+
+    assert response.json() == [{"id": 1, "name": "Game"}]
+    assert load_access_token(path).access_token == "new-token"
+    assert "Authorization" not in responses.calls[1].request.headers
+
+
+@responses.activate
+def test_igdb_client__keeps_access_token_when_refresh_fails():
+    add_twitch_token_response("access-token")
+
+    client = IGDBClient(client_id="client-id", client_secret="client-secret")
+    auth = client.auth
+
+    responses.add(responses.POST, TWITCH_TOKEN_URL, status=400)
+
+    with pytest.raises(HTTPError):
+        client.get_access_token(refresh=True)
+
+    assert client.auth is auth
+    assert client.auth.access_token == "access-token"
+
+
+@responses.activate
+def test_igdb_client__get_game__expand():
+    add_twitch_token_response("access-token")
+    responses.add(
+        responses.Response(
+            method=responses.POST,
+            url="https://api.igdb.com/v4/games",
+            json=[{"id": 1, "cover": {"id": 2, "image_id": "abc"}}],
+            status=200,
+            match=[
+                body_matcher("fields *, cover.*; where id = 1;"),
+            ],
+        )
+    )
+
+    client = IGDBClient(client_id="client-id", client_secret="client-secret")
+    request, response = client.get_game(game_id=1, expand=("cover",))
+
+    assert response.json()[0]["cover"]["image_id"] == "abc"
+
+
+@responses.activate
+def test_igdb_client__multiquery():
+    add_twitch_token_response("access-token")
+    expected = [
+        {"name": "Game", "result": [{"id": 1}]},
+        {"name": "Cover", "result": [{"id": 2, "game": 1}]},
+    ]
+    responses.add(
+        responses.Response(
+            method=responses.POST,
+            url="https://api.igdb.com/v4/multiquery",
+            json=expected,
+            status=200,
+            match=[
+                body_matcher(
+                    'query games "Game" { fields *; where id = 1; };\n'
+                    'query covers "Cover" { fields *; where game = 1; };'
+                ),
+            ],
+        )
+    )
+
+    client = IGDBClient(client_id="client-id", client_secret="client-secret")
+    request, response = client.multiquery(
+        [
+            IGDBQuery("games", "Game", "fields *; where id = 1;"),
+            IGDBQuery("covers", "Cover", "fields *; where game = 1;"),
+        ]
+    )
+
+    assert response.json() == expected
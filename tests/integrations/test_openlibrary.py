@@ -1,4 +1,5 @@
 import responses
+from responses.matchers import query_param_matcher
 
 from obsidian_tools.integrations.openlibrary import OpenLibraryClient
 
@@ -61,3 +62,60 @@ def test_openlibrary_client__get_work(resp_openlibrary_work):
     request, response = client.get_work(work_key)
     assert response.status_code == 200
     assert response.json() == resp_openlibrary_work
+
+
+@responses.activate
+def test_openlibrary_client__get_authors(
+    resp_openlibrary_author, resp_openlibrary_author_two
+):
+    client = OpenLibraryClient()
+
+    author_keys = []
+    for resp_author in (resp_openlibrary_author, resp_openlibrary_author_two):
+        author_key = resp_author["key"].replace("/authors/", "")
+        author_keys.append(author_key)
+
+        responses.add(
+            responses.Response(
+                method=responses.GET,
+                url=f"https://openlibrary.org/authors/{author_key}.json",
+                json=resp_author,
+                status=200,
+            )
+        )
+
+    results = list(client.get_authors(author_keys, max_workers=2))
+
+    assert len(results) == 2
+    assert sorted(response.json()["key"] for _, response in results) == sorted(
+        [resp_openlibrary_author["key"], resp_openlibrary_author_two["key"]]
+    )
+
+
+@responses.activate
+def test_openlibrary_client__get_books_from_isbns(resp_openlibrary_books_api):
+    client = OpenLibraryClient()
+
+    responses.add(
+        responses.Response(
+            method=responses.GET,
+            url="https://openlibrary.org/api/books",
+            json=resp_openlibrary_books_api,
+            status=200,
+            match=[
+                query_param_matcher(
+                    {
+                        "bibkeys": "ISBN:9781534431003,ISBN:9780000000000",
+                        "jscmd": "data",
+                        "format": "json",
+                    }
+                )
+            ],
+        )
+    )
+
+    request, response = client.get_books_from_isbns(
+        ["9781534431003", "9780000000000"]
+    )
+    assert response.status_code == 200
+    assert response.json() == resp_openlibrary_books_api
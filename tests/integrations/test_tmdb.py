@@ -1,5 +1,6 @@
 import responses
 from requests import Request
+from responses.matchers import query_param_matcher
 
 from obsidian_tools.integrations.tmdb import TMDBAuth, TMDBClient
 
@@ -58,6 +59,44 @@ def test_tmdb_client__get_tv_season_details(resp_tmdb_tv_season_details):
     assert response.json() == resp_tmdb_tv_season_details
 
 
+@responses.activate
+def test_tmdb_client__get_tv_seasons_details(resp_tmdb_tv_season_details):
+    series_id = resp_tmdb_tv_season_details["id"]
+    season_numbers = list(range(1, 26))
+
+    for batch in (season_numbers[:20], season_numbers[20:]):
+        responses.add(
+            responses.Response(
+                method=responses.GET,
+                url=f"https://api.themoviedb.org/3/tv/{series_id}",
+                json={
+                    f"season/{i}": resp_tmdb_tv_season_details for i in batch
+                },
+                status=200,
+                match=[
+                    query_param_matcher(
+                        {
+                            "append_to_response": ",".join(
+                                f"season/{i}" for i in batch
+                            )
+                        }
+                    )
+                ],
+            )
+        )
+
+    client = TMDBClient(api_key="i-am-a-tmdb-api-key")
+    results = list(
+        client.get_tv_seasons_details(
+            series_id=series_id, season_numbers=season_numbers, max_workers=2
+        )
+    )
+
+    assert len(results) == 2
+    assert len(results[0][1].json()) == 20
+    assert len(results[1][1].json()) == 5
+
+
 @responses.activate
 def test_tmdb_client__get_tv_episode_details(resp_tmdb_tv_episode_details):
     series_id = resp_tmdb_tv_episode_details["id"]
@@ -0,0 +1,15 @@
+from obsidian_tools.cli import cli
+from obsidian_tools.toolbox.library import cli as library_cli
+
+
+def test_obsidian_tools_cli__list_commands():
+    assert cli.list_commands(None) == ["bujo", "library"]
+
+
+def test_obsidian_tools_cli__get_command():
+    command = cli.get_command(None, "library")
+
+    # The command comes from the imported module, and is only loaded once.
+    assert command is library_cli.cli
+    assert cli.get_command(None, "library") is command
+    assert cli.get_command(None, "missing") is None
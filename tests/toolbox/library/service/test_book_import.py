@@ -0,0 +1,226 @@
+import json
+from dataclasses import replace
+
+import pytest
+import yaml
+from requests import RequestException
+
+from obsidian_tools.integrations import GoogleBooksClient, OpenLibraryClient
+from obsidian_tools.toolbox.library.models import Book, Person
+from obsidian_tools.toolbox.library.service import book_import, books
+from obsidian_tools.toolbox.library.service.core import ExternalIdIndex
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("9780141182551", "9780141182551"),
+        ("978-0-14-118255-1", "9780141182551"),
+        ('="0141182555"', "0141182555"),
+        ("014118255x", "014118255X"),
+        ('=""', None),
+        ("not an isbn", None),
+    ],
+)
+def test_normalize_isbn(value, expected):
+    assert book_import.normalize_isbn(value) == expected
+
+
+def test_read_isbns__plain_list():
+    lines = ["9780141182551\n", "\n", "oops\n", "978-0-14-118255-1\n"]
+
+    assert list(book_import.read_isbns(lines)) == ["9780141182551", "oops"]
+
+
+def test_read_isbns__goodreads_csv():
+    lines = [
+        "Book Id,Title,Author,ISBN,ISBN13\n",
+        '1,Nineteen Eighty-Four,George Orwell,="0141182555",="9780141182551"\n',
+        '2,No ISBN,Someone,="",=""\n',
+        '3,Animal Farm,George Orwell,="0141182709",=""\n',
+    ]
+
+    assert list(book_import.read_isbns(lines)) == [
+        "9780141182551",
+        "0141182709",
+    ]
+
+
+def test_read_isbns__librarything_csv():
+    lines = [
+        "Book Id,Title,ISBNs\n",
+        '1,Nineteen Eighty-Four,"0141182555, 9780141182551"\n',
+    ]
+
+    assert list(book_import.read_isbns(lines)) == ["0141182555"]
+
+
+@pytest.fixture
+def book_importer(tmp_path, mock_config):
+    config = replace(mock_config, BOOKS_DIR_PATH=tmp_path)
+
+    return book_import.BookImporter(
+        config=config,
+        openlibrary_client=OpenLibraryClient(),
+        google_books_client=GoogleBooksClient(),
+        external_id_index=ExternalIdIndex(),
+        write=True,
+    )
+
+
+def test_book_importer(mocker, tmp_path, book_importer):
+    book = Book(
+        title="Nineteen Eighty-Four",
+        authors=[Person(name="George Orwell")],
+        isbn="9780141182551",
+    )
+    mocker.patch.object(
+        books,
+        "get_book_from_sources",
+        return_value=(
+            books.BookSourceResult(book=book, message=None),
+            books.BookSourceResult(
+                book=None, message="Book not found on Google Books."
+            ),
+        ),
+    )
+
+    result = book_importer.import_book("978-0-14-118255-1")
+
+    note_path = tmp_path / "Nineteen Eighty-Four.md"
+    assert result == {
+        "isbn": "9780141182551",
+        "status": "created",
+        "path": str(note_path),
+        "title": "Nineteen Eighty-Four",
+        "messages": ["Book not found on Google Books."],
+    }
+    assert note_path.exists()
+    assert json.loads(json.dumps(result)) == result
+
+    # The same book is only written once per import.
+    assert book_importer.import_book("9780141182551")["status"] == "skipped"
+
+
+def test_book_importer__existing_note_for_another_book(
+    mocker, tmp_path, book_importer
+):
+    (tmp_path / "Animal Farm.md").write_text("---\nisbn_13: '123'\n---\n")
+    mocker.patch.object(
+        books,
+        "get_book_from_sources",
+        return_value=(
+            books.BookSourceResult(
+                book=Book(title="Animal Farm", isbn="9780141182704"),
+                message=None,
+            ),
+            books.BookSourceResult(book=None, message=None),
+        ),
+    )
+
+    assert book_importer.import_book("9780141182704")["status"] == "skipped"
+
+    book_importer.force = True
+    assert book_importer.import_book("9780141182704")["status"] == "updated"
+
+
+def test_book_importer__errors(mocker, book_importer):
+    assert book_importer.import_book("oops")["status"] == "invalid"
+
+    mocker.patch.object(
+        books,
+        "get_book_from_sources",
+        return_value=(
+            books.BookSourceResult(book=None, message=None),
+            books.BookSourceResult(book=None, message=None),
+        ),
+    )
+    assert book_importer.import_book("9780141182551")["status"] == "not_found"
+
+
+@pytest.mark.parametrize(
+    "error",
+    [TypeError("bad payload"), yaml.YAMLError("bad frontmatter")],
+)
+def test_book_importer__unexpected_errors(mocker, book_importer, error):
+    mocker.patch.object(books, "get_book_from_sources", side_effect=error)
+
+    result = book_importer.import_book("9780141182551")
+
+    assert result["status"] == "failed"
+    assert result["messages"] == [str(error)]
+
+
+def test_book_importer__prefetch(mocker, book_importer):
+    book = Book(
+        title="Prefetched", isbn="9780141182551", description="Prefetched."
+    )
+    mock_get_books_from_openlibrary = mocker.patch.object(
+        books,
+        "get_books_from_openlibrary",
+        return_value={"9780141182551": book},
+    )
+    mock_get_books_data_from_google_books = mocker.patch.object(
+        books, "get_books_data_from_google_books", return_value={}
+    )
+    mock_get_book_from_sources = mocker.patch.object(
+        books, "get_book_from_sources"
+    )
+    mock_get_book_from_google_books = mocker.patch.object(
+        books, "get_book_from_google_books", return_value=None
+    )
+
+    book_importer.prefetch(["9780141182551", "9780141182704", "oops"])
+
+    mock_get_books_from_openlibrary.assert_called_once_with(
+        isbns=["9780141182551", "9780141182704"],
+        client=book_importer.openlibrary_client,
+    )
+    mock_get_books_data_from_google_books.assert_called_once_with(
+        isbns=["9780141182551", "9780141182704"],
+        client=book_importer.google_books_client,
+        lookup_misses=False,
+    )
+    mock_get_book_from_google_books.assert_not_called()
+
+    assert book_importer.import_book("9780141182551")["status"] == "created"
+
+    result = book_importer.import_book("9780141182704")
+    assert result["status"] == "not_found"
+    assert result["messages"] == ["Book not found on Open Library."]
+
+    # The ISBNs the batch search missed are looked up on their own.
+    assert mock_get_book_from_google_books.call_count == 2
+    mock_get_book_from_sources.assert_not_called()
+
+
+def test_book_importer__prefetch_without_description(mocker, book_importer):
+    book = Book(title="Prefetched", isbn="9780141182551")
+    full_book = replace(book, description="From the work.")
+    mocker.patch.object(
+        books,
+        "get_books_from_openlibrary",
+        return_value={"9780141182551": book},
+    )
+    mocker.patch.object(
+        books, "get_books_data_from_google_books", return_value={}
+    )
+    mocker.patch.object(books, "get_book_from_google_books", return_value=None)
+    mock_get_book_from_openlibrary = mocker.patch.object(
+        books, "get_book_from_openlibrary", return_value=full_book
+    )
+
+    book_importer.prefetch(["9780141182551"])
+    ol_result, _ = book_importer.get_book_from_sources("9780141182551")
+
+    assert ol_result.book == full_book
+    mock_get_book_from_openlibrary.assert_called_once_with(
+        isbn="9780141182551", client=book_importer.openlibrary_client
+    )
+
+    # The prefetched book is kept if the full lookup fails.
+    for error in [RequestException(), KeyError("authors"), ValueError()]:
+        mock_get_book_from_openlibrary.side_effect = error
+        ol_result, _ = book_importer.get_book_from_sources("9780141182551")
+
+        assert ol_result.book == book
@@ -1,9 +1,15 @@
+import subprocess
+import sys
+import threading
 from dataclasses import replace
 
 import pytest
 import responses
+from requests import HTTPError
+from responses.matchers import query_param_matcher
 
 from obsidian_tools.errors import ObsidianToolsConfigError
+from obsidian_tools.integrations.google_books import GoogleBooksClient
 from obsidian_tools.integrations.openlibrary import OpenLibraryClient
 from obsidian_tools.toolbox.library.models import Book, Person
 from obsidian_tools.toolbox.library.service import books
@@ -82,9 +88,9 @@ def test_get_book_data_from_openlibrary(
 
     assert book == resp_openlibrary_edition
     assert works == [resp_openlibrary_work]
-    assert len(authors) == 2
-    assert resp_openlibrary_author in authors
-    assert resp_openlibrary_author_two in authors
+    # The authors are in the order the work lists them, even though they are
+    # fetched concurrently.
+    assert authors == [resp_openlibrary_author, resp_openlibrary_author_two]
 
 
 def test_build_book_note():
@@ -135,3 +141,194 @@ openlibrary_book_id: {book.openlibrary_book_id}
 
 {book.description}"""
     )
+
+
+def test_get_book_from_sources(mocker):
+    ol_book = Book(title="Open Library")
+    mocker.patch.object(
+        books, "get_book_from_openlibrary", return_value=ol_book
+    )
+    mocker.patch.object(
+        books,
+        "get_book_from_google_books",
+        side_effect=HTTPError(response=mocker.Mock(status_code=404)),
+    )
+
+    ol_result, gb_result = books.get_book_from_sources(
+        isbn="9780141182550",
+        openlibrary_client=OpenLibraryClient(),
+        google_books_client=GoogleBooksClient(),
+    )
+
+    assert ol_result == (ol_book, None)
+    assert gb_result == (None, "Book not found on Google Books.")
+
+
+def test_get_book_from_sources__deadline(mocker):
+    release = threading.Event()
+    gb_book = Book(title="Google Books")
+
+    def slow_get_book_from_openlibrary(isbn, client, **kwargs):
+        release.wait(timeout=5)
+        return Book(title="Open Library")
+
+    mocker.patch.object(
+        books,
+        "get_book_from_openlibrary",
+        side_effect=slow_get_book_from_openlibrary,
+    )
+    mocker.patch.object(
+        books, "get_book_from_google_books", return_value=gb_book
+    )
+
+    try:
+        ol_result, gb_result = books.get_book_from_sources(
+            isbn="9780141182550",
+            openlibrary_client=OpenLibraryClient(),
+            google_books_client=GoogleBooksClient(),
+            deadline=0.1,
+        )
+    finally:
+        release.set()
+
+    assert ol_result == (None, "Open Library request timed out.")
+    assert gb_result == (gb_book, None)
+
+
+def test_get_book_from_sources__deadline_does_not_block_exit():
+    # The Open Library works never finish, the process must still exit.
+    script = """
+import time
+from unittest import mock
+
+from obsidian_tools.integrations import GoogleBooksClient, OpenLibraryClient
+from obsidian_tools.toolbox.library.service import books
+
+resp_book = mock.Mock()
+resp_book.json.return_value = {
+    "works": [{"key": "/works/OL1W"}, {"key": "/works/OL2W"}]
+}
+OpenLibraryClient.get_book_from_isbn = lambda self, isbn: (None, resp_book)
+OpenLibraryClient.get_work = lambda self, key: time.sleep(30)
+books.get_book_from_google_books = lambda isbn, client: None
+
+ol_result, _ = books.get_book_from_sources(
+    "9780141182550", OpenLibraryClient(), GoogleBooksClient(), deadline=0.1
+)
+print(ol_result.message)
+"""
+
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        timeout=10,
+    )
+
+    assert result.returncode == 0
+    assert result.stdout.strip() == "Open Library request timed out."
+
+
+def test_get_book_from_sources__raises_other_http_errors(mocker):
+    mocker.patch.object(
+        books,
+        "get_book_from_openlibrary",
+        side_effect=HTTPError(response=mocker.Mock(status_code=500)),
+    )
+    mocker.patch.object(books, "get_book_from_google_books", return_value=None)
+
+    with pytest.raises(HTTPError):
+        books.get_book_from_sources(
+            isbn="9780141182550",
+            openlibrary_client=OpenLibraryClient(),
+            google_books_client=GoogleBooksClient(),
+        )
+
+
+@responses.activate
+def test_get_books_from_openlibrary(resp_openlibrary_books_api):
+    client = OpenLibraryClient()
+
+    responses.add(
+        responses.Response(
+            method=responses.GET,
+            url="https://openlibrary.org/api/books",
+            json=resp_openlibrary_books_api,
+            status=200,
+        )
+    )
+    responses.add(
+        responses.Response(
+            method=responses.GET,
+            url="https://openlibrary.org/api/books",
+            json={},
+            status=200,
+        )
+    )
+
+    found_books = books.get_books_from_openlibrary(
+        isbns=["9781534431003", "9780000000000"], client=client, batch_size=1
+    )
+
+    # One request per batch.
+    assert len(responses.calls) == 2
+
+    assert list(found_books.keys()) == ["9781534431003"]
+    book = found_books["9781534431003"]
+    assert book.title == "This Is How You Lose the Time War"
+    assert book.display_authors == "Amal El-Mohtar and Max Gladstone"
+    assert book.number_of_pages == 208
+    assert book.isbn == "9781534431003"
+    assert book.openlibrary_book_id == "OL27901088M"
+    assert book.cover_url == (
+        "https://covers.openlibrary.org/b/olid/OL27901088M-L.jpg"
+    )
+
+
+@responses.activate
+def test_get_books_data_from_google_books(resp_google_books_volumes):
+    client = GoogleBooksClient()
+
+    # The batch search finds the first ISBN by its ISBN-10, the second ISBN is
+    # looked up on its own.
+    responses.add(
+        responses.Response(
+            method=responses.GET,
+            url="https://www.googleapis.com/books/v1/volumes",
+            json=resp_google_books_volumes,
+            status=200,
+            match=[
+                query_param_matcher(
+                    {
+                        "q": "isbn:1534431004 OR isbn:9780000000000",
+                        "maxResults": "40",
+                    }
+                )
+            ],
+        )
+    )
+    responses.add(
+        responses.Response(
+            method=responses.GET,
+            url="https://www.googleapis.com/books/v1/volumes",
+            json={"kind": "books#volumes", "totalItems": 0},
+            status=200,
+            match=[query_param_matcher({"q": "isbn:9780000000000"})],
+        )
+    )
+
+    books_data = books.get_books_data_from_google_books(
+        isbns=["1534431004", "9780000000000"], client=client
+    )
+
+    assert len(responses.calls) == 2
+    assert books_data == {"1534431004": resp_google_books_volumes["items"][0]}
+
+    books_data = books.get_books_data_from_google_books(
+        isbns=["1534431004", "9780000000000"],
+        client=client,
+        lookup_misses=False,
+    )
+
+    assert len(responses.calls) == 3
+    assert books_data == {"1534431004": resp_google_books_volumes["items"][0]}
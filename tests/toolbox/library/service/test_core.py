@@ -1,9 +1,11 @@
 from dataclasses import replace
+from pathlib import Path
 
 import pytest
 
 from obsidian_tools.errors import ObsidianToolsConfigError
 from obsidian_tools.toolbox.library.service import core
+from obsidian_tools.utils.vault_index import VaultIndex
 
 
 def test_ensure_required_config(mock_config):
@@ -19,3 +21,50 @@ def test_ensure_required_config(mock_config):
         core.ensure_required_config(bad_config)
 
     assert str(exc_info.value.config_key) == "LIBRARY_DIR_PATH"
+
+
+def test_external_id_index():
+    external_id_index = core.ExternalIdIndex.from_notes(
+        [
+            (Path("one.md"), {"tmdb_id": 1, "title": "One"}),
+            (Path("two.md"), {"isbn_13": "9780141182550", "igdb_id": ""}),
+        ]
+    )
+
+    assert len(external_id_index) == 2
+    assert external_id_index.get("tmdb_id", "1") == Path("one.md")
+    assert external_id_index.get("tmdb_id", 1) == Path("one.md")
+    assert external_id_index.get("tmdb_id", 2) is None
+    assert external_id_index.get("igdb_id", "") is None
+    assert external_id_index.get("title", "One") is None
+    assert external_id_index.find(
+        google_book_id=None, isbn_13="9780141182550"
+    ) == Path("two.md")
+    assert external_id_index.find(tmdb_id=None) is None
+
+
+def test_build_external_id_index(tmp_path, vault_path):
+    tv_shows_dir_path = vault_path / "library" / "tv_shows"
+    vault_index = VaultIndex(tmp_path / "vault-index.sqlite")
+
+    for external_id_index in (
+        core.build_external_id_index(tv_shows_dir_path),
+        core.build_external_id_index(tv_shows_dir_path, vault_index),
+    ):
+        assert external_id_index.get("tmdb_id", 79732) == (
+            tv_shows_dir_path / "She-Ra and the Princesses of Power.md"
+        )
+
+    assert len(core.build_external_id_index(None)) == 0
+
+
+def test_build_external_id_index__skips_invalid_frontmatter(tmp_path):
+    (tmp_path / "bad.md").write_text("---\ntitle: [unclosed\n---\nBad")
+    (tmp_path / "good.md").write_text("---\ntmdb_id: 1\n---\nGood")
+    vault_index = VaultIndex(tmp_path / "vault-index.sqlite")
+
+    for external_id_index in (
+        core.build_external_id_index(tmp_path),
+        core.build_external_id_index(tmp_path, vault_index),
+    ):
+        assert external_id_index.get("tmdb_id", 1) == tmp_path / "good.md"
@@ -2,10 +2,13 @@ from dataclasses import replace
 
 import pytest
 import responses
+from responses.matchers import query_param_matcher
 
 from obsidian_tools.errors import ObsidianToolsConfigError
 from obsidian_tools.integrations.tmdb import TMDBClient
 from obsidian_tools.toolbox.library.service import tv_shows
+from obsidian_tools.utils.files import WriteStatus
+from obsidian_tools.utils.vault_index import VaultIndex
 
 
 def test_ensure_required_tv_shows_config(mock_config):
@@ -35,38 +38,217 @@ def test_ensure_required_tv_shows_config(mock_config):
     assert str(exc_info.value.config_key) == "TMDB_API_KEY"
 
 
-@responses.activate
-def test_get_tv_show_data_from_tmdb_from_tmdb(
-    resp_tmdb_tv_series_details,
-    resp_tmdb_tv_season_details,
+def add_tmdb_tv_show_responses(
+    tv_series_details, tv_season_details, number_of_seasons=None
 ):
-    series_id = resp_tmdb_tv_series_details["id"]
+    series_id = tv_series_details["id"]
 
-    responses.add(
-        responses.Response(
-            method=responses.GET,
-            url=f"https://api.themoviedb.org/3/tv/{series_id}",
-            json=resp_tmdb_tv_series_details,
-            status=200,
-        )
+    # The seasons known beforehand, up to 20, are requested with the series
+    # details, the rest in batches of up to 20.
+    appended = range(1, min(number_of_seasons or 0, 20) + 1)
+    returned = range(
+        1, min(len(appended), tv_series_details["number_of_seasons"]) + 1
     )
+    batches = [(appended, returned)]
+
+    rest = range(len(appended) + 1, tv_series_details["number_of_seasons"] + 1)
+    for start in range(0, len(rest), 20):
+        batch = rest[start : start + 20]
+        batches.append((batch, batch))
+
+    for requested, returned in batches:
+        params = {}
+        if requested:
+            params["append_to_response"] = ",".join(
+                f"season/{i}" for i in requested
+            )
 
-    for i in range(1, resp_tmdb_tv_series_details["number_of_seasons"] + 1):
         responses.add(
             responses.Response(
                 method=responses.GET,
-                url=f"https://api.themoviedb.org/3/tv/{series_id}/season/{i}",
-                json=resp_tmdb_tv_season_details,
+                url=f"https://api.themoviedb.org/3/tv/{series_id}",
+                json={
+                    **tv_series_details,
+                    **{
+                        f"season/{i}": {**tv_season_details, "season_number": i}
+                        for i in returned
+                    },
+                },
                 status=200,
+                match=[query_param_matcher(params)],
             )
         )
 
+
+@responses.activate
+@pytest.mark.parametrize(
+    "number_of_seasons, expected_calls",
+    [(None, 2), (8, 1), (5, 2), (12, 1)],
+)
+def test_get_tv_show_data_from_tmdb_from_tmdb(
+    resp_tmdb_tv_series_details,
+    resp_tmdb_tv_season_details,
+    number_of_seasons,
+    expected_calls,
+):
+    series_id = resp_tmdb_tv_series_details["id"]
+
+    add_tmdb_tv_show_responses(
+        resp_tmdb_tv_series_details,
+        resp_tmdb_tv_season_details,
+        number_of_seasons=number_of_seasons,
+    )
+
     client = TMDBClient(api_key="i-am-a-tmdb-api-key")
 
     tv_series, tv_seasons = tv_shows.get_tv_show_data_from_tmdb(
         tv_series_id=series_id,
         client=client,
+        number_of_seasons=number_of_seasons,
     )
 
     assert tv_series == resp_tmdb_tv_series_details
     assert len(tv_seasons) == resp_tmdb_tv_series_details["number_of_seasons"]
+    assert [tv_season["season_number"] for tv_season in tv_seasons] == list(
+        range(1, resp_tmdb_tv_series_details["number_of_seasons"] + 1)
+    )
+    assert len(responses.calls) == expected_calls
+
+
+@responses.activate
+def test_get_tv_show_data_from_tmdb__appends_only_the_known_seasons(
+    resp_tmdb_tv_series_details,
+    resp_tmdb_tv_season_details,
+):
+    add_tmdb_tv_show_responses(
+        resp_tmdb_tv_series_details,
+        resp_tmdb_tv_season_details,
+        number_of_seasons=8,
+    )
+
+    client = TMDBClient(api_key="i-am-a-tmdb-api-key")
+
+    tv_shows.get_tv_show_data_from_tmdb(
+        tv_series_id=resp_tmdb_tv_series_details["id"],
+        client=client,
+        number_of_seasons=8,
+    )
+
+    request = responses.calls[0].request  # type: ignore
+    assert request.params["append_to_response"] == (
+        "season/1,season/2,season/3,season/4,"
+        "season/5,season/6,season/7,season/8"
+    )
+
+
+@responses.activate
+@pytest.mark.parametrize(
+    "number_of_seasons, expected_calls", [(None, 4), (45, 3)]
+)
+def test_get_tv_show_data_from_tmdb__batches_the_seasons_after_the_20th(
+    resp_tmdb_tv_series_details,
+    resp_tmdb_tv_season_details,
+    number_of_seasons,
+    expected_calls,
+):
+    tv_series_details = {**resp_tmdb_tv_series_details, "number_of_seasons": 45}
+
+    add_tmdb_tv_show_responses(
+        tv_series_details,
+        resp_tmdb_tv_season_details,
+        number_of_seasons=number_of_seasons,
+    )
+
+    client = TMDBClient(api_key="i-am-a-tmdb-api-key")
+
+    tv_series, tv_seasons = tv_shows.get_tv_show_data_from_tmdb(
+        tv_series_id=tv_series_details["id"],
+        client=client,
+        number_of_seasons=number_of_seasons,
+    )
+
+    assert tv_series == tv_series_details
+    assert [tv_season["season_number"] for tv_season in tv_seasons] == list(
+        range(1, 46)
+    )
+    assert len(responses.calls) == expected_calls
+
+
+@responses.activate
+def test_get_tv_show_data_from_tmdb__raises_on_a_missing_season(
+    resp_tmdb_tv_series_details,
+):
+    series_id = resp_tmdb_tv_series_details["id"]
+
+    responses.add(
+        responses.GET,
+        f"https://api.themoviedb.org/3/tv/{series_id}",
+        json=resp_tmdb_tv_series_details,
+        status=200,
+    )
+
+    client = TMDBClient(api_key="i-am-a-tmdb-api-key")
+
+    with pytest.raises(ValueError):
+        tv_shows.get_tv_show_data_from_tmdb(
+            tv_series_id=series_id,
+            client=client,
+        )
+
+
+@responses.activate
+def test_update_tv_show_note(
+    tmp_path,
+    mock_config,
+    resp_tmdb_tv_series_details,
+    resp_tmdb_tv_season_details,
+):
+    config = replace(
+        mock_config,
+        TV_SHOWS_DIR_PATH=tmp_path,
+        TMDB_API_KEY="i-am-a-tmdb-api-key",
+    )
+    note_path = tmp_path / "She-Ra and the Princesses of Power.md"
+    note_path.write_text("Out of date.")
+
+    add_tmdb_tv_show_responses(
+        resp_tmdb_tv_series_details, resp_tmdb_tv_season_details
+    )
+
+    client = TMDBClient(api_key="i-am-a-tmdb-api-key")
+
+    status = tv_shows.update_tv_show_note(
+        file_path=note_path,
+        tv_series_id=resp_tmdb_tv_series_details["id"],
+        client=client,
+        config=config,
+    )
+    assert status == WriteStatus.UPDATED
+    assert note_path.read_text().startswith("---")
+    assert tv_shows.load_tv_show_note(note_path)["number_of_seasons"] == 8
+
+    status = tv_shows.update_tv_show_note(
+        file_path=note_path,
+        tv_series_id=resp_tmdb_tv_series_details["id"],
+        client=client,
+        config=config,
+    )
+    assert status == WriteStatus.UNCHANGED
+
+
+def test_list_tv_show_paths(tmp_path, mock_config):
+    config = replace(
+        mock_config,
+        TV_SHOWS_DIR_PATH=mock_config.VAULT_PATH / "library" / "tv_shows",
+    )
+    vault_index = VaultIndex(tmp_path / "vault-index.sqlite")
+
+    tv_show_paths = list(tv_shows.list_tv_show_paths(config, has_tmdb_id=True))
+
+    assert len(tv_show_paths) == 1
+    assert tv_show_paths[0][1]["tmdb_id"] == 79732
+    assert tv_show_paths == list(
+        tv_shows.list_tv_show_paths(
+            config, has_tmdb_id=True, vault_index=vault_index
+        )
+    )
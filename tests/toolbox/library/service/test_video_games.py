@@ -0,0 +1,90 @@
+import responses
+from responses.matchers import body_matcher
+
+from obsidian_tools.integrations import IGDBClient
+from obsidian_tools.toolbox.library.service import video_games
+
+
+@responses.activate
+def test_get_game_data_from_igdb():
+    responses.add(
+        responses.Response(
+            method=responses.POST,
+            url="https://id.twitch.tv/oauth2/token",
+            json={"access_token": "access-token", "expires_in": 5184000},
+            status=200,
+        )
+    )
+    responses.add(
+        responses.Response(
+            method=responses.POST,
+            url="https://api.igdb.com/v4/games",
+            json=[
+                {
+                    "id": 1,
+                    "name": "Game",
+                    "first_release_date": 1577836800,
+                    "cover": {"id": 2, "image_id": "abc"},
+                    "external_games": [
+                        {"id": 3, "category": 1, "uid": "440"},
+                        {"id": 4, "category": 5, "uid": "gog"},
+                    ],
+                }
+            ],
+            status=200,
+            match=[
+                body_matcher(
+                    "fields name, summary, first_release_date, "
+                    "cover.image_id, external_games.category, "
+                    "external_games.uid; where id = 1;"
+                )
+            ],
+        )
+    )
+
+    client = IGDBClient(client_id="client-id", client_secret="client-secret")
+    game, cover, external_games = video_games.get_game_data_from_igdb(
+        client=client, game_id=1
+    )
+
+    # Only one request is made to IGDB after authenticating.
+    assert len(responses.calls) == 2
+
+    assert game["cover"] == 2
+    assert game["external_games"] == [3, 4]
+    assert cover == {"id": 2, "image_id": "abc"}
+    assert [external_game["uid"] for external_game in external_games] == [
+        "440",
+        "gog",
+    ]
+
+    video_game = video_games.igdb_data_to_dataclass(game, cover, external_games)
+    assert video_game.steam_id == "440"
+    assert video_game.cover_url.endswith("/abc.jpg")
+
+
+@responses.activate
+def test_search_video_game_on_igdb():
+    responses.add(
+        responses.Response(
+            method=responses.POST,
+            url="https://id.twitch.tv/oauth2/token",
+            json={"access_token": "access-token", "expires_in": 5184000},
+            status=200,
+        )
+    )
+    responses.add(
+        responses.Response(
+            method=responses.POST,
+            url="https://api.igdb.com/v4/games",
+            json=[{"id": 1, "name": "Portal"}],
+            status=200,
+            match=[body_matcher('fields name; search "Portal";')],
+        )
+    )
+
+    client = IGDBClient(client_id="client-id", client_secret="client-secret")
+
+    assert video_games.search_video_game_on_igdb(client, "Portal") == [
+        {"id": 1, "name": "Portal"}
+    ]
@@ -0,0 +1,58 @@
+from dataclasses import replace
+
+from click.testing import CliRunner
+
+from obsidian_tools.toolbox.library import cli as library_cli
+from obsidian_tools.utils.files import WriteStatus
+
+
+def test_update_tv_shows__reports_a_failed_show(mocker, tmp_path, mock_config):
+    config = replace(
+        mock_config,
+        LIBRARY_DIR_PATH=mock_config.VAULT_PATH / "library",
+        TV_SHOWS_DIR_PATH=tmp_path,
+        TMDB_API_KEY="i-am-a-tmdb-api-key",
+    )
+    for name, tmdb_id in [("Broken", 1), ("Working", 2)]:
+        (tmp_path / f"{name}.md").write_text(f"---\ntmdb_id: {tmdb_id}\n---\n")
+
+    mocker.patch.object(library_cli, "get_app_dir_path", return_value=tmp_path)
+
+    def update_tv_show_note(tv_series_id, **kwargs):
+        if tv_series_id == 1:
+            raise KeyError("first_air_date")
+        return WriteStatus.UPDATED
+
+    mocker.patch.object(
+        library_cli.tv_shows,
+        "update_tv_show_note",
+        side_effect=update_tv_show_note,
+    )
+
+    result = CliRunner().invoke(
+        library_cli.cli, ["update-tv-shows"], obj={"config": config}
+    )
+
+    assert result.exit_code == 0
+    assert f"Failed to update {tmp_path / 'Broken.md'}" in result.output
+    assert f"Updated {tmp_path / 'Working.md'}" in result.output
+    assert "1 updated, 0 unchanged, 1 failed." in result.output
+    assert (tmp_path / "vault-index.sqlite").exists() is True
+
+
+def test_cli__opens_the_vault_index_lazily(mocker, tmp_path, mock_config):
+    config = replace(
+        mock_config,
+        LIBRARY_DIR_PATH=mock_config.VAULT_PATH / "library",
+        TMDB_API_KEY="i-am-a-tmdb-api-key",
+    )
+
+    mocker.patch.object(library_cli, "get_app_dir_path", return_value=tmp_path)
+
+    # The command fails on its configuration before it lists any notes.
+    result = CliRunner().invoke(
+        library_cli.cli, ["update-tv-shows"], obj={"config": config}
+    )
+
+    assert result.exit_code != 0
+    assert (tmp_path / "vault-index.sqlite").exists() is False
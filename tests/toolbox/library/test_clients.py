@@ -0,0 +1,61 @@
+from dataclasses import replace
+
+import pytest
+
+from obsidian_tools.errors import ObsidianToolsConfigError
+from obsidian_tools.integrations import IGDBClient, TMDBClient
+from obsidian_tools.toolbox.library.clients import LibraryClients
+
+
+def test_library_clients_are_lazy(mocker, mock_config):
+    config = replace(
+        mock_config,
+        TMDB_API_KEY="tmdb-api-key",
+        IGDB_CLIENT_ID="client-id",
+        IGDB_CLIENT_SECRET="client-secret",
+    )
+    mock_igdb_init = mocker.patch.object(
+        IGDBClient, "__init__", return_value=None
+    )
+
+    clients = LibraryClients(config=config)
+
+    tmdb_client = clients.tmdb
+    assert isinstance(tmdb_client, TMDBClient)
+    assert clients.tmdb is tmdb_client
+    assert tmdb_client.cache is None
+
+    # The IGDB client authenticates when it's created, so it's only created
+    # when it's used.
+    mock_igdb_init.assert_not_called()
+
+    assert clients.igdb is clients.igdb
+    mock_igdb_init.assert_called_once()
+
+
+def test_library_clients_missing_config(mock_config):
+    clients = LibraryClients(config=replace(mock_config, TMDB_API_KEY=None))
+
+    with pytest.raises(ObsidianToolsConfigError) as exc_info:
+        clients.tmdb
+
+    assert exc_info.value.config_key == "TMDB_API_KEY"
+
+
+def test_library_clients_http_cache(tmp_path, mock_config):
+    clients = LibraryClients(
+        config=mock_config, http_cache_path=tmp_path / "http-cache.sqlite"
+    )
+
+    assert clients.openlibrary.cache is clients.http_cache
+    assert clients.google_books.cache is clients.http_cache
+
+
+def test_library_clients_share_a_session(mock_config):
+    clients = LibraryClients(
+        config=replace(mock_config, TMDB_API_KEY="tmdb-api-key")
+    )
+
+    assert clients.openlibrary.session is clients.session
+    assert clients.google_books.session is clients.session
+    assert clients.tmdb.session is clients.session
@@ -0,0 +1,220 @@
+import asyncio
+
+import httpx
+import pytest
+
+from obsidian_tools.utils import async_http_client, rate_limit
+from obsidian_tools.utils.http_cache import SQLiteHttpCache, build_cache_key
+from obsidian_tools.utils.http_client import HttpMethod
+
+
+def build_client(handler, **kwargs) -> async_http_client.AsyncHttpClient:
+    return async_http_client.AsyncHttpClient(
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("method", list(HttpMethod))
+def test_async_http_client__request(method: HttpMethod):
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["User-Agent"].startswith("obsidian-tools/")
+        return httpx.Response(200, json={"method": request.method})
+
+    async def run():
+        async with build_client(handler) as client:
+            return await client.request(method, "http://example.com/")
+
+    request, response = asyncio.run(run())
+
+    assert request.method == method.value
+    assert response.json() == {"method": method.value}
+
+
+def test_async_http_client__auth():
+    def auth(request: httpx.Request) -> httpx.Request:
+        request.headers["Authorization"] = "Bearer secret"
+        return request
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, json={"authorization": request.headers.get("Authorization")}
+        )
+
+    async def run():
+        async with build_client(handler, auth=auth) as client:
+            _, response = await client.get("http://example.com/")
+            return response
+
+    assert asyncio.run(run()).json() == {"authorization": "Bearer secret"}
+
+
+def test_async_http_client__request__retry(mocker):
+    statuses = [503, 502, 200]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(statuses.pop(0), headers={"Retry-After": "2"})
+
+    mock_sleep = mocker.patch.object(
+        async_http_client.asyncio, "sleep", mocker.AsyncMock()
+    )
+    spy_aclose = mocker.spy(httpx.Response, "aclose")
+
+    async def run():
+        async with build_client(
+            handler, rate_limiter=rate_limit.RateLimiter({})
+        ) as client:
+            _, response = await client.get("http://example.com/")
+            return response
+
+    assert asyncio.run(run()).status_code == 200
+    assert statuses == []
+
+    # The failed responses are closed before retrying.
+    assert spy_aclose.call_count == 2
+
+    # The rate limiter waits for the Retry-After too, on the same sleep.
+    assert all(call.args[0] >= 2 for call in mock_sleep.await_args_list)
+
+
+def test_async_http_client__request__retry_errors(mocker):
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    mocker.patch.object(async_http_client.asyncio, "sleep", mocker.AsyncMock())
+
+    async def run(method: HttpMethod):
+        async with build_client(handler) as client:
+            await client.request(method, "http://example.com/")
+
+    # The POST request might have reached the server, so it's not retried.
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(run(HttpMethod.POST))
+    assert calls == 1
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(run(HttpMethod.GET))
+    assert calls == 1 + 4
+
+
+def test_async_http_client__request__cache(tmp_path):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if request.headers.get("If-None-Match") == '"abc"':
+            return httpx.Response(304)
+
+        return httpx.Response(
+            200,
+            json={"hello": "world"},
+            headers={"ETag": '"abc"', "Cache-Control": "max-age=60"},
+        )
+
+    cache = SQLiteHttpCache(tmp_path / "cache.sqlite")
+
+    async def run():
+        async with build_client(handler, cache=cache) as client:
+            await client.get("http://example.com/")
+            _, response = await client.get("http://example.com/")
+            return response
+
+    # The fresh response is read from the cache.
+    assert asyncio.run(run()).json() == {"hello": "world"}
+    assert len(calls) == 1
+
+    # The stale response is revalidated with a conditional request.
+    cache_key = build_cache_key("GET", "http://example.com/")
+    cached_response = cache.get(cache_key)
+    cached_response.expires_at = 0
+    cache.set(cache_key, cached_response)
+
+    assert asyncio.run(run()).json() == {"hello": "world"}
+    assert len(calls) == 2
+    assert calls[1].headers["If-None-Match"] == '"abc"'
+
+
+def test_async_http_client__request__coalesces_in_flight_requests():
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"key": "/works/OL1W"})
+
+    async def run():
+        async with build_client(handler) as client:
+            results = await asyncio.gather(
+                *(client.get("http://example.com/") for _ in range(4))
+            )
+
+            # Once the request is done the next one is sent again.
+            await client.get("http://example.com/")
+            return results
+
+    results = asyncio.run(run())
+
+    assert calls == 2
+    assert all(response is results[0][1] for _, response in results)
+
+
+def test_async_http_client__request__sender_cancelled():
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"key": "/works/OL1W"})
+
+    async def run():
+        async with build_client(handler) as client:
+            sender = asyncio.ensure_future(client.get("http://example.com/"))
+            await asyncio.sleep(0)
+            waiters = [
+                asyncio.ensure_future(client.get("http://example.com/"))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0.01)
+
+            # The waiters still get the response if the sender is cancelled.
+            sender.cancel()
+            results = await asyncio.gather(*waiters)
+
+            assert sender.cancelled()
+            return results
+
+    results = asyncio.run(run())
+
+    assert calls == 2
+    assert all(response.status_code == 200 for _, response in results)
+    assert results[0][1] is results[1][1]
+
+
+def test_async_http_client__request__memo():
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        status_code = 404 if request.url.path == "/missing" else 200
+        return httpx.Response(status_code, json={"hello": "world"})
+
+    async def run():
+        async with build_client(handler, memo_size=1) as client:
+            for _ in range(2):
+                await client.get("http://example.com/")
+            for _ in range(2):
+                await client.get("http://example.com/missing")
+            for _ in range(2):
+                await client.post("http://example.com/")
+
+    asyncio.run(run())
+
+    # Only successful GET responses are memoized.
+    assert calls == 1 + 2 + 2
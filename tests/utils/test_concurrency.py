@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from obsidian_tools.utils import concurrency
+
+
+def test_submit_daemon():
+    assert concurrency.submit_daemon(lambda: 42).result(timeout=1) == 42
+
+    def fail():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        concurrency.submit_daemon(fail).result(timeout=1)
+
+
+def test_submit_daemon__runs_on_a_daemon_thread():
+    future = concurrency.submit_daemon(lambda: threading.current_thread())
+
+    assert future.result(timeout=1).daemon is True
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_map_concurrently(max_workers):
+    def slow_square(value: int) -> int:
+        # The first items finish last, the results must still be in order.
+        time.sleep((5 - value) * 0.01)
+        return value * value
+
+    result = list(
+        concurrency.map_concurrently(
+            slow_square, range(5), max_workers=max_workers
+        )
+    )
+
+    assert result == [0, 1, 4, 9, 16]
+
+
+def test_map_concurrently__max_workers():
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def track(value: int) -> int:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return value
+
+    list(concurrency.map_concurrently(track, range(10), max_workers=2))
+
+    assert max_in_flight <= 2
+
+
+def test_map_as_completed():
+    def slow_square(value: int) -> int:
+        # The first items finish last.
+        time.sleep((5 - value) * 0.02)
+        return value * value
+
+    result = list(
+        concurrency.map_as_completed(slow_square, range(5), max_workers=5)
+    )
+
+    assert sorted(result) == [0, 1, 4, 9, 16]
+    assert result[0] == 16
+
+
+def test_map_as_completed__error():
+    def fail_on_two(value: int) -> int:
+        if value == 2:
+            raise ValueError(value)
+        return value
+
+    with pytest.raises(ValueError):
+        list(concurrency.map_as_completed(fail_on_two, range(5), max_workers=2))
+
+
+def test_map_concurrently__streams_items():
+    consumed = 0
+
+    def items():
+        nonlocal consumed
+        for value in range(100):
+            consumed += 1
+            yield value
+
+    results = concurrency.map_concurrently(lambda x: x, items(), max_workers=2)
+
+    assert next(results) == 0
+    assert consumed <= 4
+
+    results.close()
+
+
+def test_map_async():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def slow_square(value: int) -> int:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # The first items finish last, the results must still be in order.
+        await asyncio.sleep((5 - value) * 0.01)
+        in_flight -= 1
+        return value * value
+
+    result = asyncio.run(
+        concurrency.map_async(slow_square, range(5), max_concurrency=2)
+    )
+
+    assert result == [0, 1, 4, 9, 16]
+    assert max_in_flight == 2
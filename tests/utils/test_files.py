@@ -0,0 +1,77 @@
+import pytest
+
+from obsidian_tools.utils import files
+
+
+def test_hash_file(tmp_path):
+    file_path = tmp_path / "note.md"
+    file_path.write_bytes(b"Hello, world!")
+
+    assert files.hash_file(file_path) == files.hash_content(b"Hello, world!")
+
+
+def test_write_note(tmp_path):
+    file_path = tmp_path / "note.md"
+
+    status = files.write_note(file_path, "Hello, world!")
+    assert status == files.WriteStatus.CREATED
+    assert file_path.read_text() == "Hello, world!"
+
+    mtime = file_path.stat().st_mtime_ns
+    status = files.write_note(file_path, "Hello, world!")
+    assert status == files.WriteStatus.UNCHANGED
+    assert file_path.stat().st_mtime_ns == mtime
+
+    status = files.write_note(file_path, "Hello, world?")
+    assert status == files.WriteStatus.UPDATED
+    assert file_path.read_text() == "Hello, world?"
+
+
+def test_write_file_atomically(tmp_path):
+    file_path = tmp_path / "note.md"
+    file_path.write_bytes(b"Old")
+    file_path.chmod(0o600)
+
+    files.write_file_atomically(file_path, b"New")
+
+    assert file_path.read_bytes() == b"New"
+    assert file_path.stat().st_mode & 0o777 == 0o600
+    assert list(tmp_path.iterdir()) == [file_path]
+
+
+def test_write_file_atomically__mode(tmp_path):
+    file_path = tmp_path / "token.json"
+    file_path.write_bytes(b"Old")
+    file_path.chmod(0o644)
+
+    files.write_file_atomically(file_path, b"New", mode=0o600)
+
+    assert file_path.read_bytes() == b"New"
+    assert file_path.stat().st_mode & 0o777 == 0o600
+
+
+def test_write_file_atomically__cleans_up_on_error(tmp_path, mocker):
+    file_path = tmp_path / "note.md"
+    file_path.write_bytes(b"Old")
+
+    mocker.patch("obsidian_tools.utils.files.os.replace", side_effect=OSError)
+
+    with pytest.raises(OSError):
+        files.write_file_atomically(file_path, b"New")
+
+    assert file_path.read_bytes() == b"Old"
+    assert list(tmp_path.iterdir()) == [file_path]
+
+
+def test_deferred_fsync(tmp_path, mocker):
+    fsync = mocker.spy(files.os, "fsync")
+
+    with files.deferred_fsync():
+        with files.deferred_fsync():
+            files.write_note(tmp_path / "one.md", "One")
+        files.write_note(tmp_path / "two.md", "Two")
+
+        assert fsync.call_count == 0
+
+    # One for each file and one for the directory.
+    assert fsync.call_count == 3
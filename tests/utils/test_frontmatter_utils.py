@@ -0,0 +1,41 @@
+import pytest
+
+from obsidian_tools.utils import frontmatter_utils
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        ("---\ntitle: Hello\n---\nBody", "title: Hello\n"),
+        ("﻿---\ntitle: Hello\n----  \nBody", "title: Hello\n"),
+        ("No frontmatter\n---\n", None),
+        ("---\ntitle: Never closed\n", None),
+    ],
+)
+def test_read_frontmatter(tmp_path, content, expected):
+    file_path = tmp_path / "note.md"
+    file_path.write_text(content, encoding="utf-8")
+
+    assert frontmatter_utils.read_frontmatter(file_path) == expected
+
+
+def test_load_note_metadata(vault_path):
+    file_path = (
+        vault_path
+        / "library"
+        / "tv_shows"
+        / "She-Ra and the Princesses of Power.md"
+    )
+
+    assert frontmatter_utils.load_note_metadata(file_path) == {
+        "name": "She-Ra and the Princesses of Power",
+        "type": "TV Show",
+        "tmdb_id": 79732,
+    }
+
+
+def test_load_note_metadata__not_a_mapping(tmp_path):
+    file_path = tmp_path / "note.md"
+    file_path.write_text("---\n- a list\n---\n")
+
+    assert frontmatter_utils.load_note_metadata(file_path) == {}
@@ -0,0 +1,140 @@
+import time
+
+import pytest
+
+from obsidian_tools.utils import http_cache
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, {}),
+        ("no-store", {"no-store": None}),
+        (
+            "public, max-age=3600",
+            {"public": None, "max-age": "3600"},
+        ),
+        ('private, max-age="60"', {"private": None, "max-age": "60"}),
+    ],
+)
+def test_parse_cache_control(value, expected):
+    assert http_cache.parse_cache_control(value) == expected
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({}, 1000.0),
+        ({"cache-control": "no-store"}, None),
+        ({"cache-control": "no-cache, max-age=60"}, 1000.0),
+        ({"cache-control": "max-age=60"}, 1060.0),
+        ({"cache-control": "max-age=nope"}, 1000.0),
+        ({"expires": "Thu, 01 Jan 1970 00:20:00 GMT"}, 1200.0),
+        ({"expires": "0"}, 1000.0),
+    ],
+)
+def test_get_expires_at(headers, expected):
+    assert http_cache.get_expires_at(headers, now=1000.0) == expected
+
+
+def test_build_cache_key():
+    key = http_cache.build_cache_key("GET", "https://example.com/?q=a")
+
+    assert key == http_cache.build_cache_key(
+        "get", "https://example.com/?q=a", b""
+    )
+    assert key != http_cache.build_cache_key("GET", "https://example.com/?q=b")
+    assert key != http_cache.build_cache_key(
+        "GET", "https://example.com/?q=a", "body"
+    )
+    assert key != http_cache.build_cache_key(
+        "GET", "https://example.com/?q=a", namespace="abc"
+    )
+
+
+def test_get_cache_namespace():
+    class Auth:
+        def __init__(self, api_key):
+            self.api_key = api_key
+
+    assert http_cache.get_cache_namespace(None) == ""
+    assert http_cache.get_cache_namespace(
+        Auth("a")
+    ) == http_cache.get_cache_namespace(Auth("a"))
+    assert http_cache.get_cache_namespace(
+        Auth("a")
+    ) != http_cache.get_cache_namespace(Auth("b"))
+
+
+def build_cached_response(content: bytes = b"{}", stored_at=None):
+    now = time.time()
+    return http_cache.CachedResponse(
+        url="https://example.com/",
+        status_code=200,
+        headers={"etag": '"abc"', "content-type": "application/json"},
+        content=content,
+        stored_at=stored_at or now,
+        expires_at=now + 60,
+    )
+
+
+def test_sqlite_http_cache(tmp_path):
+    cache = http_cache.SQLiteHttpCache(tmp_path / "cache.sqlite")
+    cached_response = build_cached_response()
+
+    assert cache.get("key") is None
+
+    cache.set("key", cached_response)
+    assert cache.get("key") == cached_response
+    assert cache.get("key").etag == '"abc"'
+
+    cache.delete("key")
+    assert cache.get("key") is None
+
+    cache.set("key", cached_response)
+    cache.clear()
+    assert cache.get("key") is None
+
+
+def test_sqlite_http_cache__evicts_old_entries(tmp_path):
+    cache = http_cache.SQLiteHttpCache(tmp_path / "cache.sqlite", max_age=60)
+
+    cache.set("old", build_cached_response(stored_at=time.time() - 120))
+    cache.set("new", build_cached_response())
+
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
+
+
+def test_sqlite_http_cache__evicts_least_recently_used(tmp_path):
+    cache = http_cache.SQLiteHttpCache(tmp_path / "cache.sqlite", max_size=10)
+
+    cache.set("one", build_cached_response(content=b"12345"))
+    cache.set("two", build_cached_response(content=b"12345"))
+    cache.get("one")
+    cache.set("three", build_cached_response(content=b"12345"))
+
+    assert cache.get("one") is not None
+    assert cache.get("two") is None
+    assert cache.get("three") is not None
+
+
+def test_sqlite_http_cache__keeps_a_running_total_size(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = http_cache.SQLiteHttpCache(path, max_size=10)
+
+    cache.set("one", build_cached_response(content=b"12345"))
+    cache.set("one", build_cached_response(content=b"123"))
+    cache.set("two", build_cached_response(content=b"12345"))
+    assert cache._total_size == 8
+
+    cache.delete("two")
+    assert cache._total_size == 3
+
+    # The total is read back from the database when it's opened.
+    assert http_cache.SQLiteHttpCache(path, max_size=10)._total_size == 3
+
+
+def test_http_cache__is_abstract():
+    with pytest.raises(TypeError):
+        http_cache.HttpCache()  # type: ignore[abstract]
@@ -1,9 +1,17 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from importlib.metadata import version
 
 import pytest
 import responses
+from requests import ReadTimeout
+from requests.auth import HTTPBasicAuth
+from responses.matchers import header_matcher
 
-from obsidian_tools.utils import http_client
+from obsidian_tools.utils import http_client, rate_limit
+from obsidian_tools.utils.http_cache import SQLiteHttpCache
+from obsidian_tools.utils.retry import RetryPolicy
 
 
 @responses.activate
@@ -21,3 +29,285 @@ def test_http_client__request(method: http_client.HttpMethod):
     expected_user_agent = f"obsidian-tools/{version('obsidian-tools')} (+https://github.com/myles/obsidian-tools/)"
     assert "User-Agent" in request.headers
     assert request.headers["User-Agent"] == expected_user_agent
+
+
+@responses.activate
+def test_http_client__request__cache_hit(tmp_path):
+    url = "http://example.com/"
+
+    responses.add(
+        responses.GET,
+        url,
+        json={"hello": "world"},
+        headers={"Cache-Control": "max-age=60"},
+    )
+
+    client = http_client.HttpClient(
+        cache=SQLiteHttpCache(tmp_path / "cache.sqlite")
+    )
+    _, first_response = client.get(url)
+    _, second_response = client.get(url)
+
+    assert len(responses.calls) == 1
+    assert second_response.status_code == 200
+    assert second_response.json() == first_response.json()
+
+
+@responses.activate
+def test_http_client__request__cache_is_namespaced_by_auth(tmp_path):
+    url = "http://example.com/"
+
+    responses.add(
+        responses.GET,
+        url,
+        json={"hello": "world"},
+        headers={"Cache-Control": "max-age=60"},
+    )
+
+    cache = SQLiteHttpCache(tmp_path / "cache.sqlite")
+    http_client.HttpClient(
+        auth=HTTPBasicAuth("alice", "secret"), cache=cache
+    ).get(url)
+    http_client.HttpClient(
+        auth=HTTPBasicAuth("alice", "secret"), cache=cache
+    ).get(url)
+    http_client.HttpClient(
+        auth=HTTPBasicAuth("bob", "secret"), cache=cache
+    ).get(url)
+
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_http_client__request__cache_revalidation(tmp_path):
+    url = "http://example.com/"
+
+    responses.add(
+        responses.GET,
+        url,
+        json={"hello": "world"},
+        headers={"ETag": '"abc"'},
+    )
+    responses.add(
+        responses.GET,
+        url,
+        status=304,
+        match=[header_matcher({"If-None-Match": '"abc"'})],
+    )
+
+    client = http_client.HttpClient(
+        cache=SQLiteHttpCache(tmp_path / "cache.sqlite")
+    )
+    client.get(url)
+    _, response = client.get(url)
+
+    assert len(responses.calls) == 2
+    assert response.status_code == 200
+    assert response.json() == {"hello": "world"}
+
+
+@responses.activate
+def test_http_client__request__cache_no_store(tmp_path):
+    url = "http://example.com/"
+
+    responses.add(
+        responses.GET,
+        url,
+        json={"hello": "world"},
+        headers={"Cache-Control": "no-store", "ETag": '"abc"'},
+    )
+
+    client = http_client.HttpClient(
+        cache=SQLiteHttpCache(tmp_path / "cache.sqlite")
+    )
+    client.get(url)
+    client.get(url)
+
+    assert len(responses.calls) == 2
+    assert "If-None-Match" not in responses.calls[1].request.headers
+
+
+@responses.activate
+def test_http_client__request__rate_limit(mocker):
+    url = "http://example.com/"
+
+    responses.add(responses.Response(method="GET", url=url))
+
+    mock_sleep = mocker.Mock()
+    rate_limiter = rate_limit.RateLimiter(
+        {"example.com": rate_limit.RateLimit(requests=1, period=10)},
+        sleep=mock_sleep,
+    )
+
+    client = http_client.HttpClient(rate_limiter=rate_limiter)
+    client.get(url)
+    client.get(url)
+
+    mock_sleep.assert_called_once()
+    assert mock_sleep.call_args.args[0] == pytest.approx(10, abs=0.1)
+
+
+@responses.activate
+def test_http_client__request__retry(mocker):
+    url = "http://example.com/"
+
+    responses.add(responses.Response(method="GET", url=url, status=502))
+    responses.add(
+        responses.Response(
+            method="GET", url=url, status=429, headers={"Retry-After": "2"}
+        )
+    )
+    responses.add(responses.Response(method="GET", url=url, status=200))
+
+    mock_sleep = mocker.patch.object(http_client.time, "sleep")
+
+    # The rate limiter also waits after the Retry-After, but it's not the
+    # wait we are testing.
+    client = http_client.HttpClient(
+        rate_limiter=rate_limit.RateLimiter({}, sleep=mocker.Mock())
+    )
+    _, response = client.get(url)
+
+    assert response.status_code == 200
+    assert len(responses.calls) == 3
+
+    # The second wait honours the Retry-After header.
+    assert mock_sleep.call_count == 2
+    assert mock_sleep.call_args_list[1].args[0] >= 2
+
+
+@responses.activate
+def test_http_client__request__retry_budget(mocker):
+    url = "http://example.com/"
+
+    responses.add(responses.Response(method="GET", url=url, status=503))
+    mocker.patch.object(http_client.time, "sleep")
+
+    client = http_client.HttpClient()
+    _, response = client.get(url, retry_policy=RetryPolicy(max_retries=1))
+
+    assert response.status_code == 503
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_http_client__request__retry_errors(mocker):
+    url = "http://example.com/"
+
+    responses.add(responses.Response(method="GET", url=url, body=ReadTimeout()))
+    responses.add(
+        responses.Response(method="POST", url=url, body=ReadTimeout())
+    )
+    responses.add(responses.Response(method="GET", url=url, status=200))
+    mocker.patch.object(http_client.time, "sleep")
+
+    client = http_client.HttpClient()
+
+    _, response = client.get(url)
+    assert response.status_code == 200
+
+    # POST requests aren't idempotent, so they aren't retried.
+    with pytest.raises(ReadTimeout):
+        client.post(url)
+
+
+def test_build_session():
+    adapter = http_client.build_http_adapter(pool_maxsize=64, pool_block=True)
+    session = http_client.build_session(adapter)
+
+    assert session.get_adapter("https://example.com/") is adapter
+    assert session.get_adapter("http://example.com/") is adapter
+    assert adapter._pool_maxsize == 64
+    assert adapter._pool_block is True
+
+
+@responses.activate
+def test_http_client__shared_session():
+    url = "http://example.com/"
+
+    responses.add(responses.Response(method="GET", url=url))
+    responses.add(
+        responses.Response(
+            method="GET",
+            url=url,
+            match=[header_matcher({"Authorization": "Bearer secret"})],
+        )
+    )
+
+    class BearerAuth:
+        def __call__(self, request):
+            request.headers["Authorization"] = "Bearer secret"
+            return request
+
+    session = http_client.build_session()
+    client_one = http_client.HttpClient(session=session)
+    client_two = http_client.HttpClient(session=session, auth=BearerAuth())
+
+    # The authentication of one client doesn't leak into the other.
+    request, _ = client_one.get(url)
+    assert "Authorization" not in request.headers
+
+    request, _ = client_two.get(url)
+    assert request.headers["Authorization"] == "Bearer secret"
+    assert session.auth is None
+
+
+@responses.activate
+def test_http_client__request__coalesces_in_flight_requests():
+    url = "http://example.com/works/OL1W.json"
+    started = threading.Event()
+    release = threading.Event()
+
+    def callback(request):
+        started.set()
+        release.wait(timeout=5)
+        return 200, {}, '{"key": "/works/OL1W"}'
+
+    responses.add_callback(responses.GET, url, callback=callback)
+
+    client = http_client.HttpClient()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(client.get, url)
+        started.wait(timeout=5)
+        waiters = [executor.submit(client.get, url) for _ in range(3)]
+        # Give the waiters time to find the request in flight.
+        time.sleep(0.05)
+        release.set()
+
+        results = [future.result() for future in [first, *waiters]]
+
+    assert len(responses.calls) == 1
+    assert all(response is results[0][1] for _, response in results)
+    assert results[0][1].json() == {"key": "/works/OL1W"}
+
+    # Once the request is done the next one is sent again.
+    client.get(url)
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_http_client__request__memo():
+    url = "http://example.com/"
+    missing_url = "http://example.com/missing"
+
+    responses.add(responses.GET, url, json={"hello": "world"})
+    responses.add(responses.GET, missing_url, status=404)
+
+    client = http_client.HttpClient(memo_size=1)
+
+    client.get(url)
+    _, response = client.get(url)
+    assert response.json() == {"hello": "world"}
+    assert len(responses.calls) == 1
+
+    # Only successful responses are memoized.
+    client.get(missing_url)
+    client.get(missing_url)
+    assert len(responses.calls) == 3
+
+    # POST requests aren't memoized.
+    responses.add(responses.POST, url)
+    client.post(url)
+    client.post(url)
+    assert len(responses.calls) == 5
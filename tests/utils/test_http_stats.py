@@ -0,0 +1,143 @@
+import pytest
+import responses
+
+from obsidian_tools.utils import http_client, http_stats
+from obsidian_tools.utils.http_cache import SQLiteHttpCache
+
+
+@pytest.fixture
+def request_stats():
+    request_stats = http_stats.RequestStats()
+    unsubscribe = http_stats.subscribe(request_stats.record)
+    yield request_stats
+    unsubscribe()
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (
+            "https://openlibrary.org/works/OL45804W.json",
+            ("openlibrary.org", "/works/{id}.json"),
+        ),
+        (
+            "https://openlibrary.org/isbn/9780140328721.json",
+            ("openlibrary.org", "/isbn/{id}.json"),
+        ),
+        (
+            "https://api.themoviedb.org/3/tv/1399/season/1?language=en",
+            ("api.themoviedb.org", "/3/tv/{id}/season/{id}"),
+        ),
+        (
+            "https://www.googleapis.com/books/v1/volumes",
+            ("www.googleapis.com", "/books/v1/volumes"),
+        ),
+    ],
+)
+def test_get_endpoint_template(url, expected):
+    assert http_stats.get_endpoint_template(url) == expected
+
+
+def test_subscribe():
+    events = []
+    unsubscribe = http_stats.subscribe(events.append)
+
+    http_stats.record_request(
+        method="GET",
+        url="https://example.com/items/1",
+        status_code=200,
+        bytes=10,
+        elapsed=0.5,
+    )
+    unsubscribe()
+    http_stats.record_request(
+        method="GET",
+        url="https://example.com/items/2",
+        status_code=200,
+        bytes=10,
+        elapsed=0.5,
+    )
+
+    assert events == [
+        http_stats.RequestEvent(
+            method="GET",
+            host="example.com",
+            endpoint="/items/{id}",
+            status_code=200,
+            bytes=10,
+            elapsed=0.5,
+        )
+    ]
+    assert http_stats.has_listeners() is False
+
+
+def test_request_stats(request_stats):
+    for status_code, elapsed, cache in [
+        (200, 1.0, "miss"),
+        (200, 0.0, "hit"),
+        (404, 0.5, "miss"),
+    ]:
+        http_stats.record_request(
+            method="GET",
+            url="https://example.com/items/1",
+            status_code=status_code,
+            bytes=100,
+            elapsed=elapsed,
+            cache=cache,
+        )
+
+    http_stats.record_request(
+        method="GET",
+        url="https://example.org/",
+        status_code=None,
+        bytes=0,
+        elapsed=2.0,
+        error=TimeoutError(),
+    )
+
+    hosts = request_stats.get_hosts()
+    assert hosts["example.com"].requests == 3
+    assert hosts["example.com"].cache_hits == 1
+    assert hosts["example.com"].errors == 1
+    assert hosts["example.com"].bytes == 300
+    assert hosts["example.com"].status_codes == {"200": 2, "404": 1}
+    assert hosts["example.org"].status_codes == {"TimeoutError": 1}
+
+    # The slowest host is first.
+    assert request_stats.format_summary() == [
+        "example.org: 1 requests, 0 cached, 1 errors, 0 bytes, 2.00s",
+        "  GET /: 1 requests, 2.00s total, 2.00s average, 2.00s max",
+        "example.com: 3 requests, 1 cached, 1 errors, 300 bytes, 1.50s",
+        "  GET /items/{id}: 3 requests, 1.50s total, 0.50s average, "
+        "1.00s max",
+    ]
+    assert len(request_stats.to_dict()["endpoints"]) == 2
+
+
+@responses.activate
+def test_http_client__records_requests(tmp_path, request_stats):
+    url = "http://example.com/items/1"
+
+    responses.add(
+        responses.GET,
+        url,
+        json={"hello": "world"},
+        headers={"Cache-Control": "max-age=60"},
+    )
+
+    client = http_client.HttpClient(
+        cache=SQLiteHttpCache(tmp_path / "http-cache.sqlite"), memo_size=1
+    )
+    client.get(url)
+    client.get(url)
+
+    cache_client = http_client.HttpClient(
+        cache=SQLiteHttpCache(tmp_path / "http-cache.sqlite")
+    )
+    cache_client.get(url)
+
+    stats = request_stats.endpoints[("example.com", "GET", "/items/{id}")]
+    assert stats.requests == 3
+    assert stats.cache_hits == 2
+    # Only the first response was read from the network.
+    assert stats.bytes == len('{"hello": "world"}')
@@ -0,0 +1,22 @@
+import pytest
+
+from obsidian_tools.utils import iterables
+
+
+def test_chunked():
+    assert iterables.chunked(range(5), 2) == [[0, 1], [2, 3], [4]]
+    assert iterables.chunked([], 2) == []
+
+    with pytest.raises(ValueError):
+        iterables.chunked([1], 0)
+
+
+def test_ichunked():
+    chunks = iterables.ichunked(iter(range(5)), 2)
+
+    assert next(chunks) == [0, 1]
+    assert list(chunks) == [[2, 3], [4]]
+    assert list(iterables.ichunked([], 2)) == []
+
+    with pytest.raises(ValueError):
+        list(iterables.ichunked([1], 0))
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from obsidian_tools.utils import rate_limit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_rate_limit():
+    assert rate_limit.RateLimit(requests=60, period=60).rate == 1.0
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, None),
+        ("120", 120.0),
+        ("Thu, 01 Jan 1970 00:01:40 GMT", 40.0),
+        ("Thu, 01 Jan 1970 00:00:00 GMT", 0.0),
+        ("soon", None),
+    ],
+)
+def test_parse_retry_after(value, expected):
+    assert rate_limit.parse_retry_after(value, now=60.0) == expected
+
+
+def test_token_bucket():
+    clock = FakeClock()
+    bucket = rate_limit.TokenBucket(
+        rate_limit.RateLimit(requests=2, period=1),
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    # The burst is used up without waiting, then the requests are spaced out.
+    for _ in range(4):
+        bucket.acquire()
+
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_token_bucket__reservations_queue_up():
+    clock = FakeClock()
+    bucket = rate_limit.TokenBucket(
+        rate_limit.RateLimit(requests=1, period=1), clock=clock
+    )
+
+    # Threads that reserve at the same time wait in turn.
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 1.0, 2.0]
+
+
+def test_token_bucket__pause_and_limit_available():
+    clock = FakeClock()
+    bucket = rate_limit.TokenBucket(
+        rate_limit.RateLimit(requests=10, period=1), clock=clock
+    )
+
+    bucket.limit_available(0)
+    assert bucket.reserve() == pytest.approx(0.1)
+
+    clock.now += 10
+    bucket.pause(5)
+    assert bucket.reserve() == pytest.approx(5.1)
+
+
+def test_token_bucket__acquire_async(mocker):
+    bucket = rate_limit.TokenBucket(rate_limit.RateLimit(requests=1))
+    mock_sleep = mocker.patch.object(
+        rate_limit.asyncio, "sleep", side_effect=mocker.AsyncMock()
+    )
+
+    async def acquire_twice():
+        await bucket.acquire_async()
+        await bucket.acquire_async()
+
+    asyncio.run(acquire_twice())
+
+    mock_sleep.assert_called_once()
+    assert mock_sleep.call_args.args[0] == pytest.approx(1.0, abs=0.01)
+
+
+def test_rate_limiter():
+    clock = FakeClock()
+    limiter = rate_limit.RateLimiter(
+        {"api.discogs.com": rate_limit.RateLimit(requests=60, period=60)},
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    # Only hosts with a limit are limited.
+    assert limiter.get_bucket("https://example.com/") is None
+    bucket = limiter.get_bucket("https://api.discogs.com/releases/1")
+    assert bucket is limiter.get_bucket("https://api.discogs.com/releases/2")
+
+    # Discogs says there are no requests left in the window.
+    limiter.update(
+        "https://api.discogs.com/releases/1",
+        200,
+        {"X-Discogs-Ratelimit-Remaining": "0"},
+    )
+    limiter.acquire("https://api.discogs.com/releases/1")
+
+    assert clock.sleeps == [1.0]
+
+
+def test_rate_limiter__retry_after():
+    clock = FakeClock()
+    limiter = rate_limit.RateLimiter({}, clock=clock, sleep=clock.sleep)
+
+    limiter.acquire("https://example.com/")
+    limiter.update("https://example.com/", 429, {"Retry-After": "3"})
+    limiter.acquire("https://example.com/")
+
+    assert clock.sleeps == [pytest.approx(4.0)]
@@ -0,0 +1,60 @@
+import pytest
+from requests import ConnectionError, ConnectTimeout, ReadTimeout
+
+from obsidian_tools.utils.retry import NO_RETRY, RetryPolicy
+
+
+def test_retry_policy__can_retry():
+    policy = RetryPolicy(max_retries=2)
+
+    assert policy.can_retry(0) is True
+    assert policy.can_retry(2) is False
+    assert NO_RETRY.can_retry(0) is False
+    assert policy.with_max_retries(5).can_retry(4) is True
+
+
+def test_retry_policy__should_retry_status():
+    policy = RetryPolicy()
+
+    assert policy.should_retry_status("GET", 502) is True
+    assert policy.should_retry_status("GET", 429) is True
+    assert policy.should_retry_status("GET", 404) is False
+    assert policy.should_retry_status("POST", 502) is False
+
+
+def test_retry_policy__should_retry_error():
+    policy = RetryPolicy()
+
+    assert policy.should_retry_error("GET", ReadTimeout()) is True
+    assert policy.should_retry_error("GET", ConnectionError()) is True
+    assert policy.should_retry_error("POST", ReadTimeout()) is False
+    assert policy.should_retry_error("POST", ConnectionError()) is False
+
+    # The request never reached the server.
+    assert policy.should_retry_error("POST", ConnectTimeout()) is True
+
+
+@pytest.mark.parametrize(
+    "attempt, retry_after, expected",
+    [
+        (0, None, 0.5),
+        (3, None, 4.0),
+        (10, None, 30.0),
+        (0, 10.0, 10.0),
+        (0, 60.0, None),
+    ],
+)
+def test_retry_policy__get_backoff(attempt, retry_after, expected):
+    policy = RetryPolicy(backoff_factor=0.5, max_backoff=30.0)
+
+    backoff = policy.get_backoff(
+        attempt, retry_after=retry_after, rand=lambda: 1.0
+    )
+
+    assert backoff == expected
+
+
+def test_retry_policy__get_backoff__jitter():
+    policy = RetryPolicy(backoff_factor=1.0)
+
+    assert policy.get_backoff(2, rand=lambda: 0.25) == 1.0
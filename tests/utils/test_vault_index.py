@@ -0,0 +1,70 @@
+import os
+
+import frontmatter
+
+from obsidian_tools.utils.vault_index import VaultIndex
+
+
+def load_metadata(file_path):
+    return frontmatter.load(file_path).metadata
+
+
+def test_vault_index__list_metadata(tmp_path, mocker):
+    notes_dir_path = tmp_path / "notes"
+    notes_dir_path.mkdir()
+
+    note_one_path = notes_dir_path / "one.md"
+    note_one_path.write_text("---\ntmdb_id: 1\n---\nOne")
+    note_two_path = notes_dir_path / "two.md"
+    note_two_path.write_text("---\ntmdb_id: 2\ndate: 2024-01-01\n---\nTwo")
+
+    loader = mocker.Mock(side_effect=load_metadata)
+    vault_index = VaultIndex(tmp_path / "index.sqlite")
+
+    expected = [
+        (note_one_path, {"tmdb_id": 1}),
+        (note_two_path, {"tmdb_id": 2, "date": "2024-01-01"}),
+    ]
+
+    assert vault_index.list_metadata(notes_dir_path, loader=loader) == expected
+    assert loader.call_count == 2
+
+    # Nothing changed, so nothing is parsed again.
+    assert vault_index.list_metadata(notes_dir_path, loader=loader) == expected
+    assert loader.call_count == 2
+
+    # Only the changed note is parsed again.
+    note_one_path.write_text("---\ntmdb_id: 11\n---\nOne")
+    os.utime(note_one_path, ns=(0, 0))
+    note_two_path.unlink()
+
+    assert vault_index.list_metadata(notes_dir_path, loader=loader) == [
+        (note_one_path, {"tmdb_id": 11}),
+    ]
+    assert loader.call_count == 3
+
+
+def test_vault_index__is_persistent(tmp_path):
+    note_path = tmp_path / "one.md"
+    note_path.write_text("---\ntmdb_id: 1\n---\nOne")
+
+    VaultIndex(tmp_path / "index.sqlite").list_metadata(
+        tmp_path, loader=load_metadata
+    )
+
+    vault_index = VaultIndex(tmp_path / "index.sqlite")
+    assert vault_index.list_metadata(tmp_path, loader=lambda _: {}) == [
+        (note_path, {"tmdb_id": 1}),
+    ]
+
+
+def test_vault_index__skips_invalid_frontmatter(tmp_path):
+    note_path = tmp_path / "one.md"
+    note_path.write_text("---\ntmdb_id: 1\n---\nOne")
+    bad_note_path = tmp_path / "bad.md"
+    bad_note_path.write_text("---\ntitle: [unclosed\n---\nBad")
+
+    vault_index = VaultIndex(tmp_path / "index.sqlite")
+    assert vault_index.list_metadata(tmp_path, loader=load_metadata) == [
+        (note_path, {"tmdb_id": 1}),
+    ]